@@ -0,0 +1,127 @@
+"""
+Sprite animation for Catastrophe Civ
+
+An Animation is a tuple of frame surfaces and a frame rate. An AnimationSet
+groups a character's named animations (walk, idle, talk). Frames are sliced
+from a sprite sheet and scaled once at load time, and every villager using
+the same sprite shares the same AnimationSet, so animating a crowd never
+allocates surfaces.
+
+Frame indices come from one shared AnimationClock instead of per-villager
+timers. Each tick the clock writes every tracked animation's current frame
+for each of PHASES offsets, so a villager only has to read
+animation.current[phase] when it is drawn.
+"""
+import pygame
+
+PHASES = 4  # Frame offsets villagers are spread over so they don't all step in sync
+
+class AnimationClock:
+    """Game time in seconds shared by every animation"""
+    def __init__(self):
+        self.now = 0.0
+        self.animations = []  # Animations whose current frames this clock keeps up to date
+
+    def track(self, animation_set):
+        """Keep every animation in a set on this clock"""
+        self.animations.extend(animation_set.values())
+
+    def advance(self, dt):
+        """Move the clock forward by dt seconds and refresh the current frames"""
+        self.now += dt
+        self.refresh()
+
+    def reset(self):
+        """Back to zero (start of a run)"""
+        self.now = 0.0
+        self.refresh()
+
+    def refresh(self):
+        """Recompute current frames for the clock's time (a handful of animations, once per frame)"""
+        for animation in self.animations:
+            animation.current = animation.frames_at(self.now)
+
+class Animation:
+    """A looping sequence of frames played at a fixed rate"""
+    def __init__(self, frames, fps):
+        self.frames = tuple(frames)
+        self.fps = fps
+        self.count = len(self.frames)
+        self.current = self.frames_at(0.0)  # Frame showing for each phase, set by the clock
+
+    def frame_at(self, seconds, phase=0):
+        """The frame showing at a given clock time, offset by phase frames"""
+        return self.frames[(int(seconds * self.fps) + phase) % self.count]
+
+    def frames_at(self, seconds):
+        """The frame showing at a given clock time for every phase"""
+        return [self.frame_at(seconds, phase) for phase in range(PHASES)]
+
+def _blank_like(image):
+    """A fully transparent surface in image's format (8-bit colorkey sprites stay 8-bit)"""
+    colorkey = image.get_colorkey()
+    if colorkey is not None and not image.get_flags() & pygame.SRCALPHA:
+        blank = image.copy()
+        blank.fill(colorkey)
+        return blank
+    return pygame.Surface(image.get_size(), pygame.SRCALPHA)
+
+class AnimationSet(dict):
+    """Named animations for one character sprite (name -> Animation)"""
+    @property
+    def surfaces(self):
+        """Every distinct frame surface in the set"""
+        return {id(frame): frame for animation in self.values() for frame in animation.frames}.values()
+
+    @classmethod
+    def from_sheet(cls, sheet, frame_width, frame_height, rows, size, prepare=None):
+        """Slice a sheet with one animation per row; rows is a list of (name, frame count, fps).
+
+        Each frame is scaled to size and then passed through prepare(frame), if
+        given, to put it in the same blit format as the game's other sprites.
+        """
+        animations = cls()
+        for row, (name, count, fps) in enumerate(rows):
+            frames = [
+                pygame.transform.scale(
+                    sheet.subsurface((column * frame_width, row * frame_height, frame_width, frame_height)), size)
+                for column in range(count)
+            ]
+            if prepare:
+                frames = [prepare(frame) for frame in frames]
+            animations[name] = Animation(frames, fps)
+        return animations
+
+    @classmethod
+    def from_still(cls, image, rows):
+        """Build walk/idle/talk cycles from a single still image (for sprites without a sheet).
+
+        Walk bobs the sprite up a pixel on alternate frames and talk squashes it
+        a pixel; both keep the still's size so positions and hit boxes match.
+        """
+        width, height = image.get_size()
+        bobbed = _blank_like(image)
+        bobbed.blit(image, (0, -1))
+        squashed = _blank_like(image)
+        squashed.blit(pygame.transform.scale(image, (width, height - 1)), (0, 1))
+        cycles = {
+            "walk": [image, bobbed, image, bobbed],
+            "idle": [image],
+            "talk": [image, squashed],
+        }
+        animations = cls()
+        for name, count, fps in rows:
+            frames = cycles[name]
+            animations[name] = Animation([frames[i % len(frames)] for i in range(count)], fps)
+        return animations
+
+    def scaled(self, scale):
+        """A copy with every frame scaled up by an integer factor, nearest neighbor (frames shared stay shared)"""
+        scaled_frames = {}
+        for frame in self.surfaces:
+            width, height = frame.get_size()
+            scaled_frames[id(frame)] = pygame.transform.scale(frame, (width * scale, height * scale))
+        animations = AnimationSet()
+        for name, animation in self.items():
+            animations[name] = Animation([scaled_frames[id(frame)] for frame in animation.frames], animation.fps)
+        return animations
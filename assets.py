@@ -0,0 +1,232 @@
+"""
+Sprite table and loading for Catastrophe Civ
+
+SPRITE_SIZES lists every image the game loads and the size it is drawn at.
+main.py loads through load_sprite and build.py bakes from the same table,
+so the two can't drift apart. SPRITE_SCALES lists the integer multiples of
+that size a sprite is also drawn at (the zoomed-in villager dialog). Every
+variant is sampled nearest-neighbor from the 1024px source art, baked or
+at load, so nothing is scaled while drawing and a 2x button keeps text a
+pixel-doubled 1x button would lose.
+
+In palette mode (see palette.py) sprites come back as 8-bit surfaces on
+the shared palette. build.py bake writes them pre-quantized to Baked/,
+together with the palette. When Baked/ is missing they are quantized at
+load time instead, which is slow (about a second) and meant for
+development only. build.py pygbag packs Baked/ into one uncompressed
+archive, BAKED_ARCHIVE, so the web build fetches a single file; baked
+images are read from it when it is there.
+
+Sprites whose alpha is all but binary (villagers, the exclamation mark) are
+turned into colorkey surfaces with RLE acceleration, so a blit copies runs
+of opaque pixels and skips transparent ones instead of blending every
+pixel. Soft-edged art (buildings) keeps per-pixel alpha. build.py formats
+prints what each sprite got.
+
+A villager's optional animation sheet (SHEET_SUFFIX, next to its still) is
+loaded at source size through load_sprite like any other image and baked
+with them; prepare_frame then readies each frame cut from it.
+"""
+import io
+import os
+import zipfile
+
+import pygame
+
+from palette import ALPHA_THRESHOLD, COLORKEY, COLORKEY_INDEX, PaletteMapper, build_palette, parse_palette, rgba_bytes
+
+BAKED_DIR = "Baked"  # Relative to the game directory (build.py bake writes dist/Baked)
+BAKED_PALETTE_FILE = os.path.join(BAKED_DIR, "palette.json")
+BAKED_ARCHIVE = "baked.zip"  # Baked/ packed into one file by build.py pygbag (member names keep the Baked/ prefix)
+
+# Source image -> size it is drawn at at 1x (None = keep the source size)
+SPRITE_SIZES = {
+    "background.png": (640, 360),
+    "Assets/Buildings/House.png": (48, 48),
+    "Assets/Buildings/Farm.png": (48, 48),
+    "Assets/Buildings/Factory.png": (48, 48),
+    "Assets/Buildings/Villagers/Blacksmith.png": (15, 15),
+    "Assets/Buildings/Villagers/Farmer_Female.png": (15, 15),
+    "Assets/Buildings/Villagers/Farmer_Male.png": (15, 15),
+    "Assets/Buildings/Villagers/female_basic_villager.png": (15, 15),
+    "Assets/Buildings/Villagers/male_basic_villager.png": (15, 15),
+    "Assets/Buildings/Villagers/male_basic_villager_2.png": (15, 15),
+    "Assets/Buildings/Villagers/female_basic_villager_2.png": (15, 15),
+    "Assets/Buildings/Villagers/villager_exclamation.png": (16, 16),
+    "Assets/Buildings/Speech/Blacksmith_Help_Request_1.png": (64, 64),
+    "Assets/Buildings/Speech/Farmer_Help_Request.png": (64, 64),
+    "Assets/Buildings/Buttons/Help_Button.png": (32, 32),
+    "Assets/Buildings/Buttons/Ignore_Button.png": (32, 32),
+}
+# Source image -> integer scales it is drawn at (default 1x only; zoomed villagers scale their animation frames)
+SPRITE_SCALES = {
+    "Assets/Buildings/Villagers/villager_exclamation.png": (1, 2),
+    "Assets/Buildings/Speech/Blacksmith_Help_Request_1.png": (1, 2),
+    "Assets/Buildings/Speech/Farmer_Help_Request.png": (1, 2),
+    "Assets/Buildings/Buttons/Help_Button.png": (1, 2),
+    "Assets/Buildings/Buttons/Ignore_Button.png": (1, 2),
+}
+VILLAGER_DIR = "Assets/Buildings/Villagers"
+SHEET_SUFFIX = "_sheet.png"  # Animation sheet next to a villager still: Blacksmith.png -> Blacksmith_sheet.png
+OPAQUE_SPRITES = {"background.png"}  # Loaded without per-pixel alpha
+BINARY_ALPHA_TOLERANCE = 8  # Alpha this close to 0 or 255 still counts as binary
+BINARY_ALPHA_VALUES = bytes(range(BINARY_ALPHA_TOLERANCE + 1)) + bytes(range(255 - BINARY_ALPHA_TOLERANCE, 256))
+
+palette_mapper = None  # Set by use_palette() in palette mode
+baked_archive = None  # Open BAKED_ARCHIVE, once something baked has been read from it
+
+def baked_path(path, scale=1):
+    """Where build.py bake writes the 8-bit version of a source image (2x and up in their own directories)"""
+    if scale == 1:
+        return os.path.join(BAKED_DIR, path)
+    return os.path.join(BAKED_DIR, f"{scale}x", path)
+
+def sheet_path(path):
+    """Where the animation sheet for a still image goes (it may not exist)"""
+    return path[:-len(".png")] + SHEET_SUFFIX
+
+def sheet_paths():
+    """Animation sheets that exist next to the villager stills in SPRITE_SIZES"""
+    sheets = [sheet_path(path) for path in SPRITE_SIZES if path.startswith(VILLAGER_DIR)]
+    return [path for path in sheets if os.path.exists(path)]
+
+def decode_source(path):
+    """Load a source image at full size in the display format (32-bit)"""
+    image = pygame.image.load(path)
+    return image.convert() if path in OPAQUE_SPRITES else image.convert_alpha()
+
+def fit_source(image, path, scale=1):
+    """A decoded source image scaled to its draw size times scale"""
+    size = SPRITE_SIZES.get(path)
+    if size and image.get_size() != (size[0] * scale, size[1] * scale):
+        image = pygame.transform.scale(image, (size[0] * scale, size[1] * scale))
+    return image
+
+def load_source(path, scale=1):
+    """Load a source image at its draw size times scale in the display format (32-bit)"""
+    return fit_source(decode_source(path), path, scale)
+
+def is_binary_alpha(image):
+    """True if every pixel is (nearly) fully opaque or fully transparent"""
+    return not rgba_bytes(image)[3::4].translate(None, BINARY_ALPHA_VALUES)
+
+def to_colorkey(image):
+    """An RLE-accelerated colorkey copy of a per-pixel alpha image (pixels under ALPHA_THRESHOLD drop out)"""
+    opaque = pygame.mask.from_surface(image, ALPHA_THRESHOLD - 1)
+    keyed = image.convert()
+    opaque.to_surface(keyed, setcolor=None, unsetcolor=COLORKEY)
+    keyed.set_colorkey(COLORKEY, pygame.RLEACCEL)
+    return keyed
+
+def optimize_sprite(image):
+    """image as an RLE colorkey surface if its alpha is binary, else unchanged"""
+    if image.get_flags() & pygame.SRCALPHA and is_binary_alpha(image):
+        return to_colorkey(image)
+    return image
+
+def sprite_format(image):
+    """Short name of how image is blitted, for reports"""
+    flags = image.get_flags()
+    if flags & pygame.SRCALPHA:
+        kind = "alpha"
+    elif image.get_colorkey() is not None:
+        kind = "colorkey+RLE" if flags & pygame.RLEACCELOK else "colorkey"
+    else:
+        kind = "opaque"
+    return f"{image.get_bitsize()}-bit {kind}"
+
+def scale_variant(image, scale):
+    """A nearest-neighbor copy of image at an integer scale (keeps its format and colorkey), for sprites made in code"""
+    if scale == 1:
+        return image
+    width, height = image.get_size()
+    return pygame.transform.scale(image, (width * scale, height * scale))
+
+def has_baked_assets():
+    """True if build.py baked the sprites here, as Baked/ or packed into BAKED_ARCHIVE"""
+    return os.path.exists(BAKED_ARCHIVE) or os.path.exists(BAKED_PALETTE_FILE)
+
+def read_baked(name):
+    """Bytes of a baked file, from BAKED_ARCHIVE if there is one, else from Baked/; None if it was not baked"""
+    global baked_archive
+    if baked_archive is None and os.path.exists(BAKED_ARCHIVE):
+        baked_archive = zipfile.ZipFile(BAKED_ARCHIVE)
+    if baked_archive is not None:
+        try:
+            return baked_archive.read(name.replace(os.sep, "/"))
+        except KeyError:
+            return None
+    if not os.path.exists(name):
+        return None
+    with open(name, "rb") as f:
+        return f.read()
+
+def load_baked(path, scale=1):
+    """The baked 8-bit variant of a source image, or None (outside palette mode or not baked)"""
+    if palette_mapper is None:
+        return None
+    baked = baked_path(path, scale)
+    data = read_baked(baked)
+    if data is None:
+        return None
+    image = pygame.image.load(io.BytesIO(data), baked)
+    image.set_palette(palette_mapper.palette)
+    image.set_colorkey(COLORKEY_INDEX, pygame.RLEACCEL)
+    return image
+
+def prepare_sprite(image):
+    """A source image at draw size ready to blit: quantized in palette mode, RLE colorkey if it can be"""
+    if palette_mapper is None:
+        return optimize_sprite(image)
+    image = palette_mapper.quantize(image)
+    image.set_colorkey(COLORKEY_INDEX, pygame.RLEACCEL)
+    return image
+
+def prepare_frame(image):
+    """A frame cut and scaled from a load_sprite sheet, ready to blit like the still sprites"""
+    if image.get_bitsize() == 8:
+        image.set_colorkey(COLORKEY_INDEX, pygame.RLEACCEL)  # Already on the shared palette
+        return image
+    return prepare_sprite(image)
+
+def sprite_exists(path):
+    """True if load_sprite can load path here: its source is present, or in palette mode its baked variant"""
+    if os.path.exists(path):
+        return True
+    return palette_mapper is not None and read_baked(baked_path(path)) is not None
+
+def load_sprite(path, scale=1):
+    """Load an image at its draw size times scale: 8-bit on the shared palette in palette mode, else 32-bit.
+
+    Binary-alpha sprites come back as RLE colorkey surfaces.
+    """
+    image = load_baked(path, scale)
+    return image if image is not None else prepare_sprite(load_source(path, scale))
+
+def load_variants(path):
+    """load_sprite at every scale in SPRITE_SCALES: scale -> surface, decoding the source at most once"""
+    variants = {}
+    source = None
+    for scale in SPRITE_SCALES.get(path, (1,)):
+        image = load_baked(path, scale)
+        if image is None:
+            if source is None:
+                source = decode_source(path)
+            image = prepare_sprite(fit_source(source, path, scale))
+        variants[scale] = image
+    return variants
+
+def bake_palette(paths=None):
+    """Build the shared palette from the source images (the ones that exist), animation sheets included"""
+    if paths is None:
+        paths = list(SPRITE_SIZES) + sheet_paths()
+    return build_palette([load_source(path) for path in paths if os.path.exists(path)])
+
+def use_palette(palette=None):
+    """Turn on palette mode with the baked palette (or one built from the sources); returns it"""
+    global palette_mapper
+    if palette is None:
+        data = read_baked(BAKED_PALETTE_FILE)
+        palette = parse_palette(data) if data is not None else bake_palette()
+    palette_mapper = PaletteMapper(palette)
+    return palette
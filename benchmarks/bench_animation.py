@@ -0,0 +1,24 @@
+"""
+Animation benchmarks: shared clock ticks and per-villager frame lookup
+"""
+from harness import benchmark
+from fixtures import POPULATIONS, make_villager_manager
+import main
+
+@benchmark("anim.clock_advance", number=1000)
+def clock_advance():
+    """One frame of the shared animation clock (independent of population)"""
+    return lambda: main.animation_clock.advance(1 / 60)
+
+@benchmark("anim.frame_lookup", params=POPULATIONS, number=20)
+def frame_lookup(count):
+    """Pick the current frame for every villager, as draw_body does"""
+    manager = make_villager_manager(count)
+    for i, villager in enumerate(manager.villagers):
+        villager.walking = i % 2 == 0
+        villager.pick_animation()
+    
+    def run():
+        for villager in manager.villagers:
+            villager.animation.current[villager.animation_phase]
+    return run
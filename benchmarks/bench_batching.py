@@ -0,0 +1,84 @@
+"""
+Batched sprite submission: one blit per object vs a RenderQueue flushed with Surface.blits
+"""
+import random
+
+from harness import benchmark
+from fixtures import make_villager_manager
+from rendering import RenderQueue
+import main
+
+BATCH_COUNTS = [100, 1000, 10000]
+
+def make_buildings(count, seed=99):
+    """Scatter `count` buildings over the base surface"""
+    rng = random.Random(seed)
+    return [
+        main.Building(main.building_types[i % len(main.building_types)],
+                      rng.randrange(0, main.WINDOW_WIDTH - main.BUILDING_SIZE),
+                      rng.randrange(0, main.WINDOW_HEIGHT - main.BUILDING_SIZE))
+        for i in range(count)
+    ]
+
+@benchmark("batch.buildings_per_blit", params=BATCH_COUNTS, number=10)
+def buildings_per_blit(count):
+    """Old path: every building blits itself straight to the base surface"""
+    buildings = make_buildings(count)
+    
+    def run():
+        for building in buildings:
+            building.draw(main.base_surface)
+    return run
+
+@benchmark("batch.buildings_queued", params=BATCH_COUNTS, number=10)
+def buildings_queued(count):
+    """New path: buildings are queued and submitted with one blits() call"""
+    buildings = make_buildings(count)
+    return lambda: main.draw_buildings(buildings)
+
+@benchmark("batch.villagers_per_blit", params=BATCH_COUNTS, number=10)
+def villagers_per_blit(count):
+    """Old path: every villager blits itself straight to the base surface"""
+    manager = make_villager_manager(count)
+    
+    def run():
+        for villager in manager.villagers:
+            villager.draw(main.base_surface)
+    return run
+
+@benchmark("batch.villagers_queued", params=BATCH_COUNTS, number=10)
+def villagers_queued(count):
+    """New path: VillagerManager.draw queues everything and flushes once"""
+    manager = make_villager_manager(count)
+    return lambda: manager.draw(main.base_surface)
+
+def make_small_sprite_items(count, seed=5):
+    """(surface, position) pairs for `count` villager-sized sprites"""
+    rng = random.Random(seed)
+    sprites = [image for image in main.villager_images.values() if image]
+    return [
+        (sprites[i % len(sprites)], (rng.randrange(0, main.WINDOW_WIDTH), rng.randrange(0, main.WINDOW_HEIGHT)))
+        for i in range(count)
+    ]
+
+@benchmark("batch.raw_per_blit", params=BATCH_COUNTS, number=10)
+def raw_per_blit(count):
+    """Submission cost alone: one Surface.blit call per small sprite"""
+    items = make_small_sprite_items(count)
+    target = main.base_surface
+    
+    def run():
+        for source, dest in items:
+            target.blit(source, dest)
+    return run
+
+@benchmark("batch.raw_blits", params=BATCH_COUNTS, number=10)
+def raw_blits(count):
+    """Submission cost alone: the same sprites through a RenderQueue and one blits() call"""
+    items = make_small_sprite_items(count)
+    queue = RenderQueue()
+    
+    def run():
+        queue.extend(items)
+        queue.flush(main.base_surface)
+    return run
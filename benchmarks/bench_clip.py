@@ -0,0 +1,60 @@
+"""
+Clip benchmarks: capturing frames into the ring buffer and encoding a saved clip
+"""
+import os
+import shutil
+import tempfile
+
+from harness import benchmark
+from fixtures import make_villager_manager, make_full_placements
+from clip import ClipBuffer, encode_clip
+import main
+
+def make_playing_frames(count, frames=8):
+    """Successive PLAYING frames with count villagers walking, as separate surfaces"""
+    town_buildings = main.create_town_with_custom_buildings(make_full_placements())
+    manager = make_villager_manager(count)
+    surfaces = []
+    for _ in range(frames):
+        for _ in range(3):  # One capture every third game frame at 20 FPS
+            manager.update(1 / 60)
+        main.draw_playing_frame(town_buildings, manager, 42.0)
+        surfaces.append(main.base_surface.copy())
+    return surfaces
+
+@benchmark("clip.capture", params=[7, 1000], number=50)
+def capture(count):
+    """Quantize and compress a frame that changed since the last capture (the per-capture cost)"""
+    surfaces = make_playing_frames(count)
+    clip_buffer = ClipBuffer()
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) % len(surfaces)
+        clip_buffer.capture(surfaces[index[0]])
+    return run
+
+@benchmark("clip.capture_still", number=200)
+def capture_still():
+    """Capture a frame identical to the previous one (frozen dialog), which reuses its bytes"""
+    surface = make_playing_frames(7, frames=1)[0]
+    clip_buffer = ClipBuffer()
+    clip_buffer.capture(surface)
+    return lambda: clip_buffer.capture(surface)
+
+@benchmark("clip.encode", number=1, repeat=3, warmup=0)
+def encode():
+    """Write a 10 second clip of changing frames (runs off the game loop in a background thread)"""
+    surfaces = make_playing_frames(100)
+    clip_buffer = ClipBuffer(seconds=10)
+    for index in range(clip_buffer.frames.maxlen):
+        clip_buffer.capture(surfaces[index % len(surfaces)])
+    frames = list(clip_buffer.frames)
+
+    def run():
+        directory = tempfile.mkdtemp()
+        try:
+            encode_clip(frames, clip_buffer.size, clip_buffer.palette, clip_buffer.fps, os.path.join(directory, "clip"))
+        finally:
+            shutil.rmtree(directory)
+    return run
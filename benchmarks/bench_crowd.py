@@ -0,0 +1,60 @@
+"""
+Crowd benchmarks: neighbour queries and separation steering
+"""
+from harness import benchmark
+from fixtures import POPULATIONS, make_villager_manager
+from crowd import SpatialGrid
+import main
+
+@benchmark("crowd.grid_rebuild", params=POPULATIONS, number=10)
+def grid_rebuild(count):
+    """Bucket the whole crowd from scratch (only done when the population changes)"""
+    manager = make_villager_manager(count)
+    grid = SpatialGrid(main.SEPARATION_RADIUS)
+    return lambda: grid.rebuild(manager.villagers)
+
+@benchmark("crowd.grid_upkeep", params=POPULATIONS, number=10)
+def grid_upkeep(count):
+    """Re-bucket the whole crowd after a frame of walking (done every frame)"""
+    manager = make_villager_manager(count)
+    grid = manager.crowd_grid
+    grid.rebuild(manager.villagers)
+
+    def run():
+        for villager in manager.villagers:
+            villager.update(1 / 60)
+        grid.move_all(manager.villagers)
+    return run
+
+@benchmark("crowd.neighbour_queries", params=POPULATIONS, number=5)
+def neighbour_queries(count):
+    """One neighbour query per villager through the bucket grid"""
+    manager = make_villager_manager(count)
+    grid = SpatialGrid(main.SEPARATION_RADIUS)
+    grid.rebuild(manager.villagers)
+    radius = main.SEPARATION_RADIUS
+
+    def run():
+        for villager in manager.villagers:
+            grid.query(villager.x, villager.y, radius)
+    return run
+
+@benchmark("crowd.neighbour_bruteforce", params=[7, 100, 1000], number=3)
+def neighbour_bruteforce(count):
+    """The same queries by checking every pair - the O(n^2) search the grid avoids"""
+    manager = make_villager_manager(count)
+    radius_sq = main.SEPARATION_RADIUS ** 2
+    villagers = manager.villagers
+
+    def run():
+        for villager in villagers:
+            x, y = villager.x, villager.y
+            [other for other in villagers if (other.x - x) ** 2 + (other.y - y) ** 2 < radius_sq]
+    return run
+
+@benchmark("crowd.separation_step", params=POPULATIONS, number=20)
+def separation_step(count):
+    """One frame of separation steering: re-bucket the whole crowd, then push a SEPARATION_BATCH slice"""
+    manager = make_villager_manager(count)
+    manager.separate_crowd(1 / 60)  # Initial bucketing happens outside the timed section
+    return lambda: manager.separate_crowd(1 / 60)
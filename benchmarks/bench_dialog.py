@@ -0,0 +1,37 @@
+"""
+Help dialog benchmarks: drawing an open dialog and a whole frozen frame behind it
+"""
+import random
+
+from harness import benchmark
+from fixtures import make_villager_manager, make_full_placements
+import main
+
+def open_dialog(manager):
+    """Open the blacksmith's help dialog the way a click does; returns the blacksmith"""
+    blacksmith = next(villager for villager in manager.villagers if villager.sprite_name == "Blacksmith.png")
+    blacksmith.x, blacksmith.y = 200, 200
+    blacksmith.show_help_request()
+    manager.is_frozen = True
+    return blacksmith
+
+@benchmark("dialog.draw_overlay", number=1000)
+def draw_overlay():
+    """The open dialog alone: speech bubble and both buttons"""
+    random.seed(5)
+    blacksmith = open_dialog(make_villager_manager(7))
+    return lambda: blacksmith.draw_overlay(main.base_surface)
+
+@benchmark("dialog.frozen_frame", number=100)
+def frozen_frame():
+    """A whole frame while the dialog freezes the village, including the final present"""
+    random.seed(5)
+    town_buildings = main.create_town_with_custom_buildings(make_full_placements())
+    manager = make_villager_manager(7)
+    open_dialog(manager)
+
+    def run():
+        manager.update(1 / 60)
+        main.draw_playing_frame(town_buildings, manager, 42.0)
+        main.present_frame()
+    return run
@@ -0,0 +1,25 @@
+"""
+Disaster benchmarks: lazy frame loading and drawing a shaking frame
+"""
+from harness import benchmark
+from disasters import DISASTERS, DisasterSequence, load_frames
+import main
+
+@benchmark("disaster.load", params=list(DISASTERS), number=5)
+def load(name):
+    """Load (or draw) and pre-scale one disaster's frames - the hitch when the timer hits zero"""
+    return lambda: load_frames(DISASTERS[name])
+
+@benchmark("disaster.draw_frame", params=list(DISASTERS), number=100)
+def draw_frame(name):
+    """Draw the shaken backdrop plus the current disaster frame"""
+    spec = DISASTERS[name]
+    sequence = DisasterSequence(spec, load_frames(spec), seed=1)
+    backdrop = main.base_surface.copy()
+    
+    def run():
+        sequence.update(1 / 60)
+        if sequence.finished:
+            sequence.elapsed = 0.0
+        sequence.draw(main.base_surface, backdrop)
+    return run
@@ -0,0 +1,36 @@
+"""
+Sprite format benchmarks: per-pixel alpha against RLE colorkey for the mostly transparent sprites
+"""
+import pygame
+
+from harness import benchmark
+from assets import SPRITE_SIZES, load_source, optimize_sprite, to_colorkey
+import main
+
+FORMATS = ["alpha", "colorkey", "colorkey_rle"]
+SMALL_SPRITES = [path for path, size in SPRITE_SIZES.items() if size in ((15, 15), (16, 16))]
+
+def make_sprites(kind):
+    """Villager and exclamation sprites at draw size in the given format"""
+    sprites = [load_source(path) for path in SMALL_SPRITES]
+    if kind == "alpha":
+        return sprites
+    sprites = [to_colorkey(sprite) for sprite in sprites]
+    if kind == "colorkey":
+        for sprite in sprites:
+            sprite.set_colorkey(sprite.get_colorkey())  # Same key without RLE acceleration
+    return sprites
+
+@benchmark("formats.blit_sprites", params=FORMATS, number=20)
+def blit_sprites(kind):
+    """2000 villager/exclamation blits onto the 32-bit base in one blits() call"""
+    base = pygame.Surface((main.WINDOW_WIDTH, main.WINDOW_HEIGHT)).convert()
+    sprites = make_sprites(kind)
+    items = [(sprites[i % len(sprites)], (i * 37 % 620, i * 53 % 340)) for i in range(2000)]
+    return lambda: base.blits(items, doreturn=False)
+
+@benchmark("formats.optimize", number=50)
+def optimize():
+    """Detect binary alpha and convert every small sprite (the load-time cost)"""
+    sprites = [load_source(path) for path in SMALL_SPRITES]
+    return lambda: [optimize_sprite(sprite) for sprite in sprites]
@@ -0,0 +1,68 @@
+"""
+Input handling: a flood of MOUSEMOTION events, per-event hover vs coalesced per frame
+"""
+import random
+
+import pygame
+
+from harness import benchmark
+from input_layer import InputState
+import main
+
+# Motion events per frame: a regular mouse, and 1000/8000 Hz gaming mice at low frame rates
+MOTION_COUNTS = [8, 125, 1000]
+
+def make_motion_events(count, seed=11):
+    """A frame's worth of motion events plus one click at the end"""
+    rng = random.Random(seed)
+    size = (main.WINDOW_WIDTH * main.SCALE, main.WINDOW_HEIGHT * main.SCALE)
+    events = [
+        pygame.event.Event(pygame.MOUSEMOTION, pos=(rng.randrange(size[0]), rng.randrange(size[1])),
+                           rel=(1, 0), buttons=(0, 0, 0))
+        for _ in range(count)
+    ]
+    events.append(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(5, 5), button=1))
+    return events
+
+def make_placement_buttons():
+    """The four buttons on the building placement screen"""
+    main.asset_loader.finish("town")
+    return [
+        main.ImageButton(10, main.WINDOW_HEIGHT - 40, 32, 32, main.building_images["House"]),
+        main.ImageButton(50, main.WINDOW_HEIGHT - 40, 32, 32, main.building_images["Farm"]),
+        main.ImageButton(90, main.WINDOW_HEIGHT - 40, 32, 32, main.building_images["Factory"]),
+        main.Button(main.WINDOW_WIDTH // 2 - 50, 10, 100, 40, "Start", main.button_font),
+    ]
+
+@benchmark("input.per_event_hover", params=MOTION_COUNTS, number=50)
+def per_event_hover(count):
+    """Old path: every motion event re-hit-tests every widget and the town spots"""
+    events = make_motion_events(count)
+    buttons = make_placement_buttons()
+    
+    def run():
+        for event in events:
+            for button in buttons:
+                button.handle_event(event)
+            if event.type == pygame.MOUSEMOTION:
+                base_x, base_y = event.pos[0] // main.SCALE, event.pos[1] // main.SCALE
+                main.get_hovered_spot_index(base_x, base_y)
+    return run
+
+@benchmark("input.coalesced_hover", params=MOTION_COUNTS, number=50)
+def coalesced_hover(count):
+    """New path: motion folded into one position, hover resolved once per frame"""
+    events = make_motion_events(count)
+    buttons = make_placement_buttons()
+    input_state = InputState(main.SCALE)
+    
+    def run():
+        frame_input = input_state.poll(events)
+        if frame_input.mouse_moved:
+            for button in buttons:
+                button.update_hover(frame_input.pointer_pos)
+            main.get_hovered_spot_index(*frame_input.pointer_pos)
+        for event in frame_input.events:
+            for button in buttons:
+                button.handle_event(event)
+    return run
@@ -0,0 +1,70 @@
+"""
+Depth-sorted world rendering: incremental y-sort and the layered draw at large entity counts
+"""
+import random
+
+from harness import benchmark
+from fixtures import make_villager_manager
+from bench_batching import make_buildings
+from rendering import LayeredRenderer, _baseline
+import main
+
+LAYER_COUNTS = [1000, 10000]
+
+@benchmark("layers.resort_incremental", params=LAYER_COUNTS, number=20)
+def resort_incremental(count):
+    """Re-sort last frame's order after one simulation step (nearly sorted input)"""
+    random.seed(3)
+    manager = make_villager_manager(count)
+    order = manager.get_draw_order()
+    order.sort(key=_baseline)
+    
+    def run():
+        manager.update(1 / 60)
+        order.sort(key=_baseline)
+    return run
+
+@benchmark("layers.resort_from_scratch", params=LAYER_COUNTS, number=20)
+def resort_from_scratch(count):
+    """Same step, but sorting from spawn order every frame (what a naive sort would do)"""
+    random.seed(3)
+    manager = make_villager_manager(count)
+    
+    def run():
+        manager.update(1 / 60)
+        sorted(manager.villagers, key=_baseline)
+    return run
+
+@benchmark("layers.update_only", params=LAYER_COUNTS, number=20)
+def update_only(count):
+    """The simulation step alone, to subtract from the two sort cases above"""
+    random.seed(3)
+    manager = make_villager_manager(count)
+    return lambda: manager.update(1 / 60)
+
+@benchmark("layers.world_draw", params=LAYER_COUNTS, number=10)
+def world_draw(count):
+    """Full depth-sorted draw: `count` villagers merged with count/10 cached buildings"""
+    random.seed(3)
+    manager = make_villager_manager(count)
+    buildings = make_buildings(count // 10)
+    renderer = LayeredRenderer()
+    
+    def run():
+        manager.update(1 / 60)
+        renderer.set_static(buildings)
+        renderer.draw(main.base_surface, manager.get_draw_order())
+    return run
+
+@benchmark("layers.unsorted_draw", params=LAYER_COUNTS, number=10)
+def unsorted_draw(count):
+    """The old unsorted path (buildings, then villagers) for comparison"""
+    random.seed(3)
+    manager = make_villager_manager(count)
+    buildings = make_buildings(count // 10)
+    
+    def run():
+        manager.update(1 / 60)
+        main.draw_buildings(buildings)
+        manager.draw(main.base_surface)
+    return run
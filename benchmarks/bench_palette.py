@@ -0,0 +1,56 @@
+"""
+Palette benchmarks: 8-bit colorkey sprites on an 8-bit base surface against 32-bit alpha sprites
+"""
+import functools
+
+import pygame
+
+from harness import benchmark
+from assets import SPRITE_SIZES, bake_palette, load_source
+from palette import PaletteMapper
+import main
+
+MODES = ["32bit", "8bit"]
+WORLD_SPRITES = [path for path, size in SPRITE_SIZES.items() if size in ((48, 48), (15, 15))]
+
+@functools.lru_cache(maxsize=None)
+def shared_mapper():
+    """The shared palette built from the source art (about a second, so only once)"""
+    return PaletteMapper(bake_palette())
+
+def make_base(mode):
+    """A base surface for mode: the display format, or 8-bit on the shared palette"""
+    if mode == "32bit":
+        return pygame.Surface((main.WINDOW_WIDTH, main.WINDOW_HEIGHT)).convert()
+    base = pygame.Surface((main.WINDOW_WIDTH, main.WINDOW_HEIGHT), 0, 8)
+    base.set_palette(shared_mapper().palette)
+    return base
+
+def make_sprites(mode):
+    """Building and villager sprites at draw size, as 32-bit alpha or quantized 8-bit colorkey"""
+    sprites = [load_source(path) for path in WORLD_SPRITES]
+    if mode == "8bit":
+        sprites = [shared_mapper().quantize(sprite) for sprite in sprites]
+    return sprites
+
+@benchmark("palette.blit_world", params=MODES, number=20)
+def blit_world(mode):
+    """Background plus 2000 building/villager blits in one blits() call"""
+    base = make_base(mode)
+    background = load_source("background.png")
+    if mode == "8bit":
+        background = shared_mapper().quantize(background)
+    sprites = make_sprites(mode)
+    items = [(sprites[i % len(sprites)], (i * 37 % 620, i * 53 % 340)) for i in range(2000)]
+
+    def run():
+        base.blit(background, (0, 0))
+        base.blits(items, doreturn=False)
+    return run
+
+@benchmark("palette.present", params=MODES, number=50)
+def present(mode):
+    """Scale the base surface up to the window and blit it (where 8-bit expands to the display format)"""
+    base = make_base(mode)
+    window_size = (main.WINDOW_WIDTH * main.SCALE, main.WINDOW_HEIGHT * main.SCALE)
+    return lambda: main.window.blit(pygame.transform.scale(base, window_size), (0, 0))
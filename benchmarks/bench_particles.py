@@ -0,0 +1,39 @@
+"""
+Particle benchmarks: a full 10k pool integrated and drawn every frame
+"""
+from harness import benchmark
+from particles import ParticleSystem, PARTICLE_KINDS
+import main
+
+PARTICLE_COUNTS = [1000, 10000]
+
+def make_particles(count):
+    """A pool filled with long-lived particles of every kind that stay on screen"""
+    particles = ParticleSystem(count, bounds=(10 ** 9, 10 ** 9), seed=1)
+    per_kind = count // len(PARTICLE_KINDS)
+    for kind in PARTICLE_KINDS:
+        particles.emit(kind, per_kind, 320, 180, speed=60, life=10 ** 6)
+    return particles
+
+@benchmark("particles.update", params=PARTICLE_COUNTS, number=50)
+def update(count):
+    """Vectorized integration, ageing and culling"""
+    particles = make_particles(count)
+    return lambda: particles.update(1 / 60)
+
+@benchmark("particles.draw", params=PARTICLE_COUNTS, number=20)
+def draw(count):
+    """Batched blits of every live particle"""
+    particles = make_particles(count)
+    return lambda: particles.draw(main.base_surface)
+
+@benchmark("particles.burst", number=50)
+def burst():
+    """Emit a 2000-particle splat and cull it again (free-list round trip)"""
+    particles = ParticleSystem(10000, seed=1)
+    
+    def run():
+        particles.emit("splat", 2000, 320, 180)
+        particles.life[:] = 0
+        particles.update(1 / 60)
+    return run
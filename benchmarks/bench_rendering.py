@@ -0,0 +1,32 @@
+"""
+Rendering benchmarks: placement UI, PLAYING frame and the final present
+"""
+import pygame
+
+from harness import benchmark
+from fixtures import POPULATIONS, make_villager_manager, make_full_placements
+import main
+
+@benchmark("render.placement_ui", number=50)
+def placement_ui():
+    """Building placement screen with every spot filled and one hovered"""
+    placements = make_full_placements()
+    return lambda: main.draw_building_placement_ui("House", 3, placements)
+
+@benchmark("render.placement_ui_empty", number=50)
+def placement_ui_empty():
+    """Building placement screen before anything has been placed"""
+    return lambda: main.draw_building_placement_ui("House", -1, {})
+
+@benchmark("render.playing_frame", params=POPULATIONS, number=10)
+def playing_frame(count):
+    """A complete PLAYING frame: background, town, villagers and timer"""
+    town_buildings = main.create_town_with_custom_buildings(make_full_placements())
+    manager = make_villager_manager(count)
+    debug_font = pygame.font.Font(None, 24)
+    return lambda: main.draw_playing_frame(town_buildings, manager, 42.0, False, debug_font)
+
+@benchmark("render.present", number=20)
+def present():
+    """Upscale the 640x360 base surface to the window and flip"""
+    return main.present_frame
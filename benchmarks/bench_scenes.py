@@ -0,0 +1,43 @@
+"""
+Restart latency: the work done on the frame the player presses R
+"""
+import random
+
+from harness import benchmark
+from fixtures import make_full_placements
+import main
+
+RESTART_POPULATIONS = [0, 2500, 10000]  # 0 = normal village
+
+def make_game(stress_count):
+    """A Game sitting on the end screen with a fully placed town"""
+    random.seed(17)
+    game = main.Game(stress_count)
+    game.building_placements = make_full_placements()
+    game.change_state(main.GameState.END)
+    return game
+
+@benchmark("scenes.restart_synchronous", params=RESTART_POPULATIONS, number=5, repeat=5)
+def restart_synchronous(stress_count):
+    """Old behaviour: build town and villagers on the input frame"""
+    game = make_game(stress_count)
+    
+    def run():
+        game.start_run(main.RunPreparer(game.prepare_run_steps()).finish())
+        game.change_state(main.GameState.END)
+    return run
+
+@benchmark("scenes.restart_prepared", params=RESTART_POPULATIONS, number=5, repeat=5)
+def restart_prepared(stress_count):
+    """New behaviour: swap in the run the end screen prepared across idle frames"""
+    game = make_game(stress_count)
+    
+    def run():
+        # Untimed: the end screen's idle frames finish the preparation
+        game.scene.preparer.finish()
+        start = main.time.perf_counter()
+        game.start_run(game.scene.take_prepared_run())
+        elapsed = main.time.perf_counter() - start
+        game.change_state(main.GameState.END)
+        return elapsed
+    return run
@@ -0,0 +1,47 @@
+"""
+Simulation benchmarks: villager updates and click handling
+"""
+import random
+
+from harness import benchmark
+from fixtures import POPULATIONS, make_villager_manager
+from navigation import Navigator
+from town_generator import generate_town
+
+@benchmark("sim.villager_update", params=POPULATIONS, number=20)
+def villager_update(count):
+    """One 60 FPS simulation step for the whole village"""
+    random.seed(42)
+    manager = make_villager_manager(count)
+    return lambda: manager.update(1 / 60)
+
+@benchmark("sim.handle_click_miss", params=POPULATIONS, number=20)
+def handle_click_miss(count):
+    """A click on empty grass - the worst case that scans every villager"""
+    manager = make_villager_manager(count)
+    return lambda: manager.handle_click(5, 5)
+
+@benchmark("sim.handle_click_hit", params=POPULATIONS, number=20)
+def handle_click_hit(count):
+    """A click on an ordinary villager that has an exclamation"""
+    manager = make_villager_manager(count, exclamations=0)
+    target = next(v for v in manager.villagers if v.sprite_name not in
+                  ("Blacksmith.png", "Farmer_Female.png", "Farmer_Male.png"))
+    click_x, click_y = int(target.x) + 7, int(target.y) + 7
+    
+    def run():
+        target.trigger_exclamation()
+        manager.handle_click(click_x, click_y)
+    return run
+
+@benchmark("sim.navigate_town", params=POPULATIONS, number=20)
+def navigate_town(count):
+    """Every villager walking to its own cell through a generated town (flow fields warm)"""
+    random.seed(42)
+    navigator = Navigator(generate_town(0).walkable)
+    manager = make_villager_manager(count, navigator=navigator)
+    for villager in manager.villagers:
+        villager.pick_new_target()
+        villager.movement_interval = float("inf")  # Keep walking to the same goal
+    manager.update(1 / 60)  # Build the flow fields outside the timed section
+    return lambda: manager.update(1 / 60)
@@ -0,0 +1,28 @@
+"""
+Sound benchmarks: decoding effects, triggering them, and stealing channels
+"""
+from harness import benchmark
+from sound import SOUND_EFFECTS, SoundBank
+
+@benchmark("sound.preload", number=5)
+def preload():
+    """Decode every effect into a fresh bank (spread one per idle frame in the game)"""
+    def run():
+        SoundBank().preload()
+    return run
+
+@benchmark("sound.play", params=list(SOUND_EFFECTS), number=200)
+def play(name):
+    """Trigger one preloaded effect on a free (or stolen) channel"""
+    bank = SoundBank()
+    bank.preload()
+    return lambda: bank.play(name)
+
+@benchmark("sound.play_stealing", number=200)
+def play_stealing():
+    """Trigger an effect with every channel busy, so the lowest-priority one is taken over"""
+    bank = SoundBank(channel_count=4)
+    bank.preload()
+    for _ in range(bank.channel_count):
+        bank.play("explosion")  # Long sounds keep every channel busy
+    return lambda: bank.play("explosion")
@@ -0,0 +1,40 @@
+"""
+Startup benchmarks: town creation and cold asset loading
+"""
+import os
+import subprocess
+import sys
+
+from harness import benchmark
+from fixtures import make_full_placements
+import main
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports main in a fresh interpreter, runs a stage's extra code, and reports how long that took
+COLD_IMPORT_SCRIPT = "import time; start = time.perf_counter(); import main; {}print(time.perf_counter() - start)"
+STARTUP_STAGES = {
+    "menu": "",  # What main() needs before the first menu frame (display and fonts)
+    "assets": "main.load_assets(); ",  # Every sprite, as the background loader ends up doing
+}
+
+@benchmark("startup.create_town", number=200)
+def create_town():
+    """Turn a fully placed layout into Building objects"""
+    placements = make_full_placements()
+    return lambda: main.create_town_with_custom_buildings(placements)
+
+@benchmark("startup.cold_asset_load", params=list(STARTUP_STAGES), number=1, repeat=3, warmup=0)
+def cold_asset_load(stage):
+    """Import main in a fresh interpreter: up to the menu (display and fonts), or with every asset loaded"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    
+    def run():
+        result = subprocess.run(
+            [sys.executable, "-c", COLD_IMPORT_SCRIPT.format(STARTUP_STAGES[stage])],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+        )
+        # The last line is the timing, everything before it is main's own logging
+        return float(result.stdout.strip().splitlines()[-1])
+    return run
@@ -0,0 +1,17 @@
+"""
+Crowd stress benchmarks: complete frames at stress-test populations
+"""
+import random
+
+from harness import benchmark
+from fixtures import make_full_placements, run_playing_frame
+import main
+
+@benchmark("stress.frame", params=[500, 2500, 10000], number=5, repeat=5)
+def stress_frame(count):
+    """Simulate, draw and present one frame with a stress-test crowd"""
+    random.seed(7)
+    town_buildings = main.create_town_with_custom_buildings(make_full_placements())
+    manager = main.VillagerManager()
+    manager.spawn_villagers(count, unique_sprites=False)
+    return lambda: run_playing_frame(town_buildings, manager)
@@ -0,0 +1,35 @@
+"""
+Town generation benchmarks: procedural layouts over many seeds
+"""
+import itertools
+import time
+
+from harness import benchmark
+import main
+import town_generator
+
+@benchmark("town.generate", number=20000, repeat=5)
+def generate():
+    """Generate towns for 100k consecutive seeds (20k per repeat)"""
+    seeds = itertools.count()
+    return lambda: town_generator.generate_town(next(seeds))
+
+@benchmark("town.compose_background", number=50)
+def compose_background():
+    """Render the background image plus dirt paths for one town"""
+    layout = town_generator.generate_town(0)
+    return lambda: main.compose_town_background(layout)
+
+@benchmark("town.take", params=["pooled", "on_demand"], number=20, warmup=1)
+def take(source):
+    """Time to hand the next town to the PLAY click: pool hit vs generating on the spot"""
+    pool = main.TownPool(depth=1 if source == "pooled" else 0)
+    
+    def run():
+        # Refill outside the timed section so only the hand-over is measured
+        while not pool.full:
+            pool.step(budget_ms=1000)
+        start = time.perf_counter()
+        pool.take()
+        return time.perf_counter() - start
+    return run
@@ -0,0 +1,41 @@
+"""
+Shared game-state builders for the benchmarks (imports main headless)
+"""
+import random
+
+import harness  # noqa: F401 - sets the headless SDL drivers before pygame loads
+import main
+
+main.load_assets()  # The game loads sprites in the background once it runs - benchmarks need them all up front
+
+# Village sizes used by the population scaling benchmarks
+POPULATIONS = [7, 100, 1000, 10000]
+
+def make_villager_manager(count, seed=1234, exclamations=2, navigator=None):
+    """Build a VillagerManager with `count` villagers on walkable cells, reusing the sprite set"""
+    rng = random.Random(seed)
+    manager = main.VillagerManager()
+    if navigator:
+        manager.navigator = navigator
+    for i in range(count):
+        sprite_name = main.villager_sprites[i % len(main.villager_sprites)]
+        foot_x, foot_y = manager.navigator.random_point(rng=rng)
+        villager = main.Villager(sprite_name, foot_x - main.VILLAGER_FOOT_X, foot_y - main.VILLAGER_FOOT_Y)
+        villager.manager = manager
+        manager.villagers.append(villager)
+    for villager in manager.villagers[:exclamations]:
+        villager.trigger_exclamation()
+    return manager
+
+def make_full_placements():
+    """Fill every town spot, cycling through the building types"""
+    return {
+        i: main.building_types[i % len(main.building_types)]
+        for i in range(len(main.FIXED_TOWN_LAYOUT))
+    }
+
+def run_playing_frame(town_buildings, manager, dt=1 / 60):
+    """Simulate and draw one PLAYING frame, including the final present"""
+    manager.update(dt)
+    main.draw_playing_frame(town_buildings, manager, 42.0)
+    main.present_frame()
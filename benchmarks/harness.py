@@ -0,0 +1,73 @@
+"""
+Tiny timing harness shared by the Catastrophe Civ benchmark modules
+"""
+import os
+import time
+import statistics
+
+# Run everything headless - no window, no sound card
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+# Registry of every benchmark case, filled in by the @benchmark decorator
+BENCHMARKS = []
+
+class Benchmark:
+    """A single named benchmark case, optionally run once per parameter"""
+    def __init__(self, name, func, params=None, number=100, repeat=7, warmup=3):
+        self.name = name
+        self.func = func
+        self.params = params if params is not None else [None]
+        self.number = number  # Calls per timed round
+        self.repeat = repeat  # Timed rounds
+        self.warmup = warmup  # Untimed calls before the first round
+    
+    def case_name(self, param):
+        """Return the full case name, e.g. sim.villager_update[1000]"""
+        if param is None:
+            return self.name
+        return f"{self.name}[{param}]"
+
+def benchmark(name, params=None, number=100, repeat=7, warmup=3):
+    """Register a benchmark case.
+
+    The decorated function receives the parameter (if any), does its setup and
+    returns a zero-argument callable that is timed. If the callable returns a
+    number, that number is used as the measured duration in seconds instead of
+    the wall time around the call (used for subprocess based measurements).
+    """
+    def decorator(func):
+        BENCHMARKS.append(Benchmark(name, func, params, number, repeat, warmup))
+        return func
+    return decorator
+
+def time_callable(run, number, repeat, warmup):
+    """Time a callable and return per-call durations in milliseconds, one per round"""
+    for _ in range(warmup):
+        run()
+    
+    rounds = []
+    for _ in range(repeat):
+        measured = 0.0
+        start = time.perf_counter()
+        for _ in range(number):
+            result = run()
+            if isinstance(result, (int, float)) and not isinstance(result, bool):
+                measured += result
+        elapsed = time.perf_counter() - start
+        # Prefer the self-reported duration when the callable provides one
+        total = measured if measured > 0 else elapsed
+        rounds.append(total / number * 1000.0)
+    return rounds
+
+def summarize(rounds):
+    """Turn per-round timings into the stats stored in the JSON output"""
+    return {
+        "median_ms": statistics.median(rounds),
+        "mean_ms": statistics.fmean(rounds),
+        "min_ms": min(rounds),
+        "max_ms": max(rounds),
+        "stdev_ms": statistics.stdev(rounds) if len(rounds) > 1 else 0.0,
+        "rounds": len(rounds),
+    }
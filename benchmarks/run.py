@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark runner for Catastrophe Civ
+
+Runs headless (SDL dummy video/audio drivers), so no display is needed.
+
+    python benchmarks/run.py                          # run everything
+    python benchmarks/run.py -k render                # only cases matching "render"
+    python benchmarks/run.py --json results.json      # write results as JSON
+    python benchmarks/run.py --save-baseline          # store results as the baseline
+    python benchmarks/run.py --compare                # flag regressions vs the baseline
+"""
+import argparse
+import contextlib
+import glob
+import importlib
+import json
+import os
+import platform
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# main.py loads assets with relative paths, so run from the repo root
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+import harness  # noqa: E402 - must come after the path setup above
+
+@contextlib.contextmanager
+def quiet(enabled):
+    """Silence the game's console logging while benchmarks run"""
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def load_benchmark_modules():
+    """Import every bench_*.py so their cases register themselves"""
+    for path in sorted(glob.glob(os.path.join(BENCH_DIR, "bench_*.py"))):
+        importlib.import_module(os.path.splitext(os.path.basename(path))[0])
+
+def run_benchmarks(pattern=None, quick=False, verbose=False):
+    """Run all registered cases and return {case name: stats}"""
+    results = {}
+    for bench in harness.BENCHMARKS:
+        for param in bench.params:
+            name = bench.case_name(param)
+            if pattern and pattern not in name:
+                continue
+            
+            number = max(1, bench.number // 5) if quick else bench.number
+            repeat = min(bench.repeat, 3) if quick else bench.repeat
+            with quiet(not verbose):
+                run = bench.func(param) if param is not None else bench.func()
+                rounds = harness.time_callable(run, number, repeat, bench.warmup)
+            
+            results[name] = harness.summarize(rounds)
+            print(f"  {name:<40} {results[name]['median_ms']:>10.3f} ms  "
+                  f"(min {results[name]['min_ms']:.3f}, stdev {results[name]['stdev_ms']:.3f})")
+    return results
+
+def environment_info():
+    """Describe the machine the numbers came from"""
+    import pygame
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "sdl": ".".join(str(part) for part in pygame.get_sdl_version()),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def compare(results, baseline, threshold):
+    """Print a comparison against the baseline and return the regressed case names"""
+    regressions = []
+    print(f"\n📊 Comparing against baseline (threshold +{threshold:.0%})")
+    for name, stats in results.items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            print(f"  {name:<40} {'new':>10}")
+            continue
+        
+        change = (stats["median_ms"] - base["median_ms"]) / base["median_ms"] if base["median_ms"] else 0.0
+        if change > threshold:
+            marker = "❌ REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            marker = "✅ faster"
+        else:
+            marker = ""
+        print(f"  {name:<40} {base['median_ms']:>10.3f} -> {stats['median_ms']:>10.3f} ms  {change:+7.1%} {marker}")
+    return regressions
+
+def write_json(path, results):
+    """Write results plus environment info to a JSON file"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment_info(), "results": results}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Catastrophe Civ benchmarks headless")
+    parser.add_argument("-k", "--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--quick", action="store_true", help="fewer iterations, for a fast sanity pass")
+    parser.add_argument("--json", metavar="PATH", help="write results to this JSON file")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="store the results as the regression baseline")
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE, metavar="PATH",
+                        help="compare against a stored baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown before a case counts as a regression (default 0.15 = 15%%)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show the game's console output")
+    args = parser.parse_args()
+    
+    print("⏱️ Running Catastrophe Civ benchmarks...")
+    with quiet(not args.verbose):
+        load_benchmark_modules()
+    results = run_benchmarks(args.filter, args.quick, args.verbose)
+    
+    if args.json:
+        write_json(args.json, results)
+        print(f"💾 Wrote results to {args.json}")
+    if args.save_baseline:
+        write_json(args.save_baseline, results)
+        print(f"💾 Saved baseline to {args.save_baseline}")
+    
+    if args.compare:
+        if not os.path.exists(args.compare):
+            print(f"❌ Baseline not found: {args.compare}")
+            return 2
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+            return 1
+        print("\n✅ No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
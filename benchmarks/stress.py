@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Find the largest villager crowd that still fits the 60 FPS frame budget
+
+Runs headless. Doubles the population until a full frame (simulation, draw
+and present) goes over budget, then bisects to the break-even point.
+
+    python benchmarks/stress.py                  # report the 60 FPS capacity
+    python benchmarks/stress.py --guard 2000     # fail if capacity drops below 2000
+    python benchmarks/stress.py --json stress.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_ROOT)
+os.chdir(REPO_ROOT)
+
+import harness  # noqa: E402,F401 - headless SDL drivers
+with open(os.devnull, "w", encoding="utf-8") as _devnull, contextlib.redirect_stdout(_devnull):
+    import main  # noqa: E402
+    from fixtures import make_full_placements, run_playing_frame  # noqa: E402
+
+def measure_frame_ms(count, frames=30, warmup=5):
+    """Median full-frame time in milliseconds for a crowd of `count` villagers"""
+    random.seed(count)
+    with open(os.devnull, "w", encoding="utf-8") as devnull, contextlib.redirect_stdout(devnull):
+        town_buildings = main.create_town_with_custom_buildings(make_full_placements())
+        manager = main.VillagerManager()
+        manager.spawn_villagers(count, unique_sprites=False)
+        
+        for _ in range(warmup):
+            run_playing_frame(town_buildings, manager)
+        
+        samples = []
+        for _ in range(frames):
+            start = time.perf_counter()
+            run_playing_frame(town_buildings, manager)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def find_capacity(budget_ms, start=100, limit=200000, tolerance=0.05):
+    """Return (largest population within budget, measurements by population)"""
+    measurements = {}
+    
+    def fits(count):
+        measurements[count] = measure_frame_ms(count)
+        ok = measurements[count] <= budget_ms
+        print(f"  {count:>7} villagers: {measurements[count]:8.2f} ms {'✅' if ok else '❌'}")
+        return ok
+    
+    # Grow until the frame goes over budget
+    low, high = 0, start
+    while high <= limit and fits(high):
+        low, high = high, high * 2
+    if high > limit:
+        return low, measurements
+    
+    # Bisect between the last good and the first bad population
+    while high - low > max(10, low * tolerance):
+        middle = (low + high) // 2
+        if fits(middle):
+            low = middle
+        else:
+            high = middle
+    return low, measurements
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Find the 60 FPS villager capacity")
+    parser.add_argument("--budget-ms", type=float, default=main.FRAME_BUDGET_MS,
+                        help="frame budget in milliseconds (default 60 FPS)")
+    parser.add_argument("--guard", type=int, metavar="COUNT",
+                        help="exit non-zero if the capacity is below COUNT villagers")
+    parser.add_argument("--json", metavar="PATH", help="write the measurements to this JSON file")
+    args = parser.parse_args()
+    
+    print(f"🏃 Searching for the crowd size that fits {args.budget_ms:.2f} ms per frame...")
+    capacity, measurements = find_capacity(args.budget_ms)
+    print(f"\n📊 60 FPS capacity: {capacity} villagers")
+    
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({
+                "budget_ms": args.budget_ms,
+                "capacity": capacity,
+                "frame_ms": {str(count): ms for count, ms in sorted(measurements.items())},
+            }, f, indent=2)
+            f.write("\n")
+        print(f"💾 Wrote results to {args.json}")
+    
+    if args.guard and capacity < args.guard:
+        print(f"❌ Capacity {capacity} is below the guard of {args.guard} villagers")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,44 +1,366 @@
 #!/usr/bin/env python3
 """
 Build script for Catastrophe Civ web deployment
+
+The web build is incremental. Every output is recorded in a manifest in the
+output directory together with a content hash of what it was made from. An
+output is only rebuilt when that hash changes or the output was touched.
+Images that do need staging are shrunk in a process pool. Build flags and
+the staging code are part of an image's hash (STAGE_VERSION and assets.py).
+Sounds, disaster strips and villager sheets are picked from the loaders'
+own tables (LOADER_MODULES), and files in their folders that nothing loads
+are named in the asset report.
+
+build.py pygbag makes an app folder for pygbag (the browser runtime) instead:
+baked 8-bit sprites packed into one archive, the game code precompiled to
+bytecode, and a headless check of the download size and time to first frame.
 """
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
+import py_compile
 import subprocess
 import sys
 import os
 import shutil
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+MB = 1024 * 1024
+BUILD_BUDGET_MB = 100  # PRD: the whole build stays under 100 MB
+WEB_BUDGET_MB = 2  # Default for --web-budget: the game files a browser downloads (code and images)
+GAME_DATA_FILES = ["keymap.json"]  # Non-Python files the game reads
+REPORT_FILE = "asset_report.json"
+MANIFEST_FILE = "build_manifest.json"
+STAGE_VERSION = 1  # Bump when stage_image changes how images come out, to restage them all
+POOL_MIN_IMAGES = 4  # Fewer changed images than this are staged in this process (a pool takes a while to start)
+PYGBAG_DIR = "pygbag"  # App folder for python -m pygbag, inside --out
+GAME_MODULE = "catastrophe_civ"  # main.py in the pygbag build, imported by a launcher so it runs from bytecode
+LOADER_MODULES = ["assets.py", "sound.py", "disasters.py"]  # Their tables say which asset files the game loads
+FIRST_FRAME_RUNS = 3  # Headless launches timed by build.py pygbag (the best one is reported too)
+
+# The pygbag build's main.py (a script is always compiled from source, a module it imports is not)
+LAUNCHER = f'''"""Catastrophe Civ for pygbag: the game is {GAME_MODULE}.py, imported so it runs from precompiled bytecode"""
+import {GAME_MODULE}
+
+{GAME_MODULE}.run()
+'''
+
+# Run in the app folder: start the game headless and exit as soon as it flips its first frame
+FIRST_FRAME_CHECK = f'''
+import os, runpy, sys
+import pygame
+
+def first_frame():
+    game = sys.modules.get("{GAME_MODULE}") or sys.modules["__main__"]
+    print(f"FIRST FRAME palette={{getattr(game, 'PALETTE_MODE', None)}}", flush=True)
+    os._exit(0)
+
+pygame.display.flip = first_frame
+sys.argv = ["main.py"]
+runpy.run_path("main.py", run_name="__main__")
+'''
+
+def init_pygame():
+    """Import pygame with a hidden 1x1 display (convert_alpha() needs one)"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    if pygame.display.get_surface() is None:
+        pygame.display.init()
+        pygame.display.set_mode((1, 1))
+    return pygame
+
+def file_hash(path, salt=b""):
+    """SHA-256 of a file's contents (after salt) as hex"""
+    digest = hashlib.sha256(salt)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_manifest(out_dir):
+    """The manifest from the last build in out_dir ({} if there is none or it is unreadable)"""
+    try:
+        with open(os.path.join(out_dir, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def is_fresh(entry, input_hash, output_path):
+    """True if output_path was built from input_hash and hasn't been changed since"""
+    return (entry is not None and entry["input"] == input_hash and os.path.exists(output_path)
+            and file_hash(output_path) == entry["output"])
+
+def write_if_changed(path, text):
+    """Write text to path unless it already holds exactly that; returns True if it wrote"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    except OSError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+def bake_assets(out_dir="dist"):
+    """Quantize every sprite to the shared 8-bit palette at its draw size, checking each against the original.
+
+    Sprites drawn zoomed also get a variant for each of their SPRITE_SCALES, sampled from the source.
+    """
+    print("🎨 Baking palette sprites...")
+    pygame = init_pygame()
+    from assets import SPRITE_SIZES, SPRITE_SCALES, BAKED_PALETTE_FILE, baked_path, bake_palette, load_source, sheet_paths
+    from palette import MAX_MEAN_ERROR, PaletteMapper, save_palette, visual_diff
+    
+    palette = bake_palette()
+    mapper = PaletteMapper(palette)
+    
+    baked_count = 0
+    failures = []
+    for path in list(SPRITE_SIZES) + sheet_paths():
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping missing {path}")
+            continue
+        for scale in SPRITE_SCALES.get(path, (1,)):
+            source = load_source(path, scale)
+            baked = mapper.quantize(source)
+            target = os.path.join(out_dir, baked_path(path, scale))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            pygame.image.save(baked, target)
+            baked_count += 1
+            
+            # Visual diff against the 32-bit sprite, and memory before/after (4 vs 1 bytes per pixel)
+            mean_error, max_error = visual_diff(source, baked)
+            width, height = source.get_size()
+            status = "✅" if mean_error <= MAX_MEAN_ERROR else "❌"
+            print(f"{status} {path:55} {scale}x {width:4}x{height:<4} {width * height * 4 / 1024:7.1f} KB -> "
+                  f"{width * height / 1024:6.1f} KB  diff mean {mean_error:.2f} max {max_error}")
+            if mean_error > MAX_MEAN_ERROR:
+                failures.append(f"{path} ({scale}x)")
+    
+    save_palette(palette, os.path.join(out_dir, BAKED_PALETTE_FILE))
+    print(f"✅ Wrote {baked_count} baked sprites and the palette to {os.path.join(out_dir, 'Baked')}")
+    if failures:
+        print(f"❌ {len(failures)} sprites differ too much after quantizing (mean error over {MAX_MEAN_ERROR}): "
+              f"{', '.join(failures)}")
+        sys.exit(1)
+
+def report_formats():
+    """Print the blit format load_sprite picks for every sprite and how far it is from the source"""
+    print("🔍 Sprite formats (32-bit mode)...")
+    init_pygame()
+    from assets import SPRITE_SIZES, BINARY_ALPHA_VALUES, load_source, load_sprite, sheet_paths, sprite_format
+    from palette import rgba_bytes, visual_diff
+    
+    counts = {}
+    for path in list(SPRITE_SIZES) + sheet_paths():
+        if not os.path.exists(path):
+            print(f"⚠️ Skipping missing {path}")
+            continue
+        source = load_source(path)
+        sprite = load_sprite(path)
+        alphas = rgba_bytes(source)[3::4]
+        soft = len(alphas.translate(None, BINARY_ALPHA_VALUES))  # Pixels that are neither clear nor solid
+        transparent = alphas.count(0) / len(alphas)
+        mean_error, max_error = visual_diff(source, sprite)
+        kind = sprite_format(sprite)
+        counts[kind] = counts.get(kind, 0) + 1
+        width, height = sprite.get_size()
+        print(f"   {path:55} {width:4}x{height:<4} {kind:20} {transparent:4.0%} clear  {soft:5} soft  "
+              f"diff mean {mean_error:.2f} max {max_error}")
+    print("✅ " + ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items())))
+
+def game_files():
+    """The files the game runs from: every top-level module except this script, plus its data files"""
+    modules = sorted(name for name in os.listdir(".") if name.endswith(".py") and name != "build.py")
+    return modules + [name for name in GAME_DATA_FILES if os.path.exists(name)]
+
+def loaders_hash():
+    """Hash of the loader modules, so asset tables cached in the manifest are redone when one of them changes"""
+    return hashlib.sha256("".join(file_hash(name) for name in LOADER_MODULES).encode()).hexdigest()
+
+def optional_assets():
+    """Files the game only uses when they are there, taken from the loaders' own tables.
+
+    Returns {"sprites": ..., "files": ...}, each mapping a directory to a list
+    of choices: the paths one asset may come from, in the order its loader
+    tries them. Sprites (villager animation sheets) load through load_sprite
+    and are staged like images; files (sounds, disaster strips) ship as they are.
+    """
+    from assets import SPRITE_SIZES, VILLAGER_DIR, sheet_path
+    from disasters import DISASTER_DIR, DISASTERS
+    from sound import MUSIC_TRACK, SOUND_DIR, SOUND_EFFECTS, SOUND_EXTENSIONS
+    return {
+        "sprites": {VILLAGER_DIR: [[sheet_path(path)] for path in SPRITE_SIZES if path.startswith(VILLAGER_DIR)]},
+        "files": {
+            SOUND_DIR: [[os.path.join(SOUND_DIR, name + extension) for extension in SOUND_EXTENSIONS]
+                        for name in list(SOUND_EFFECTS) + [MUSIC_TRACK]],
+            DISASTER_DIR: [[os.path.join(DISASTER_DIR, f"{name}.png")] for name in DISASTERS],
+        },
+    }
 
-def build_web():
-    """Build static web deployment files"""
+def asset_tables(manifest, tables_hash):
+    """Source images the game loads and its optional assets, from the manifest while the loaders are unchanged (no pygame import)"""
+    if manifest.get("tables") == tables_hash:
+        return manifest["images"], manifest["optional"]
+    init_pygame()
+    from assets import SPRITE_SIZES
+    return list(SPRITE_SIZES), optional_assets()
+
+def pick_optional(optional, images):
+    """The optional sprites and files present here, and every other file in their directories (skipped).
+
+    Each asset ships from the first of its choices that exists, the one its
+    loader would pick. Anything else in those directories is never loaded.
+    """
+    picked = {}
+    for kind, directories in optional.items():
+        picked[kind] = []
+        for choices_list in directories.values():
+            for choices in choices_list:
+                found = next((path for path in choices if os.path.exists(path)), None)
+                if found:
+                    picked[kind].append(found)
+    used = {os.path.normpath(path) for path in images + picked["sprites"] + picked["files"]}
+    directories = [directory for kind in optional.values() for directory in kind]
+    skipped = sorted(
+        os.path.join(directory, name)
+        for directory in directories if os.path.isdir(directory)
+        for name in os.listdir(directory)
+        if os.path.isfile(os.path.join(directory, name)) and os.path.normpath(os.path.join(directory, name)) not in used
+    )
+    return picked["sprites"], picked["files"], skipped
+
+def copy_files(paths, out_dir, built, files):
+    """Copy data files into out_dir under the same relative paths unless unchanged since the last build; returns how many were copied"""
+    copied = 0
+    for path in paths:
+        digest = file_hash(path)
+        target = os.path.join(out_dir, path)
+        if not is_fresh(built.get(path), digest, target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copy2(path, target)
+            copied += 1
+        files[path] = {"input": digest, "output": digest}
+    return copied
+
+def stage_image(path, out_dir):
+    """Copy one image the game loads to out_dir, shrunk to the largest size it is drawn at; returns its report row.
+
+    Sampling the shrunk copy gives exactly the pixels sampling the full-size
+    source does, so the game looks the same. Runs in pool worker processes.
+    """
+    pygame = init_pygame()
+    from assets import SPRITE_SCALES, decode_source, fit_source, load_variants
+    
+    source = decode_source(path)
+    target = os.path.join(out_dir, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    staged = fit_source(source, path, max(SPRITE_SCALES.get(path, (1,))))
+    if staged.get_width() * staged.get_height() < source.get_width() * source.get_height():
+        pygame.image.save(staged, target)
+    else:
+        shutil.copy2(path, target)  # Never upscale - small sources (speech bubbles) ship as they are
+    
+    width, height = source.get_size()
+    return {
+        "path": path,
+        "file_bytes": os.path.getsize(path),
+        "staged_bytes": os.path.getsize(target),
+        "decoded_bytes": width * height * 4,  # The source as RGBA, briefly held while loading it
+        "runtime_bytes": sum(image.get_width() * image.get_height() * image.get_bytesize()
+                             for image in load_variants(path).values()),  # Every variant kept (32-bit mode)
+    }
+
+def stage_assets(paths, out_dir="dist", jobs=None):
+    """Stage several images, in a process pool when there are enough; returns path -> report row"""
+    if len(paths) < POOL_MIN_IMAGES:
+        return {path: stage_image(path, out_dir) for path in paths}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return dict(zip(paths, pool.map(stage_image, paths, [out_dir] * len(paths))))
+
+def print_asset_report(rows, data_files=(), skipped=()):
+    """Print the per-image sizes from stage_assets with totals, then the other files shipped and any skipped"""
+    print(f"   {'Image':55} {'File':>10} {'Shipped':>10} {'Decoded':>10} {'Runtime':>10}")
+    columns = ["file_bytes", "staged_bytes", "decoded_bytes", "runtime_bytes"]
+    for row in rows:
+        print(f"   {row['path']:55} " + " ".join(f"{row[column] / 1024:7.1f} KB" for column in columns))
+    print(f"   {'Total':55} " + " ".join(f"{sum(row[column] for row in rows) / 1024:7.1f} KB" for column in columns))
+    for path in data_files:
+        print(f"   {path:55} {os.path.getsize(path) / 1024:7.1f} KB (shipped as is)")
+    for path in skipped:
+        print(f"⚠️ Skipped {path} - no loader looks for it")
+
+def directory_bytes(path):
+    """Total size of the files under path"""
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+def check_budgets(out_dir, bundle_bytes, web_budget_mb):
+    """Exit with an error if out_dir or the web bundle is over its budget"""
+    over = []
+    for name, used, budget_mb in (("Build", directory_bytes(out_dir), BUILD_BUDGET_MB),
+                                  ("Web bundle", bundle_bytes, web_budget_mb)):
+        status = "✅" if used <= budget_mb * MB else "❌"
+        print(f"{status} {name}: {used / MB:.2f} MB of {budget_mb} MB")
+        if status == "❌":
+            over.append(name)
+    if over:
+        print(f"❌ Over budget: {', '.join(over)} - shrink the assets or raise the budget on purpose")
+        sys.exit(1)
+
+def build_web(out_dir="dist", web_budget_mb=WEB_BUDGET_MB, clean=False, jobs=None):
+    """Build static web deployment files, redoing only what changed since the last build"""
     print("🎮 Building Catastrophe Civ for web...")
+    start = time.perf_counter()
     
     # Create dist directory
-    os.makedirs("dist", exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {} if clean else load_manifest(out_dir)
+    built = manifest.get("files", {})  # Output path -> hashes from the last build
+    files = {}  # The same for this build
     
     try:
-        # Copy game assets
-        print("📁 Copying game assets...")
+        # Copy the game itself
+        files_copied = 0
+        game = game_files()
+        for name in game:
+            digest = file_hash(name)
+            if not is_fresh(built.get(name), digest, os.path.join(out_dir, name)):
+                shutil.copy2(name, out_dir)
+                files_copied += 1
+            files[name] = {"input": digest, "output": digest}
+        print(f"✅ Game files: {files_copied} copied, {len(game) - files_copied} unchanged")
         
-        # Copy main files
-        if os.path.exists("main.py"):
-            shutil.copy2("main.py", "dist/")
-            print("✅ Copied main.py")
-            
-        if os.path.exists("background.png"):
-            shutil.copy2("background.png", "dist/")
-            print("✅ Copied background.png")
-            
-        # Copy Assets directory
-        if os.path.exists("Assets"):
-            if os.path.exists("dist/Assets"):
-                shutil.rmtree("dist/Assets")
-            shutil.copytree("Assets", "dist/Assets")
-            print("Copied Assets directory")
+        # Only the images the game loads, shrunk to draw size (the Assets tree is ~15 MB of 1024px sources),
+        # plus the sheets, sounds and disaster strips its loaders find
+        tool_hash = file_hash("assets.py", f"stage {STAGE_VERSION}".encode())
+        tables_hash = loaders_hash()
+        images, optional = asset_tables(manifest, tables_hash)
+        sheets, data_files, skipped = pick_optional(optional, images)
+        data_copied = copy_files(data_files, out_dir, built, files)
+        print(f"✅ Sounds and disaster strips: {data_copied} copied, {len(data_files) - data_copied} unchanged")
+        paths = []
+        for path in images + sheets:
+            if os.path.exists(path):
+                paths.append(path)
+            else:
+                print(f"⚠️ Skipping missing {path}")
+        digests = {path: file_hash(path, tool_hash.encode()) for path in paths}
+        changed = [path for path in paths if not is_fresh(built.get(path), digests[path], os.path.join(out_dir, path))]
+        rows = stage_assets(changed, out_dir, jobs)
+        for path in paths:
+            row = rows.get(path) or built[path]["report"]
+            files[path] = {"input": digests[path], "output": file_hash(os.path.join(out_dir, path)), "report": row}
+        print(f"✅ Images: {len(changed)} staged, {len(paths) - len(changed)} unchanged")
         
         # Create web-friendly index.html
-        index_path = os.path.join("dist", "index.html")
-        print("Creating index.html...")
-        with open(index_path, "w", encoding="utf-8") as f:
-            f.write("""<!DOCTYPE html>
+        index_path = os.path.join(out_dir, "index.html")
+        index_html = """<!DOCTYPE html>
 <html>
 <head>
     <title>Catastrophe Civ</title>
@@ -136,14 +458,149 @@ def build_web():
         </p>
     </div>
 </body>
-</html>""")
+</html>"""
+        if write_if_changed(index_path, index_html):
+            print("✅ Wrote index.html")
+        
+        # Outputs of the last build that this one no longer makes (a module or image that was removed)
+        for name in built.keys() - files.keys():
+            if os.path.exists(os.path.join(out_dir, name)):
+                os.remove(os.path.join(out_dir, name))
+                print(f"🗑️ Removed stale {name}")
         
-        print("Static deployment ready!")
+        write_if_changed(os.path.join(out_dir, MANIFEST_FILE),
+                         json.dumps({"tables": tables_hash, "images": images, "optional": optional, "files": files},
+                                    indent=2))
+        print(f"Static deployment ready in {(time.perf_counter() - start) * 1000:.0f} ms!")
+        
+        # Size report and budgets (baked sprites count towards the bundle when they are there)
+        report_rows = [files[path]["report"] for path in paths]
+        print_asset_report(report_rows, data_files, skipped)
+        bundle_bytes = (sum(os.path.getsize(os.path.join(out_dir, name)) for name in game + data_files)
+                        + sum(row["staged_bytes"] for row in report_rows)
+                        + directory_bytes(os.path.join(out_dir, "Baked")))
+        write_if_changed(os.path.join(out_dir, REPORT_FILE),
+                         json.dumps({"images": report_rows, "files": data_files, "skipped": skipped,
+                                     "bundle_bytes": bundle_bytes, "web_budget_mb": web_budget_mb,
+                                     "build_budget_mb": BUILD_BUDGET_MB}, indent=2))
+        check_budgets(out_dir, bundle_bytes, web_budget_mb)
         print("Ready for Vercel deployment!")
         
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
 
+def pack_baked(bake_dir, archive_path):
+    """Pack bake_assets output into one uncompressed zip (the PNGs are compressed already); returns the file count"""
+    count = 0
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_STORED) as archive:
+        for root, dirs, names in os.walk(os.path.join(bake_dir, "Baked")):
+            dirs.sort()
+            for name in sorted(names):
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, bake_dir).replace(os.sep, "/"))
+                count += 1
+    return count
+
+def compressed_bytes(path):
+    """Size of a directory zipped with deflate, about what pygbag packs it into for the browser to download"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for root, _, names in os.walk(path):
+            for name in names:
+                archive.write(os.path.join(root, name), os.path.relpath(os.path.join(root, name), path))
+    return len(buffer.getvalue())
+
+def time_first_frame(app_dir, runs=FIRST_FRAME_RUNS):
+    """Launch the game in app_dir headless (no browser, dummy SDL drivers) runs times; returns the seconds to each first frame"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", FIRST_FRAME_CHECK], cwd=app_dir, env=env,
+                                capture_output=True, text=True, timeout=120)
+        elapsed = time.perf_counter() - start
+        if "FIRST FRAME" not in result.stdout:
+            print(f"❌ The game never drew a frame:\n{(result.stdout + result.stderr)[-2000:]}")
+            sys.exit(1)
+        if "palette=True" not in result.stdout:
+            print("⚠️ The game did not pick up the baked archive (started in 32-bit mode)")
+        times.append(elapsed)
+    return times
+
+def build_pygbag(out_dir="dist", web_budget_mb=WEB_BUDGET_MB):
+    """Build the app folder python -m pygbag turns into the browser version, then check its size and startup"""
+    print("🎮 Building Catastrophe Civ for pygbag...")
+    start = time.perf_counter()
+    from assets import BAKED_ARCHIVE
+    
+    app_dir = os.path.join(out_dir, PYGBAG_DIR)
+    if os.path.exists(app_dir):
+        shutil.rmtree(app_dir)
+    os.makedirs(app_dir)
+    
+    # Baked 8-bit sprites (every size the game draws) in one file, so no source art ships at all
+    with tempfile.TemporaryDirectory() as bake_dir:
+        bake_assets(bake_dir)
+        packed = pack_baked(bake_dir, os.path.join(app_dir, BAKED_ARCHIVE))
+    print(f"✅ Packed {packed} baked files into {BAKED_ARCHIVE} "
+          f"({os.path.getsize(os.path.join(app_dir, BAKED_ARCHIVE)) / 1024:.1f} KB)")
+    
+    # The game as a module run by a launcher, precompiled (sources stay for a runtime with another Python version)
+    modules = []
+    for name in game_files():
+        target = GAME_MODULE + ".py" if name == "main.py" else name
+        shutil.copy2(name, os.path.join(app_dir, target))
+        if target.endswith(".py"):
+            modules.append(target)
+    with open(os.path.join(app_dir, "main.py"), "w", encoding="utf-8") as f:
+        f.write(LAUNCHER)
+    for name in modules:
+        py_compile.compile(os.path.join(app_dir, name), doraise=True,
+                           invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    print(f"✅ Precompiled {len(modules)} modules for {sys.implementation.cache_tag} "
+          f"(pygbag's runtime uses them when its Python matches, else the sources)")
+    
+    # Sounds and disaster strips as they are (villager sheets are in the archive, baked with the sprites)
+    init_pygame()
+    from assets import SPRITE_SIZES
+    _, data_files, skipped = pick_optional(optional_assets(), list(SPRITE_SIZES))
+    copy_files(data_files, app_dir, {}, {})
+    print(f"✅ Copied {len(data_files)} sounds and disaster strips")
+    for path in skipped:
+        print(f"⚠️ Skipped {path} - no loader looks for it")
+    print(f"App folder ready in {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    # What the browser downloads, and how long the game takes to show something
+    transfer_bytes = compressed_bytes(app_dir)
+    times = time_first_frame(app_dir)
+    print(f"📦 Transfer size: {transfer_bytes / 1024:.1f} KB compressed ({directory_bytes(app_dir) / 1024:.1f} KB unpacked)")
+    print(f"⏱️ Time to first frame: best {min(times) * 1000:.0f} ms, "
+          f"median {sorted(times)[len(times) // 2] * 1000:.0f} ms over {len(times)} headless launches")
+    check_budgets(app_dir, transfer_bytes, web_budget_mb)
+    
+    if importlib.util.find_spec("pygbag") is None:
+        print(f"ℹ️ pygbag is not installed - pip install pygbag, then: python -m pygbag {app_dir}")
+        return
+    subprocess.run([sys.executable, "-m", "pygbag", "--build", app_dir], check=True)
+    print(f"✅ pygbag build in {os.path.join(app_dir, 'build', 'web')}")
+
 if __name__ == "__main__":
-    build_web()
+    parser = argparse.ArgumentParser(description="Build Catastrophe Civ")
+    parser.add_argument("target", nargs="?", choices=["web", "bake", "pygbag", "formats"], default="web",
+                        help="web: static deployment in dist/ (default); bake: 8-bit palette sprites in dist/Baked; "
+                             "pygbag: browser app folder in dist/pygbag; formats: report the blit format of every sprite")
+    parser.add_argument("--out", default="dist", help="output directory (default dist)")
+    parser.add_argument("--web-budget", type=float, default=WEB_BUDGET_MB, metavar="MB",
+                        help=f"fail the web build if the game files come to more than this (default {WEB_BUDGET_MB} MB)")
+    parser.add_argument("--clean", action="store_true", help="ignore the last build's manifest and rebuild everything")
+    parser.add_argument("--jobs", type=int, metavar="N", help="worker processes for staging images (default: CPU count)")
+    args = parser.parse_args()
+    if args.target == "bake":
+        bake_assets(args.out)
+    elif args.target == "pygbag":
+        build_pygbag(args.out, args.web_budget)
+    elif args.target == "formats":
+        report_formats()
+    else:
+        build_web(args.out, args.web_budget, args.clean, args.jobs)
@@ -0,0 +1,155 @@
+"""
+Rolling gameplay clips for Catastrophe Civ
+
+ClipBuffer keeps the last few seconds of the base surface in memory so the
+player can save a clip of what just happened with one key. Frames are
+captured at a lower rate than the game runs (GIFs don't need 60 FPS). Each
+one is quantized to a fixed 256-color palette with a single blit onto an
+8-bit surface and stored zlib-compressed, already laid out as PNG image
+data. A frame that didn't change since the last capture reuses the previous
+frame's bytes. The buffer is bounded by frame count and by total bytes.
+
+Saving hands the frames to a background thread. It writes an animated GIF
+if Pillow is installed and a numbered PNG sequence otherwise. Encoding is
+mostly zlib and Pillow work, which release the GIL, so the game loop keeps
+running while a clip is written.
+"""
+import io
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+
+import pygame
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None  # Pillow is not installed - clips are saved as PNG frame sequences
+
+CLIP_DIR = "Clips"
+CLIP_SECONDS = 30
+CLIP_FPS = 20
+CLIP_MAX_BYTES = 64 * 1024 * 1024  # Memory cap for the compressed frames
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def png_chunk(kind, data):
+    """One PNG chunk: length, type, data and CRC"""
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def make_png(size, palette, image_data):
+    """An 8-bit palette PNG file from compressed image data (as stored by ClipBuffer)"""
+    width, height = size
+    header = struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)  # 8-bit, palette color, no interlace
+    return (PNG_SIGNATURE + png_chunk(b"IHDR", header) + png_chunk(b"PLTE", palette)
+            + png_chunk(b"IDAT", image_data) + png_chunk(b"IEND", b""))
+
+def encode_clip(frames, size, palette, fps, path):
+    """Write frames as path.gif (with Pillow) or as path/frame_0000.png ...; returns what was written"""
+    if Image is not None:
+        images = [Image.open(io.BytesIO(make_png(size, palette, frame))) for frame in frames]
+        gif_path = path + ".gif"
+        images[0].save(gif_path, save_all=True, append_images=images[1:],
+                       duration=int(1000 / fps), loop=0, optimize=False)
+        return gif_path
+    os.makedirs(path, exist_ok=True)
+    for index, frame in enumerate(frames):
+        with open(os.path.join(path, f"frame_{index:04d}.png"), "wb") as f:
+            f.write(make_png(size, palette, frame))
+    return path
+
+def _encode_in_background(frames, size, palette, fps, path):
+    """Thread body: encode a clip and report how it went"""
+    start = time.perf_counter()
+    try:
+        written = encode_clip(frames, size, palette, fps, path)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error saving clip {path}: {e}")
+        return
+    print(f"🎬 Saved {len(frames)} frame clip to {written} in {time.perf_counter() - start:.1f}s")
+
+class ClipBuffer:
+    """The last few seconds of gameplay as palette-quantized, compressed frames"""
+    def __init__(self, size=(640, 360), seconds=CLIP_SECONDS, fps=CLIP_FPS, max_bytes=CLIP_MAX_BYTES):
+        self.size = size
+        self.fps = fps
+        self.max_bytes = max_bytes
+        self.frames = deque(maxlen=seconds * fps)
+        self.total_bytes = 0  # Compressed bytes held (a repeated frame counts again)
+        self.since_capture = 0.0  # Seconds since the last captured frame
+        self.previous_indices = None  # Raw palette indices of the last capture, to spot repeats
+        self.quantized = pygame.Surface(size, 0, 8)  # Blitting onto this maps colors to its palette
+        self.palette = b"".join(bytes(color[:3]) for color in self.quantized.get_palette())
+        self.encoders = []  # Background threads still writing clips
+
+    @property
+    def seconds(self):
+        """Length of gameplay held right now"""
+        return len(self.frames) / self.fps
+
+    @property
+    def encoding(self):
+        """True while a saved clip is still being written"""
+        self.encoders = [thread for thread in self.encoders if thread.is_alive()]
+        return bool(self.encoders)
+
+    def update(self, surface, dt):
+        """Capture surface for every frame due at the clip frame rate since the last update"""
+        self.since_capture += dt
+        if self.since_capture < 1 / self.fps:
+            return
+        # A long frame (the game loop resting on a static screen) held the same picture for several clip frames
+        frames_due = min(int(self.since_capture * self.fps), self.frames.maxlen)
+        self.since_capture = min(self.since_capture - frames_due / self.fps, 1 / self.fps)
+        for _ in range(frames_due):
+            self.capture(surface)
+
+    def capture(self, surface):
+        """Quantize, compress and append one frame, dropping the oldest ones past the limits"""
+        self.quantized.blit(surface, (0, 0))
+        indices = pygame.image.tobytes(self.quantized, "P")
+        if indices == self.previous_indices:
+            frame = self.frames[-1]  # Nothing moved (frozen dialog, end screen) - share the bytes
+        else:
+            self.previous_indices = indices
+            # Filter byte 0 before every row makes the compressed data valid PNG image data as is
+            row_bytes = self.size[0]
+            rows = [indices[offset:offset + row_bytes] for offset in range(0, len(indices), row_bytes)]
+            frame = zlib.compress(b"\x00" + b"\x00".join(rows), 1)
+
+        if len(self.frames) == self.frames.maxlen:
+            self.total_bytes -= len(self.frames[0])
+        self.frames.append(frame)
+        self.total_bytes += len(frame)
+        while self.total_bytes > self.max_bytes and len(self.frames) > 1:
+            self.total_bytes -= len(self.frames.popleft())
+
+    def clear(self):
+        """Forget every captured frame"""
+        self.frames.clear()
+        self.total_bytes = 0
+        self.previous_indices = None
+
+    def save(self, directory=CLIP_DIR):
+        """Write the buffered frames in a background thread; returns the output path (without extension)"""
+        if not self.frames:
+            print("❌ No gameplay captured yet - nothing to save")
+            return None
+        os.makedirs(directory, exist_ok=True)
+        base_path = path = os.path.join(directory, time.strftime("clip_%Y%m%d_%H%M%S"))
+        copy = 1
+        while os.path.exists(path) or os.path.exists(path + ".gif"):
+            copy += 1  # Two clips saved within the same second
+            path = f"{base_path}_{copy}"
+        frames = list(self.frames)  # Snapshot - capturing carries on while this clip is written
+        args = (frames, self.size, self.palette, self.fps, path)
+        try:
+            thread = threading.Thread(target=_encode_in_background, args=args, daemon=True)
+            thread.start()
+            self.encoders.append(thread)
+        except RuntimeError:
+            _encode_in_background(*args)  # No threads (e.g. in the browser) - write it now
+        print(f"🎬 Saving the last {len(frames) / self.fps:.0f}s as a clip...")
+        return path
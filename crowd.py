@@ -0,0 +1,133 @@
+"""
+Crowd separation for Catastrophe Civ villagers
+
+Villagers are dropped into a uniform grid of buckets (one bucket per
+cell_size x cell_size square), so finding the villagers near a point only
+looks at the 3x3 buckets around it instead of the whole crowd. Separation
+steering uses those neighbour queries to nudge overlapping villagers apart.
+
+Works on any objects with x and y attributes. Pure Python with no pygame
+dependency.
+"""
+import math
+
+KEY_STRIDE = 1 << 16  # Bucket key = column * KEY_STRIDE + row (rows never get this large)
+
+# Key offsets of the 3x3 block of buckets around a bucket, its own bucket first
+# (in a dense crowd the neighbour cap is usually reached without leaving it)
+NEIGHBOUR_OFFSETS = [0] + [
+    dx * KEY_STRIDE + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1) if dx or dy
+]
+
+class SpatialGrid:
+    """Uniform bucket grid for neighbour queries.
+
+    Each item's current bucket key is kept on item.grid_key, so a moved item
+    can be re-bucketed on its own with move() instead of rebuilding the grid.
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.buckets = {}  # Bucket key -> list of items
+        self.count = 0  # Items in the grid
+
+    def key(self, x, y):
+        """Bucket key for the point (x, y)"""
+        return int(x // self.cell_size) * KEY_STRIDE + int(y // self.cell_size)
+
+    def rebuild(self, items):
+        """Drop every item into its bucket (replaces the previous contents)"""
+        size = self.cell_size
+        buckets = {}
+        for item in items:
+            key = int(item.x // size) * KEY_STRIDE + int(item.y // size)
+            item.grid_key = key
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = [item]
+            else:
+                bucket.append(item)
+        self.buckets = buckets
+        self.count = len(items)
+
+    def move(self, item):
+        """Re-bucket one item after it moved (cheap when it stayed in the same bucket)"""
+        key = int(item.x // self.cell_size) * KEY_STRIDE + int(item.y // self.cell_size)
+        if key != item.grid_key:
+            old_bucket = self.buckets[item.grid_key]
+            old_bucket.remove(item)
+            if not old_bucket:
+                del self.buckets[item.grid_key]
+            self.buckets.setdefault(key, []).append(item)
+            item.grid_key = key
+
+    def move_all(self, items):
+        """Re-bucket every item after a step in which any of them may have moved"""
+        for item in items:
+            self.move(item)
+
+    def query(self, x, y, radius):
+        """Items within radius of (x, y); radius must not exceed cell_size"""
+        radius_sq = radius * radius
+        buckets = self.buckets
+        key = self.key(x, y)
+        found = []
+        for offset in NEIGHBOUR_OFFSETS:
+            bucket = buckets.get(key + offset)
+            if bucket:
+                for item in bucket:
+                    dx = item.x - x
+                    dy = item.y - y
+                    if dx * dx + dy * dy < radius_sq:
+                        found.append(item)
+        return found
+
+def separate(items, grid, radius, strength, max_neighbours=4, can_move_to=None):
+    """Push each item away from up to max_neighbours others closer than radius.
+
+    items must already be in grid; each one is re-bucketed before its
+    neighbours are looked up and again after it is pushed. The push falls off linearly from strength
+    pixels at zero distance to nothing at radius. can_move_to(x, y), if
+    given, can veto a push (for example one that would step into a
+    building). Returns how many items moved.
+    """
+    buckets = grid.buckets
+    radius_sq = radius * radius
+    moved = 0
+    for item in items:
+        grid.move(item)
+        x = item.x
+        y = item.y
+        key = item.grid_key
+        push_x = push_y = 0.0
+        found = 0
+        for offset in NEIGHBOUR_OFFSETS:
+            bucket = buckets.get(key + offset)
+            if not bucket:
+                continue
+            for other in bucket:
+                dx = x - other.x
+                dy = y - other.y
+                distance_sq = dx * dx + dy * dy
+                if distance_sq >= radius_sq or other is item:
+                    continue
+                if distance_sq == 0:
+                    # Exactly on top of each other: split them along x in a consistent direction
+                    dx, distance_sq = (1.0 if id(item) > id(other) else -1.0), 1.0
+                distance = math.sqrt(distance_sq)
+                weight = (radius - distance) / (radius * distance)
+                push_x += dx * weight
+                push_y += dy * weight
+                found += 1
+                if found >= max_neighbours:
+                    break
+            if found >= max_neighbours:
+                break
+        if found:
+            new_x = x + push_x * strength
+            new_y = y + push_y * strength
+            if can_move_to is None or can_move_to(new_x, new_y):
+                item.x = new_x
+                item.y = new_y
+                grid.move(item)
+                moved += 1
+    return moved
@@ -0,0 +1,232 @@
+"""
+Disaster sequences for Catastrophe Civ
+
+When the timer runs out one of four disasters (giant cat, tomato, shark,
+explosion) plays over the last frame of the town. Each disaster is a short
+oversized animation of 3-5 frames with screen shake and particle bursts.
+
+Frames are loaded only for the disaster that was picked, from a horizontal
+strip Assets/Disasters/<name>.png (frames side by side), and scaled to their
+display size once. Disasters without a strip get placeholder frames drawn
+once with pygame.draw. Timing comes from the game clock's dt, and release()
+drops the frames once the sequence is over, so the three disasters that
+weren't picked never use any memory.
+"""
+import os
+import random
+
+import pygame
+
+from palette import match_format
+
+DISASTER_DIR = "Assets/Disasters"
+
+class DisasterSpec:
+    """How one disaster looks and plays: frame size, on-screen positions, timing, shake and particles"""
+    def __init__(self, name, label, size, positions, fps, shake, hold=1.0, bursts=None):
+        self.name = name
+        self.label = label  # Shown on the end screen
+        self.size = size  # Display size of every frame
+        self.positions = positions  # Center of each frame on the base surface (also sets the frame count)
+        self.fps = fps
+        self.shake = shake  # Screen shake amplitude in pixels for each frame
+        self.hold = hold  # Seconds the last frame stays up before the end screen
+        # Frame index -> [(particle kind, count, speed, life)], emitted from the frame's center
+        self.bursts = bursts or {}
+
+    @property
+    def frame_count(self):
+        return len(self.positions)
+
+    @property
+    def duration(self):
+        """Total seconds from the first frame until the sequence finishes"""
+        return self.frame_count / self.fps + self.hold
+
+DISASTERS = {
+    "cat": DisasterSpec("cat", "A giant cat", (320, 240),
+                        [(320, 470), (320, 390), (320, 300), (320, 250)], fps=5, shake=[0, 2, 4, 7],
+                        bursts={2: [("rubble", 300, 140, 1.2)], 3: [("rubble", 800, 200, 1.5)]}),
+    "tomato": DisasterSpec("tomato", "A giant tomato", (200, 200),
+                           [(320, -60), (320, 40), (320, 140), (320, 200)], fps=6, shake=[0, 0, 0, 10],
+                           bursts={3: [("splat", 2000, 260, 1.6), ("rubble", 300, 160, 1.2)]}),
+    "shark": DisasterSpec("shark", "A land shark", (280, 200),
+                          [(320, 330), (320, 290), (320, 250), (320, 210)], fps=5, shake=[0, 1, 3, 8],
+                          bursts={1: [("splash", 300, 120, 0.8)], 2: [("splash", 500, 150, 0.9)],
+                                  3: [("splash", 1200, 220, 1.2), ("rubble", 400, 180, 1.2)]}),
+    "explosion": DisasterSpec("explosion", "An explosion", (300, 300),
+                              [(320, 180)] * 5, fps=8, shake=[3, 8, 12, 6, 2],
+                              bursts={0: [("spark", 1500, 280, 0.8)], 1: [("rubble", 1200, 220, 1.4)],
+                                      3: [("smoke", 600, 60, 2.0)]}),
+}
+
+def _draw_cat(surface, index, count):
+    """Giant orange cat rising over the island, eyes narrowing"""
+    width, height = surface.get_size()
+    orange, dark = (235, 140, 40), (160, 80, 20)
+    head = pygame.Rect(width // 8, height // 4, width * 3 // 4, height * 3 // 4)
+    pygame.draw.polygon(surface, orange, [(head.left + 10, head.top + 40), (head.left + 40, 0), (head.left + 100, head.top + 10)])
+    pygame.draw.polygon(surface, orange, [(head.right - 10, head.top + 40), (head.right - 40, 0), (head.right - 100, head.top + 10)])
+    pygame.draw.ellipse(surface, orange, head)
+    pygame.draw.ellipse(surface, dark, head, 4)
+    eye_height = max(6, 40 - index * 10)  # Eyes narrow as it closes in
+    for eye_x in (head.centerx - 60, head.centerx + 60):
+        eye = pygame.Rect(0, 0, 40, eye_height)
+        eye.center = (eye_x, head.centery - 20)
+        pygame.draw.ellipse(surface, (120, 220, 90), eye)
+        pygame.draw.line(surface, (0, 0, 0), (eye_x, eye.top + 2), (eye_x, eye.bottom - 2), 4)
+    pygame.draw.polygon(surface, (240, 130, 160), [(head.centerx - 12, head.centery + 10), (head.centerx + 12, head.centery + 10), (head.centerx, head.centery + 24)])
+
+def _draw_tomato(surface, index, count):
+    """Tomato falling from the sky, splatting on the last frame"""
+    width, height = surface.get_size()
+    red, leaf = (220, 40, 30), (60, 160, 50)
+    if index < count - 1:
+        radius = width // 3
+        pygame.draw.circle(surface, red, (width // 2, height // 2), radius)
+        pygame.draw.circle(surface, (255, 120, 100), (width // 2 - radius // 3, height // 2 - radius // 3), radius // 4)
+        for angle in range(0, 360, 72):
+            tip = pygame.math.Vector2(0, -radius // 2).rotate(angle)
+            pygame.draw.line(surface, leaf, (width // 2, height // 2 - radius + 6),
+                             (width // 2 + tip.x, height // 2 - radius + 6 + tip.y // 2), 6)
+    else:
+        splat = random.Random(7)  # Same splat every time
+        for _ in range(14):
+            blob_radius = splat.randint(10, 40)
+            center = (width // 2 + splat.randint(-70, 70), height // 2 + splat.randint(-50, 50))
+            pygame.draw.circle(surface, red, center, blob_radius)
+
+def _draw_shark(surface, index, count):
+    """Shark fin cutting through the island, then jaws"""
+    width, height = surface.get_size()
+    gray, white = (110, 120, 135), (245, 245, 245)
+    if index < count - 1:
+        fin_height = height // 3 + index * height // 6
+        pygame.draw.polygon(surface, gray, [(width // 2 - 60, height), (width // 2 + 50, height), (width // 2 + 10, height - fin_height)])
+    else:
+        jaw = pygame.Rect(width // 8, height // 8, width * 3 // 4, height * 3 // 4)
+        pygame.draw.ellipse(surface, gray, jaw)
+        pygame.draw.ellipse(surface, (120, 20, 30), jaw.inflate(-60, -80))
+        for tooth in range(6):
+            tooth_x = jaw.left + 45 + tooth * (jaw.width - 90) // 5
+            pygame.draw.polygon(surface, white, [(tooth_x - 10, jaw.top + 40), (tooth_x + 10, jaw.top + 40), (tooth_x, jaw.top + 65)])
+            pygame.draw.polygon(surface, white, [(tooth_x - 10, jaw.bottom - 40), (tooth_x + 10, jaw.bottom - 40), (tooth_x, jaw.bottom - 65)])
+
+def _draw_explosion(surface, index, count):
+    """Fireball growing and fading to smoke"""
+    width, height = surface.get_size()
+    center = (width // 2, height // 2)
+    growth = (index + 1) / count
+    if index < count - 1:
+        for color, scale in (((200, 40, 20), 1.0), ((255, 140, 0), 0.7), ((255, 230, 80), 0.4)):
+            pygame.draw.circle(surface, color, center, int(width / 2 * growth * scale))
+    else:
+        smoke = random.Random(3)
+        for _ in range(12):
+            puff = (center[0] + smoke.randint(-90, 90), center[1] + smoke.randint(-90, 90))
+            pygame.draw.circle(surface, (90, 90, 90, 200), puff, smoke.randint(25, 55))
+
+PLACEHOLDER_ART = {
+    "cat": _draw_cat,
+    "tomato": _draw_tomato,
+    "shark": _draw_shark,
+    "explosion": _draw_explosion,
+}
+
+def load_frames(spec, surface_format=None):
+    """Frames for one disaster at display size: sliced from its strip, or placeholder art.
+
+    With a surface_format (the 8-bit base surface in palette mode) frames are converted to match it.
+    """
+    strip_path = os.path.join(DISASTER_DIR, f"{spec.name}.png")
+    if os.path.exists(strip_path):
+        strip = pygame.image.load(strip_path).convert_alpha()
+        frame_width = strip.get_width() // spec.frame_count
+        frames = [
+            pygame.transform.scale(strip.subsurface((i * frame_width, 0, frame_width, strip.get_height())), spec.size)
+            for i in range(spec.frame_count)
+        ]
+        print(f"✅ Loaded disaster frames for {spec.name}")
+    else:
+        frames = []
+        for i in range(spec.frame_count):
+            frame = pygame.Surface(spec.size, pygame.SRCALPHA)
+            PLACEHOLDER_ART[spec.name](frame, i, spec.frame_count)
+            frames.append(frame)
+    if surface_format is not None:
+        frames = [match_format(frame, surface_format) for frame in frames]
+    return tuple(frames)
+
+class DisasterSequence:
+    """One disaster playing: frame index and screen shake from elapsed game time"""
+    def __init__(self, spec, frames, seed=None):
+        self.spec = spec
+        self.frames = frames
+        self.elapsed = 0.0
+        self.rng = random.Random(seed)
+
+    @property
+    def finished(self):
+        return self.elapsed >= self.spec.duration
+
+    @property
+    def frame_index(self):
+        return min(int(self.elapsed * self.spec.fps), self.spec.frame_count - 1)
+
+    def update(self, dt):
+        """Advance by dt seconds of game time; returns the new frame index if the frame changed"""
+        previous_index = self.frame_index
+        self.elapsed += dt
+        if self.frame_index != previous_index:
+            return self.frame_index
+        return None
+
+    def emit_bursts(self, particles, index):
+        """Emit the particle bursts for frame index from the frame's center"""
+        x, y = self.spec.positions[index]
+        for kind, count, speed, life in self.spec.bursts.get(index, ()):
+            particles.emit(kind, count, x, y, speed=speed, life=life)
+
+    def shake_offset(self):
+        """Random screen offset for the current frame (fades out during the hold)"""
+        amplitude = self.spec.shake[self.frame_index]
+        hold_time = self.elapsed - self.spec.frame_count / self.spec.fps
+        if hold_time > 0:
+            amplitude = amplitude * max(0.0, 1 - hold_time / self.spec.hold)
+        amplitude = int(amplitude)
+        if amplitude == 0:
+            return 0, 0
+        return self.rng.randint(-amplitude, amplitude), self.rng.randint(-amplitude, amplitude)
+
+    def draw(self, surface, backdrop):
+        """Draw the shaken backdrop and the current frame onto surface"""
+        offset_x, offset_y = self.shake_offset()
+        if offset_x or offset_y:
+            surface.fill((0, 0, 0))  # Edges uncovered by the shake
+        surface.blit(backdrop, (offset_x, offset_y))
+        frame = self.frames[self.frame_index]
+        center_x, center_y = self.spec.positions[self.frame_index]
+        frame_rect = frame.get_rect(center=(center_x + offset_x, center_y + offset_y))
+        surface.blit(frame, frame_rect)
+
+class DisasterEngine:
+    """Picks a disaster, loads only its frames, and frees them when it is done"""
+    def __init__(self, specs=DISASTERS, surface_format=None):
+        self.specs = specs
+        self.surface_format = surface_format  # Frames are converted to this surface's format if given
+        self.sequence = None  # Disaster playing now (None between runs)
+
+    @property
+    def loaded_frames(self):
+        """Frame surfaces held right now (only ever the current disaster's)"""
+        return len(self.sequence.frames) if self.sequence else 0
+
+    def start(self, name=None, rng=random):
+        """Load and start a disaster (random if no name is given)"""
+        spec = self.specs[name] if name else rng.choice(list(self.specs.values()))
+        self.sequence = DisasterSequence(spec, load_frames(spec, self.surface_format))
+        return self.sequence
+
+    def release(self):
+        """Drop the current disaster and its frames"""
+        self.sequence = None
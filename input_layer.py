@@ -0,0 +1,104 @@
+"""
+Per-frame input collection for Catastrophe Civ
+
+The event queue is drained once per frame. Mouse motion is folded into a
+single latest pointer position (high polling rate mice can post hundreds
+of MOUSEMOTION events a frame), and window coordinates are converted to
+base-surface coordinates once, so hover hit-testing runs once per frame
+instead of once per motion event. While nothing on screen changes, the
+game loop sleeps in InputState.wait instead of polling, and the event that
+wakes it is handed to the next poll like any other.
+"""
+import json
+
+import pygame
+
+# Events that carry a pointer position worth converting to base coordinates
+POINTER_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP)
+
+def to_base_coords(window_pos, scale):
+    """Convert a window position to base surface coordinates"""
+    return window_pos[0] // scale, window_pos[1] // scale
+
+class FrameInput:
+    """Everything that happened since the last frame"""
+    def __init__(self, pointer_pos):
+        self.events = []  # Every non-motion event, in arrival order
+        self.pointer_pos = pointer_pos  # Latest pointer position in base coordinates
+        self.mouse_moved = False  # True if any MOUSEMOTION arrived this frame
+        self.motion_count = 0  # Raw MOUSEMOTION events folded into pointer_pos
+
+class InputState:
+    """Drains the event queue once per frame and remembers where the pointer is"""
+    def __init__(self, scale):
+        self.scale = scale
+        self.pointer_pos = (-1, -1)  # Off-screen until the mouse first moves
+        self.woken_by = []  # Event wait() took off the queue, delivered by the next poll
+    
+    def wait(self, timeout_ms):
+        """Sleep until an event arrives or timeout_ms passes, whichever comes first"""
+        event = pygame.event.wait(max(1, int(timeout_ms)))
+        if event.type != pygame.NOEVENT:
+            self.woken_by.append(event)
+    
+    def poll(self, events=None):
+        """Collect this frame's events (from the pygame queue unless given) into a FrameInput"""
+        if events is None:
+            events = pygame.event.get()
+        if self.woken_by:
+            events = self.woken_by + list(events)
+            self.woken_by = []
+        
+        frame_input = FrameInput(self.pointer_pos)
+        latest_motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                latest_motion = event.pos
+                frame_input.motion_count += 1
+                continue
+            if event.type in POINTER_EVENTS:
+                # Clicks keep their own position, converted once here
+                event.base_pos = to_base_coords(event.pos, self.scale)
+            frame_input.events.append(event)
+        
+        if latest_motion is not None:
+            self.pointer_pos = to_base_coords(latest_motion, self.scale)
+            frame_input.pointer_pos = self.pointer_pos
+            frame_input.mouse_moved = True
+        return frame_input
+
+def load_keymap(path, defaults):
+    """Load action -> key code bindings from a JSON keymap file, falling back to the defaults.
+
+    The file maps action names to a key name or a list of key names (pygame
+    key names such as "escape", "f12", "e", "0"). Actions missing from the
+    file keep their default keys. Unknown key names become None so that the
+    position of every other key in the list is kept.
+    """
+    key_names = {action: list(keys) for action, keys in defaults.items()}
+    try:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+    except FileNotFoundError:
+        overrides = {}
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading keymap {path}: {e} - using default keys")
+        overrides = {}
+    
+    for action, keys in overrides.items():
+        if action not in defaults:
+            print(f"❌ Unknown action '{action}' in {path}")
+            continue
+        key_names[action] = [keys] if isinstance(keys, str) else list(keys)
+    
+    bindings = {}
+    for action, names in key_names.items():
+        codes = []
+        for name in names:
+            try:
+                codes.append(pygame.key.key_code(name))
+            except ValueError:
+                print(f"❌ Unknown key '{name}' for action '{action}' in {path}")
+                codes.append(None)
+        bindings[action] = codes
+    return bindings
@@ -1,18 +1,54 @@
 import pygame
 import sys
-import os
 import random
 import math
 import asyncio
+import time
+import argparse
+import functools
+from collections import deque
 from enum import Enum
 
-# Initialize Pygame
-pygame.init()
+from rendering import RenderQueue, LayeredRenderer
+from input_layer import InputState, to_base_coords, load_keymap
+from town_generator import generate_town
+from navigation import Navigator, ISLAND_NAVIGATOR, NO_PATH, point_in_cell
+from crowd import SpatialGrid, separate
+from animation import AnimationClock, AnimationSet, PHASES
+from disasters import DisasterEngine
+from sound import SoundBank
+from clip import ClipBuffer
+from assets import (VILLAGER_DIR, has_baked_assets, load_sprite, load_variants, optimize_sprite, prepare_frame,
+                    scale_variant, sheet_path, sprite_exists, use_palette)
+from palette import match_format
+try:
+    from particles import ParticleSystem
+except ImportError:
+    ParticleSystem = None  # NumPy is not installed - disasters play without particles
+
+# Initialize Pygame (display and font only - the mixer is opened lazily by the SoundBank)
+pygame.display.init()
+pygame.font.init()
+_START_COUNTER = time.perf_counter()
+
+def get_ticks():
+    """Milliseconds since startup (pygame.time.get_ticks needs pygame.init, which would open the mixer)"""
+    return int((time.perf_counter() - _START_COUNTER) * 1000)
 
 # Constants
 WINDOW_WIDTH = 640
 WINDOW_HEIGHT = 360
-SCALE = 2  # Scale factor for the window
+WINDOW_SCALES = (1, 2, 3)  # Integer window scales, so pixels stay square
+DEFAULT_SCALE = 2
+DIALOG_ZOOM = 2  # Villager, speech bubble and buttons in an open help dialog are drawn at this multiple
+
+def read_scale_setting(argv):
+    """The --scale option (read at import time because the window opens at import time)"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--scale", type=int, choices=WINDOW_SCALES, default=DEFAULT_SCALE)
+    return parser.parse_known_args(argv)[0].scale
+
+SCALE = read_scale_setting(sys.argv[1:])  # Window scale factor, changed at runtime by set_window_scale
 
 # Colors
 BLACK = (0, 0, 0)
@@ -29,6 +65,8 @@ PURPLE = (128, 0, 128)  # House button color
 DARK_PURPLE = (100, 0, 100)  # House button hover color
 YELLOW = (255, 255, 0)  # Highlight color for hoverable spots
 LIGHT_GRAY = (200, 200, 200)  # Empty spot outline color
+DIRT = (160, 120, 80)  # Town path color
+DARK_DIRT = (125, 90, 58)  # Town path edge color
 
 # Game States
 class GameState(Enum):
@@ -42,46 +80,54 @@ GAME_DURATION = 60  # 60 seconds per run
 
 # Building system
 BUILDING_SIZE = 48  # Building tile size (48x48 pixels)
-GRID_SIZE = 32  # Grid size for building placement (keeping smaller for precise positioning)
+GRID_SIZE = 32  # Grid size for building placement (town_generator lays towns out on this grid)
 
-# Game runs automatically with timer
+# Villager population
+VILLAGER_COUNT = 7  # Normal run: one villager per unique sprite
+STRESS_LEVELS = [500, 1000, 2500, 5000, 10000, 20000]  # Debug S key cycles through these
+FRAME_BUDGET_MS = 1000 / 60  # 60 FPS frame budget
+TOWN_POOL_DEPTH = 2  # Towns pre-generated ahead of time on idle frames
+FPS = 60  # Frame rate while anything on screen moves
+REST_MS = 250  # Longest the loop sleeps on a static screen (input wakes it at once)
+RESTING = sys.platform != "emscripten"  # In the browser blocking would stall the page, so only redraws are skipped
+VILLAGER_FOOT_X = 7.5  # Villager feet relative to the sprite's top-left, used for navigation
+VILLAGER_FOOT_Y = 13
+PARTICLE_CAPACITY = 10000  # Preallocated particle slots for disaster debris
+WAYPOINT_RADIUS = 12  # Steer for the next cell once this close to the current waypoint
+SEPARATION_RADIUS = 10  # Villagers closer than this push each other apart (also the crowd grid cell size)
+SEPARATION_STRENGTH = 0.4  # Push in pixels per frame for two villagers standing on the same spot
+SEPARATION_BATCH = 400  # Villagers pushed apart per frame (round robin); the whole crowd is still re-bucketed every frame
 
-# Create the base surface (actual game resolution)
-base_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+# Game runs automatically with timer
 
 # Create the window (scaled up version)
 window = pygame.display.set_mode((WINDOW_WIDTH * SCALE, WINDOW_HEIGHT * SCALE))
 pygame.display.set_caption("Catastrophe Civ")
 
-# Load and scale the background image (AFTER display initialization)
-try:
-    background_img = pygame.image.load("background.png").convert()
-    # Scale the background to match our base resolution
-    background_img = pygame.transform.scale(background_img, (WINDOW_WIDTH, WINDOW_HEIGHT))
-except pygame.error as e:
-    print(f"Error loading background.png: {e}")
-    background_img = None
-
-# Initialize fonts
+# 8-bit palette mode (--palette, or automatic when build.py bake output ships with the game): sprites share
+# one palette and the world is drawn into an 8-bit base surface, expanded to the display format when presented.
+# Decided at import time because the base surface below is made at import time.
+PALETTE_MODE = "--palette" in sys.argv[1:] or has_baked_assets()
+
+# Create the base surface (actual game resolution)
+if PALETTE_MODE:
+    shared_palette = use_palette()
+    base_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), 0, 8)
+    base_surface.set_palette(shared_palette)
+    print(f"🎨 Palette mode: sprites and base surface share one {len(shared_palette)}-color palette")
+else:
+    base_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), 0, window)  # Window format, so it scales straight in
+TEXT_ANTIALIAS = not PALETTE_MODE  # Antialiased text needs per-pixel alpha, which 8-bit blits ignore
+
+# Initialize fonts (the menu only needs these, so it can show before any sprite is loaded)
 font = pygame.font.Font(None, 36)  # Pixel-style font for timer
 title_font = pygame.font.Font(None, 72)  # Large font for title
 button_font = pygame.font.Font(None, 48)  # Medium font for buttons
 
-# Load building assets
+# Sprites, filled in by the asset loader below (None or missing = not loaded yet, or failed and drawn as a fallback)
+background_img = None
 building_images = {}
 building_types = ["House", "Farm", "Factory"]
-
-for building_type in building_types:
-    try:
-        img = pygame.image.load(f"Assets/Buildings/{building_type}.png").convert_alpha()
-        # Scale to building size if needed
-        building_images[building_type] = pygame.transform.scale(img, (BUILDING_SIZE, BUILDING_SIZE))
-        print(f"✅ Loaded {building_type} building")
-    except pygame.error as e:
-        print(f"❌ Error loading {building_type}.png: {e}")
-        building_images[building_type] = None
-
-# Load villager assets
 villager_images = {}
 villager_sprites = [
     "Blacksmith.png", "Farmer_Female.png", "Farmer_Male.png", 
@@ -89,112 +135,225 @@ villager_sprites = [
     "male_basic_villager_2.png", "female_basic_villager_2.png"
 ]
 
-for sprite_name in villager_sprites:
+# Villager animations: (name, frame count, fps), one row each in a sprite sheet
+VILLAGER_ANIMATION_ROWS = [("walk", 4, 8), ("idle", 1, 1), ("talk", 2, 4)]
+VILLAGER_ANIMATION_FPS = max(fps for _, _, fps in VILLAGER_ANIMATION_ROWS)  # Fastest cycle (the others divide it)
+villager_animations = {}  # Sprite name -> AnimationSet shared by every villager using that sprite
+villager_zoomed_animations = {}  # Sprite name -> the same AnimationSet at DIALOG_ZOOM, for an open dialog
+
+# The exclamation, speech bubbles and dialog buttons are loaded at 1x and DIALOG_ZOOM (see assets.SPRITE_SCALES)
+exclamation_img = exclamation_zoomed_img = None
+blacksmith_help_img = blacksmith_help_zoomed_img = None
+farmer_help_img = farmer_help_zoomed_img = None
+help_button_img = help_button_zoomed_img = None
+ignore_button_img = ignore_button_zoomed_img = None
+blacksmith_hammer_img = None
+
+# Shared animation time, advanced once per frame while playing
+animation_clock = AnimationClock()
+
+# Sound effects and music (the mixer opens on the first sound, after the player's first click)
+sound_bank = SoundBank()
+
+def load_background():
+    """Load the background image at base resolution"""
+    global background_img
+    try:
+        background_img = load_sprite("background.png")
+    except pygame.error as e:
+        print(f"Error loading background.png: {e}")
+        background_img = None
+
+def load_building(building_type):
+    """Load one building sprite at building size (BUILDING_SIZE, see assets.SPRITE_SIZES)"""
+    try:
+        building_images[building_type] = load_sprite(f"Assets/Buildings/{building_type}.png")
+        print(f"✅ Loaded {building_type} building")
+    except pygame.error as e:
+        print(f"❌ Error loading {building_type}.png: {e}")
+        building_images[building_type] = None
+
+def load_villager(sprite_name):
+    """Load one villager sprite at 15x15 and its animations (from a sheet, or derived from the still)"""
     try:
-        img = pygame.image.load(f"Assets/Buildings/Villagers/{sprite_name}").convert_alpha()
-        # Scale villagers to 15x15 pixels
-        villager_images[sprite_name] = pygame.transform.scale(img, (15, 15))
+        villager_images[sprite_name] = load_sprite(f"{VILLAGER_DIR}/{sprite_name}")
         print(f"✅ Loaded villager {sprite_name}")
     except pygame.error as e:
         print(f"❌ Error loading {sprite_name}: {e}")
         villager_images[sprite_name] = None
+    
+    sheet_file = sheet_path(f"{VILLAGER_DIR}/{sprite_name}")
+    if sprite_exists(sheet_file):
+        # Through the sprite pipeline like the still: baked if built, 8-bit in palette mode
+        sheet = load_sprite(sheet_file)
+        frame_width = sheet.get_width() // max(count for _, count, _ in VILLAGER_ANIMATION_ROWS)
+        frame_height = sheet.get_height() // len(VILLAGER_ANIMATION_ROWS)
+        villager_animations[sprite_name] = AnimationSet.from_sheet(
+            sheet, frame_width, frame_height, VILLAGER_ANIMATION_ROWS, (15, 15), prepare=prepare_frame)
+        print(f"✅ Loaded animation sheet for {sprite_name}")
+    elif villager_images[sprite_name]:
+        # No sheet yet - derive the cycles from the still sprite
+        villager_animations[sprite_name] = AnimationSet.from_still(villager_images[sprite_name], VILLAGER_ANIMATION_ROWS)
+    if sprite_name in villager_animations:
+        animation_clock.track(villager_animations[sprite_name])
+        villager_zoomed_animations[sprite_name] = villager_animations[sprite_name].scaled(DIALOG_ZOOM)
 
-# Load exclamation sprite
-try:
-    exclamation_img = pygame.image.load("Assets/Buildings/Villagers/villager_exclamation.png").convert_alpha()
-    exclamation_img = pygame.transform.scale(exclamation_img, (16, 16))  # Small exclamation
-    print("✅ Loaded villager exclamation")
-except pygame.error as e:
-    print(f"❌ Error loading villager_exclamation.png: {e}")
-    exclamation_img = None
-
-# Load blacksmith help request speech bubble
-try:
-    blacksmith_help_img = pygame.image.load("Assets/Buildings/Speech/Blacksmith_Help_Request_1.png").convert_alpha()
-    # Scale to 64x64 pixels for better positioning
-    blacksmith_help_img = pygame.transform.scale(blacksmith_help_img, (64, 64))
-    print(f"✅ Loaded blacksmith help request image - Size: {blacksmith_help_img.get_size()}")
-except pygame.error as e:
-    print(f"❌ Error loading Blacksmith_Help_Request_1.png: {e}")
-    blacksmith_help_img = None
-
-# Load farmer help request speech bubble
-try:
-    farmer_help_img = pygame.image.load("Assets/Buildings/Speech/Farmer_Help_Request.png").convert_alpha()
-    # Scale to 64x64 pixels for consistency
-    farmer_help_img = pygame.transform.scale(farmer_help_img, (64, 64))
-    print(f"✅ Loaded farmer help request image - Size: {farmer_help_img.get_size()}")
-except pygame.error as e:
-    print(f"❌ Error loading Farmer_Help_Request.png: {e}")
-    farmer_help_img = None
-
-# Load help and ignore buttons
-try:
-    help_button_img = pygame.image.load("Assets/Buildings/Buttons/Help_Button.png").convert_alpha()
-    original_help_size = help_button_img.get_size()
-    # Keep original size, will scale when drawing
-    print(f"✅ Loaded help button - Original: {original_help_size}")
-    print(f"📊 Help button format: {help_button_img.get_flags()}, alpha: {help_button_img.get_alpha()}")
-except pygame.error as e:
-    print(f"❌ Error loading Help_Button.png: {e}")
-    help_button_img = None
-except FileNotFoundError as e:
-    print(f"❌ Help_Button.png file not found: {e}")
-    help_button_img = None
+def load_exclamation():
+    """Load the small 16x16 exclamation sprite"""
+    global exclamation_img, exclamation_zoomed_img
+    try:
+        exclamation_variants = load_variants("Assets/Buildings/Villagers/villager_exclamation.png")
+        exclamation_img, exclamation_zoomed_img = exclamation_variants[1], exclamation_variants[DIALOG_ZOOM]
+        print("✅ Loaded villager exclamation")
+    except pygame.error as e:
+        print(f"❌ Error loading villager_exclamation.png: {e}")
+        exclamation_img = exclamation_zoomed_img = None
 
-try:
-    ignore_button_img = pygame.image.load("Assets/Buildings/Buttons/Ignore_Button.png").convert_alpha()
-    original_ignore_size = ignore_button_img.get_size()
-    # Keep original size, will scale when drawing
-    print(f"✅ Loaded ignore button - Original: {original_ignore_size}")
-    print(f"📊 Ignore button format: {ignore_button_img.get_flags()}, alpha: {ignore_button_img.get_alpha()}")
-except pygame.error as e:
-    print(f"❌ Error loading Ignore_Button.png: {e}")
-    ignore_button_img = None
-except FileNotFoundError as e:
-    print(f"❌ Ignore_Button.png file not found: {e}")
-    ignore_button_img = None
-
-# Create fallback buttons if PNG files aren't readable
-if help_button_img is None:
-    print("🔧 Creating fallback help button")
-    help_button_img = pygame.Surface((32, 32), pygame.SRCALPHA)
-    help_button_img.fill((0, 255, 0, 255))  # Green background
-    # Add "HELP" text
-    font_small = pygame.font.Font(None, 16)
-    text = font_small.render("HELP", True, (255, 255, 255))
-    text_rect = text.get_rect(center=(16, 16))
-    help_button_img.blit(text, text_rect)
-
-if ignore_button_img is None:
-    print("🔧 Creating fallback ignore button")
-    ignore_button_img = pygame.Surface((32, 32), pygame.SRCALPHA)
-    ignore_button_img.fill((255, 0, 0, 255))  # Red background
-    # Add "IGNORE" text
-    font_small = pygame.font.Font(None, 12)
-    text = font_small.render("IGNORE", True, (255, 255, 255))
-    text_rect = text.get_rect(center=(16, 16))
-    ignore_button_img.blit(text, text_rect)
-
-# Load blacksmith hammer sprite
-blacksmith_hammer_img = None
-try:
-    # Try to load from villagers folder first
-    blacksmith_hammer_img = pygame.image.load("Assets/Buildings/Villagers/Blacksmith_Hammer.png").convert_alpha()
-    blacksmith_hammer_img = pygame.transform.scale(blacksmith_hammer_img, (32, 32))  # Scale to 32x32
-    print(f"✅ Loaded blacksmith hammer - Size: {blacksmith_hammer_img.get_size()}")
-except:
+def load_speech_bubbles():
+    """Load the blacksmith and farmer help request speech bubbles (64x64 for better positioning)"""
+    global blacksmith_help_img, blacksmith_help_zoomed_img, farmer_help_img, farmer_help_zoomed_img
     try:
-        # Try main assets folder
-        blacksmith_hammer_img = pygame.image.load("Assets/Blacksmith_Hammer.png").convert_alpha()
-        blacksmith_hammer_img = pygame.transform.scale(blacksmith_hammer_img, (32, 32))
-        print(f"✅ Loaded blacksmith hammer from Assets - Size: {blacksmith_hammer_img.get_size()}")
+        blacksmith_help_variants = load_variants("Assets/Buildings/Speech/Blacksmith_Help_Request_1.png")
+        blacksmith_help_img, blacksmith_help_zoomed_img = blacksmith_help_variants[1], blacksmith_help_variants[DIALOG_ZOOM]
+        print(f"✅ Loaded blacksmith help request image - Size: {blacksmith_help_img.get_size()}")
+    except pygame.error as e:
+        print(f"❌ Error loading Blacksmith_Help_Request_1.png: {e}")
+        blacksmith_help_img = blacksmith_help_zoomed_img = None
+    
+    try:
+        farmer_help_variants = load_variants("Assets/Buildings/Speech/Farmer_Help_Request.png")
+        farmer_help_img, farmer_help_zoomed_img = farmer_help_variants[1], farmer_help_variants[DIALOG_ZOOM]
+        print(f"✅ Loaded farmer help request image - Size: {farmer_help_img.get_size()}")
+    except pygame.error as e:
+        print(f"❌ Error loading Farmer_Help_Request.png: {e}")
+        farmer_help_img = farmer_help_zoomed_img = None
+
+def load_dialog_buttons():
+    """Load the help and ignore buttons, or create fallback buttons if the PNG files aren't readable"""
+    global help_button_img, help_button_zoomed_img, ignore_button_img, ignore_button_zoomed_img
+    try:
+        help_button_variants = load_variants("Assets/Buildings/Buttons/Help_Button.png")
+        help_button_img, help_button_zoomed_img = help_button_variants[1], help_button_variants[DIALOG_ZOOM]
+        print(f"✅ Loaded help button - Size: {help_button_img.get_size()}")
+    except pygame.error as e:
+        print(f"❌ Error loading Help_Button.png: {e}")
+        help_button_img = None
+    except FileNotFoundError as e:
+        print(f"❌ Help_Button.png file not found: {e}")
+        help_button_img = None
+
+    try:
+        ignore_button_variants = load_variants("Assets/Buildings/Buttons/Ignore_Button.png")
+        ignore_button_img, ignore_button_zoomed_img = ignore_button_variants[1], ignore_button_variants[DIALOG_ZOOM]
+        print(f"✅ Loaded ignore button - Size: {ignore_button_img.get_size()}")
+    except pygame.error as e:
+        print(f"❌ Error loading Ignore_Button.png: {e}")
+        ignore_button_img = None
+    except FileNotFoundError as e:
+        print(f"❌ Ignore_Button.png file not found: {e}")
+        ignore_button_img = None
+
+    if help_button_img is None:
+        print("🔧 Creating fallback help button")
+        help_button_img = pygame.Surface((32, 32), pygame.SRCALPHA)
+        help_button_img.fill((0, 255, 0, 255))  # Green background
+        # Add "HELP" text
+        font_small = pygame.font.Font(None, 16)
+        text = font_small.render("HELP", True, (255, 255, 255))
+        text_rect = text.get_rect(center=(16, 16))
+        help_button_img.blit(text, text_rect)
+        help_button_img = match_format(help_button_img, base_surface)
+        help_button_zoomed_img = scale_variant(help_button_img, DIALOG_ZOOM)
+
+    if ignore_button_img is None:
+        print("🔧 Creating fallback ignore button")
+        ignore_button_img = pygame.Surface((32, 32), pygame.SRCALPHA)
+        ignore_button_img.fill((255, 0, 0, 255))  # Red background
+        # Add "IGNORE" text
+        font_small = pygame.font.Font(None, 12)
+        text = font_small.render("IGNORE", True, (255, 255, 255))
+        text_rect = text.get_rect(center=(16, 16))
+        ignore_button_img.blit(text, text_rect)
+        ignore_button_img = match_format(ignore_button_img, base_surface)
+        ignore_button_zoomed_img = scale_variant(ignore_button_img, DIALOG_ZOOM)
+
+def load_hammer():
+    """Load the blacksmith hammer sprite, or draw a fallback hammer"""
+    global blacksmith_hammer_img
+    blacksmith_hammer_img = None
+    try:
+        # Try to load from villagers folder first
+        blacksmith_hammer_img = pygame.image.load("Assets/Buildings/Villagers/Blacksmith_Hammer.png").convert_alpha()
+        blacksmith_hammer_img = optimize_sprite(pygame.transform.scale(blacksmith_hammer_img, (32, 32)))  # Scale to 32x32
+        print(f"✅ Loaded blacksmith hammer - Size: {blacksmith_hammer_img.get_size()}")
     except:
-        print(f"❌ Could not find Blacksmith_Hammer.png, creating fallback")
-        # Create fallback hammer
-        blacksmith_hammer_img = pygame.Surface((32, 32), pygame.SRCALPHA)
-        pygame.draw.rect(blacksmith_hammer_img, (139, 69, 19), (8, 0, 16, 20))  # Brown handle
-        pygame.draw.rect(blacksmith_hammer_img, (128, 128, 128), (4, 20, 24, 12))  # Gray hammer head
+        try:
+            # Try main assets folder
+            blacksmith_hammer_img = pygame.image.load("Assets/Blacksmith_Hammer.png").convert_alpha()
+            blacksmith_hammer_img = optimize_sprite(pygame.transform.scale(blacksmith_hammer_img, (32, 32)))
+            print(f"✅ Loaded blacksmith hammer from Assets - Size: {blacksmith_hammer_img.get_size()}")
+        except:
+            print(f"❌ Could not find Blacksmith_Hammer.png, creating fallback")
+            # Create fallback hammer
+            blacksmith_hammer_img = pygame.Surface((32, 32), pygame.SRCALPHA)
+            pygame.draw.rect(blacksmith_hammer_img, (139, 69, 19), (8, 0, 16, 20))  # Brown handle
+            pygame.draw.rect(blacksmith_hammer_img, (128, 128, 128), (4, 20, 24, 12))  # Gray hammer head
+            blacksmith_hammer_img = match_format(optimize_sprite(blacksmith_hammer_img), base_surface)
+
+# Asset groups in load order: (name, one load step per asset). PLAY needs "town" (the placement screen),
+# Start needs the rest (villagers and their help dialog).
+ASSET_GROUPS = [
+    ("town", [load_background] + [functools.partial(load_building, name) for name in building_types]),
+    ("villagers", [functools.partial(load_villager, name) for name in villager_sprites]),
+    ("dialog", [load_exclamation, load_speech_bubbles, load_dialog_buttons, load_hammer]),
+]
+
+class AssetLoader:
+    """Runs the asset load steps one at a time, so the menu shows while sprites load in the background"""
+    def __init__(self, groups):
+        self.pending = deque((name, step) for name, steps in groups for step in steps)
+        self.total = len(self.pending)
+        self.remaining = {name: len(steps) for name, steps in groups}  # Group -> steps still to run
+        self.start = time.perf_counter()
+    
+    @property
+    def done(self):
+        """True once every asset has been loaded"""
+        return not self.pending
+    
+    @property
+    def progress(self):
+        """Fraction of the assets loaded so far (0-1)"""
+        return 1 - len(self.pending) / self.total if self.total else 1.0
+    
+    def ready(self, group):
+        """True once every asset in a group has been loaded"""
+        return self.remaining[group] == 0
+    
+    def step(self):
+        """Load the next asset"""
+        group, load = self.pending.popleft()
+        load()
+        self.remaining[group] -= 1
+        if self.done:
+            print(f"📦 Loaded {self.total} assets in {(time.perf_counter() - self.start) * 1000:.0f} ms")
+    
+    def finish(self, group=None):
+        """Load everything up to and including group (everything if None) right now"""
+        while self.pending and (group is None or not self.ready(group)):
+            self.step()
+    
+    async def run(self):
+        """Load one asset per turn of the event loop until done (started as a task by main())"""
+        while self.pending:
+            self.step()
+            await asyncio.sleep(0)
+
+asset_loader = AssetLoader(ASSET_GROUPS)
+
+def load_assets():
+    """Load every asset right now (for tools and benchmarks that import this module)"""
+    asset_loader.finish()
 
 class Button:
     """Simple button class for the menu"""
@@ -206,32 +365,34 @@ class Button:
         self.hover_color = hover_color
         self.text_color = text_color
         self.is_hovered = False
+        self.enabled = True  # Disabled buttons are drawn gray and ignore clicks
+    
+    def update_hover(self, base_pos):
+        """Update the hover state from the pointer position (base surface coordinates)"""
+        self.is_hovered = self.rect.collidepoint(base_pos)
     
     def handle_event(self, event):
-        """Handle mouse events for the button"""
+        """Handle mouse events for the button, return True when it was clicked"""
         if event.type == pygame.MOUSEMOTION:
-            # Convert from window coordinates to base surface coordinates
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            base_x = mouse_x // SCALE
-            base_y = mouse_y // SCALE
-            self.is_hovered = self.rect.collidepoint(base_x, base_y)
+            self.update_hover(to_base_coords(event.pos, SCALE))
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            # Convert from window coordinates to base surface coordinates
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            base_x = mouse_x // SCALE
-            base_y = mouse_y // SCALE
-            if self.rect.collidepoint(base_x, base_y):
+            # Use the position converted by the input layer when available
+            base_pos = getattr(event, "base_pos", None) or to_base_coords(event.pos, SCALE)
+            if self.enabled and self.rect.collidepoint(base_pos):
                 return True
         return False
     
     def draw(self, surface):
         """Draw the button on the surface"""
-        color = self.hover_color if self.is_hovered else self.color
+        if not self.enabled:
+            color = GRAY
+        else:
+            color = self.hover_color if self.is_hovered else self.color
         pygame.draw.rect(surface, color, self.rect)
         pygame.draw.rect(surface, WHITE, self.rect, 2)  # Border
         
         # Render text
-        text_surface = self.font.render(self.text, True, self.text_color)
+        text_surface = self.font.render(self.text, TEXT_ANTIALIAS, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
 
@@ -254,20 +415,18 @@ class ImageButton:
                 print(f"❌ Error scaling image for button: {e}")
                 self.scaled_image = None
     
+    def update_hover(self, base_pos):
+        """Update the hover state from the pointer position (base surface coordinates)"""
+        self.is_hovered = self.rect.collidepoint(base_pos)
+    
     def handle_event(self, event):
-        """Handle mouse events for the button"""
+        """Handle mouse events for the button, return True when it was clicked"""
         if event.type == pygame.MOUSEMOTION:
-            # Convert from window coordinates to base surface coordinates
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            base_x = mouse_x // SCALE
-            base_y = mouse_y // SCALE
-            self.is_hovered = self.rect.collidepoint(base_x, base_y)
+            self.update_hover(to_base_coords(event.pos, SCALE))
         elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            # Convert from window coordinates to base surface coordinates
-            mouse_x, mouse_y = pygame.mouse.get_pos()
-            base_x = mouse_x // SCALE
-            base_y = mouse_y // SCALE
-            if self.rect.collidepoint(base_x, base_y):
+            # Use the position converted by the input layer when available
+            base_pos = getattr(event, "base_pos", None) or to_base_coords(event.pos, SCALE)
+            if self.rect.collidepoint(base_pos):
                 return True
         return False
     
@@ -285,7 +444,7 @@ class ImageButton:
             pygame.draw.rect(surface, self.fallback_color, self.rect)
             # Add a question mark or some indicator
             font_small = pygame.font.Font(None, 24)
-            text = font_small.render("?", True, WHITE)
+            text = font_small.render("?", TEXT_ANTIALIAS, WHITE)
             text_rect = text.get_rect(center=self.rect.center)
             surface.blit(text, text_rect)
         
@@ -302,70 +461,87 @@ class ImageButton:
             
         pygame.draw.rect(surface, border_color, self.rect, border_width)
 
-def draw_menu():
-    """Draw the main menu"""
+def draw_menu(loading_progress=None):
+    """Draw the main menu, with a progress bar under the PLAY button while assets load (progress 0-1)"""
     base_surface.fill(BLACK)
     
     # Draw title
-    title_text = title_font.render("Catastrophe Civ", True, WHITE)
+    title_text = title_font.render("Catastrophe Civ", TEXT_ANTIALIAS, WHITE)
     title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, 120))
     base_surface.blit(title_text, title_rect)
     
     # Draw subtitle
-    subtitle_text = font.render("Survive the disasters and rebuild your civilization", True, GRAY)
+    subtitle_text = font.render("Survive the disasters and rebuild your civilization", TEXT_ANTIALIAS, GRAY)
     subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 160))
     base_surface.blit(subtitle_text, subtitle_rect)
+    
+    # Draw loading progress
+    if loading_progress is not None:
+        bar_rect = pygame.Rect(WINDOW_WIDTH // 2 - 75, 285, 150, 8)
+        pygame.draw.rect(base_surface, GRAY, bar_rect, 1)
+        base_surface.fill(WHITE, (bar_rect.x + 2, bar_rect.y + 2, int((bar_rect.width - 4) * loading_progress), 4))
 
-def draw_end_screen():
+def draw_end_screen(disaster_label=None):
     """Draw the end screen"""
     base_surface.fill(BLACK)
     
     # Draw "THE END" title
-    end_title = title_font.render("THE END", True, RED)
+    end_title = title_font.render("THE END", TEXT_ANTIALIAS, RED)
     end_title_rect = end_title.get_rect(center=(WINDOW_WIDTH // 2, 120))
     base_surface.blit(end_title, end_title_rect)
     
     # Draw subtitle
-    subtitle_text = font.render("The disaster has struck!", True, GRAY)
+    subtitle_text = font.render(f"{disaster_label or 'The disaster'} has struck!", TEXT_ANTIALIAS, GRAY)
     subtitle_rect = subtitle_text.get_rect(center=(WINDOW_WIDTH // 2, 160))
     base_surface.blit(subtitle_text, subtitle_rect)
     
     # Draw continue instruction
-    continue_text = font.render("Press SPACE to return to menu or R to restart", True, WHITE)
+    continue_text = font.render("Press SPACE to return to menu or R to restart", TEXT_ANTIALIAS, WHITE)
     continue_rect = continue_text.get_rect(center=(WINDOW_WIDTH // 2, 200))
     base_surface.blit(continue_text, continue_rect)
 
+# Define fallback colors for each building type
+BUILDING_FALLBACK_COLORS = {
+    "House": PURPLE,
+    "Farm": GREEN,
+    "Factory": ORANGE
+}
+building_fallback_images = {}  # Cache of pre-rendered fallback building surfaces
+
+def get_building_image(building_type):
+    """Return the building sprite, or a cached colored fallback when the sprite is missing"""
+    image = building_images.get(building_type)
+    if image:
+        return image
+    
+    if building_type not in building_fallback_images:
+        # Fallback: a colored rectangle with a white border and the type's first letter
+        fallback = pygame.Surface((BUILDING_SIZE, BUILDING_SIZE), pygame.SRCALPHA)
+        fallback_rect = fallback.get_rect()
+        pygame.draw.rect(fallback, BUILDING_FALLBACK_COLORS.get(building_type, GRAY), fallback_rect)
+        pygame.draw.rect(fallback, WHITE, fallback_rect, 2)  # White border
+        
+        font_small = pygame.font.Font(None, 20)
+        text = font_small.render(building_type[0], True, WHITE)  # First letter of building type
+        fallback.blit(text, text.get_rect(center=fallback_rect.center))
+        building_fallback_images[building_type] = match_format(optimize_sprite(fallback), base_surface)
+    return building_fallback_images[building_type]
+
 class Building:
     """Represents a building in the town"""
     def __init__(self, building_type, x, y):
         self.type = building_type
         self.x = x
         self.y = y
-        self.image = building_images.get(building_type)
-        
-        # Define fallback colors for each building type
-        self.fallback_colors = {
-            "House": PURPLE,
-            "Farm": GREEN,
-            "Factory": ORANGE
-        }
+        self.image = get_building_image(building_type)
+    
+    def baseline(self):
+        """Y coordinate of the building's front edge, used for depth sorting"""
+        return self.y + BUILDING_SIZE
     
     def draw(self, surface):
-        """Draw the building on the given surface"""
-        if self.image:
-            surface.blit(self.image, (self.x, self.y))
-        else:
-            # Fallback: draw a colored rectangle when sprite is missing
-            fallback_color = self.fallback_colors.get(self.type, GRAY)
-            fallback_rect = pygame.Rect(self.x, self.y, BUILDING_SIZE, BUILDING_SIZE)
-            pygame.draw.rect(surface, fallback_color, fallback_rect)
-            pygame.draw.rect(surface, WHITE, fallback_rect, 2)  # White border
-            
-            # Add text indicator
-            font_small = pygame.font.Font(None, 20)
-            text = font_small.render(self.type[0], True, WHITE)  # First letter of building type
-            text_rect = text.get_rect(center=fallback_rect.center)
-            surface.blit(text, text_rect)
+        """Draw the building on the given surface (or queue it on a RenderQueue)"""
+        surface.blit(self.image, (self.x, self.y))
 
 # Three houses on top row, five houses on middle row, two houses on bottom
 FIXED_TOWN_LAYOUT = [
@@ -386,11 +562,21 @@ FIXED_TOWN_LAYOUT = [
     {"type": "House", "x": 406, "y": 216}   # Below furthest right house
 ]
 
-def create_town():
-    """Create town with ten houses"""
+def get_spot_rects(town_spots):
+    """Hit/draw rectangles for a list of town spots"""
+    return [
+        pygame.Rect(spot_data["x"], spot_data["y"], BUILDING_SIZE, BUILDING_SIZE)
+        for spot_data in town_spots
+    ]
+
+# Hit/draw rectangles for every fixed town spot, built once
+TOWN_SPOT_RECTS = get_spot_rects(FIXED_TOWN_LAYOUT)
+
+def create_town(town_spots=FIXED_TOWN_LAYOUT):
+    """Create a town with a building on every spot, using each spot's own type"""
     buildings = []
     
-    for building_data in FIXED_TOWN_LAYOUT:
+    for building_data in town_spots:
         building = Building(
             building_data["type"], 
             building_data["x"], 
@@ -399,12 +585,40 @@ def create_town():
         buildings.append(building)
         print(f"🏗️ Placed {building_data['type']} at ({building_data['x']}, {building_data['y']})")
     
-    print(f"🏘️ Created simple town with {len(buildings)} buildings")
+    print(f"🏘️ Created town with {len(buildings)} buildings")
     return buildings
 
-def draw_background():
-    """Draw the background image, scaled to fit the screen"""
+def compose_town_background(town_layout):
+    """Render the background image plus the town's dirt paths into one static surface"""
+    if PALETTE_MODE:
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), 0, base_surface)  # 8-bit, shared palette
+    else:
+        surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
     if background_img:
+        surface.blit(background_img, (0, 0))
+    else:
+        surface.fill(BLACK)
+    
+    path_cells = set(town_layout.path_cells)
+    for col, row in path_cells:
+        cell_rect = pygame.Rect(col * GRID_SIZE, row * GRID_SIZE, GRID_SIZE, GRID_SIZE)
+        surface.fill(DIRT, cell_rect)
+        # Darker edge wherever the path ends, so roads read as strips
+        if (col, row - 1) not in path_cells:
+            surface.fill(DARK_DIRT, (cell_rect.x, cell_rect.y, GRID_SIZE, 2))
+        if (col, row + 1) not in path_cells:
+            surface.fill(DARK_DIRT, (cell_rect.x, cell_rect.bottom - 2, GRID_SIZE, 2))
+        if (col - 1, row) not in path_cells:
+            surface.fill(DARK_DIRT, (cell_rect.x, cell_rect.y, 2, GRID_SIZE))
+        if (col + 1, row) not in path_cells:
+            surface.fill(DARK_DIRT, (cell_rect.right - 2, cell_rect.y, 2, GRID_SIZE))
+    return surface
+
+def draw_background(town_background=None):
+    """Draw the town background (with paths) or the plain background image"""
+    if town_background:
+        base_surface.blit(town_background, (0, 0))
+    elif background_img:
         base_surface.blit(background_img, (0, 0))
     else:
         # Fallback to black background if image fails to load
@@ -418,7 +632,7 @@ def draw_timer(time_remaining):
     timer_text = f"{minutes:01d}:{seconds:02d}"
     
     # Render the timer text
-    timer_surface = font.render(timer_text, True, RED)
+    timer_surface = font.render(timer_text, TEXT_ANTIALIAS, RED)
     
     # Position at top center
     timer_rect = timer_surface.get_rect()
@@ -428,58 +642,52 @@ def draw_timer(time_remaining):
     # Draw timer on base surface
     base_surface.blit(timer_surface, timer_rect)
 
+# Per-layer render queues, reused every frame
+building_render_queue = RenderQueue()
+villager_render_queue = RenderQueue()
+
+# Depth-sorted world renderer (buildings cached, villagers re-sorted each frame)
+world_renderer = LayeredRenderer()
+
+def draw_world(town_buildings, villager_manager):
+    """Draw buildings, villagers and the hammer depth-sorted by their baseline y"""
+    world_renderer.set_static(town_buildings)
+    hammer = villager_manager.hammer
+    extras = (hammer,) if hammer and not hammer.collected else ()
+    world_renderer.draw(base_surface, villager_manager.get_draw_order(), extras)
+    
+    # Exclamations and speech bubbles always go on top
+    villager_manager.draw_overlays(base_surface)
+
 def draw_buildings(buildings):
-    """Draw all buildings in the town"""
+    """Draw all buildings in the town with a single batched blit"""
     for building in buildings:
-        building.draw(base_surface)
+        building.draw(building_render_queue)
+    building_render_queue.flush(base_surface)
 
-def draw_building_placement_ui(selected_building_type, hovered_spot_index, building_placements):
+def draw_building_placement_ui(selected_building_type, hovered_spot_index, building_placements,
+                               town_spots=FIXED_TOWN_LAYOUT, spot_rects=TOWN_SPOT_RECTS, town_background=None):
     """Draw the building placement interface"""
-    draw_background()
+    draw_background(town_background)
     
-    # Draw building spots - empty ones and placed buildings
-    for i, spot_data in enumerate(FIXED_TOWN_LAYOUT):
-        spot_rect = pygame.Rect(spot_data["x"], spot_data["y"], BUILDING_SIZE, BUILDING_SIZE)
-        
-        # Check if there's a building placed here
-        if i in building_placements:
-            # Draw the placed building
-            building_type = building_placements[i]
-            building_image = building_images.get(building_type)
-            
-            if building_image:
-                base_surface.blit(building_image, (spot_data["x"], spot_data["y"]))
-            else:
-                # Fallback: draw a colored rectangle when sprite is missing
-                fallback_colors = {
-                    "House": PURPLE,
-                    "Farm": GREEN,
-                    "Factory": ORANGE
-                }
-                fallback_color = fallback_colors.get(building_type, GRAY)
-                pygame.draw.rect(base_surface, fallback_color, spot_rect)
-                pygame.draw.rect(base_surface, WHITE, spot_rect, 2)  # White border
-                
-                # Add text indicator
-                font_small = pygame.font.Font(None, 20)
-                text = font_small.render(building_type[0], True, WHITE)  # First letter
-                text_rect = text.get_rect(center=spot_rect.center)
-                base_surface.blit(text, text_rect)
-        else:
-            # Draw empty spot outline
+    # Draw placed buildings in one batched blit
+    for i, building_type in building_placements.items():
+        spot_data = town_spots[i]
+        building_render_queue.blit(get_building_image(building_type), (spot_data["x"], spot_data["y"]))
+    building_render_queue.flush(base_surface)
+    
+    # Draw empty spot outlines and the hover highlight on top
+    for i, spot_rect in enumerate(spot_rects):
+        if i not in building_placements:
             pygame.draw.rect(base_surface, LIGHT_GRAY, spot_rect, 2)
         
         # Highlight hovered spot
         if i == hovered_spot_index:
             pygame.draw.rect(base_surface, YELLOW, spot_rect, 3)
 
-def get_hovered_spot_index(mouse_x, mouse_y):
+def get_hovered_spot_index(mouse_x, mouse_y, spot_rects=TOWN_SPOT_RECTS):
     """Check if mouse is hovering over any building spot location"""
-    for i, spot_data in enumerate(FIXED_TOWN_LAYOUT):
-        spot_rect = pygame.Rect(spot_data["x"], spot_data["y"], BUILDING_SIZE, BUILDING_SIZE)
-        if spot_rect.collidepoint(mouse_x, mouse_y):
-            return i
-    return -1
+    return pygame.Rect(mouse_x, mouse_y, 1, 1).collidelist(spot_rects)
 
 def draw_debug_info(debug_font, villager_manager, time_remaining):
     """Draw debug information overlay"""
@@ -487,32 +695,123 @@ def draw_debug_info(debug_font, villager_manager, time_remaining):
     debug_x = 10
     
     # Debug mode indicator
-    debug_text = debug_font.render("DEBUG MODE - F12: Toggle | E: Force End | X: Force Exclamation", True, YELLOW)
+    debug_text = debug_font.render("DEBUG MODE - F12: Toggle | E: Force End | X: Force Exclamation", TEXT_ANTIALIAS, YELLOW)
     base_surface.blit(debug_text, (debug_x, debug_y))
     debug_y += 25
     
     # Timer info
-    timer_text = debug_font.render(f"Time Remaining: {time_remaining:.1f}s", True, WHITE)
+    timer_text = debug_font.render(f"Time Remaining: {time_remaining:.1f}s", TEXT_ANTIALIAS, WHITE)
     base_surface.blit(timer_text, (debug_x, debug_y))
     debug_y += 20
     
     # Villager count
-    villager_count_text = debug_font.render(f"Villagers: {len(villager_manager.villagers)}", True, WHITE)
+    villager_count_text = debug_font.render(f"Villagers: {len(villager_manager.villagers)}", TEXT_ANTIALIAS, WHITE)
     base_surface.blit(villager_count_text, (debug_x, debug_y))
     debug_y += 20
     
     # Active exclamations
     active_exclamations = sum(1 for v in villager_manager.villagers if v.show_exclamation)
-    exclamation_text = debug_font.render(f"Active Exclamations: {active_exclamations}", True, WHITE)
+    exclamation_text = debug_font.render(f"Active Exclamations: {active_exclamations}", TEXT_ANTIALIAS, WHITE)
     base_surface.blit(exclamation_text, (debug_x, debug_y))
 
-def create_town_with_custom_buildings(building_placements):
+class FrameStats:
+    """Rolling simulation/draw timings for the crowd stress test"""
+    def __init__(self, window=60):
+        self.sim_times = deque(maxlen=window)  # Milliseconds per frame
+        self.draw_times = deque(maxlen=window)
+        self.last_report = time.perf_counter()
+    
+    def record(self, sim_ms, draw_ms):
+        """Store one frame's timings"""
+        self.sim_times.append(sim_ms)
+        self.draw_times.append(draw_ms)
+    
+    def reset(self):
+        """Forget old timings (population changed)"""
+        self.sim_times.clear()
+        self.draw_times.clear()
+    
+    def average_sim_ms(self):
+        """Average simulation time over the window"""
+        return sum(self.sim_times) / len(self.sim_times) if self.sim_times else 0.0
+    
+    def average_draw_ms(self):
+        """Average draw time over the window"""
+        return sum(self.draw_times) / len(self.draw_times) if self.draw_times else 0.0
+    
+    def report_if_due(self, villager_count, fps, interval=1.0):
+        """Print a one-line summary to the console about once per second"""
+        now = time.perf_counter()
+        if now - self.last_report < interval:
+            return
+        self.last_report = now
+        total_ms = self.average_sim_ms() + self.average_draw_ms()
+        budget = "✅" if total_ms <= FRAME_BUDGET_MS else "⚠️ OVER BUDGET"
+        print(f"🏃 STRESS: {villager_count} villagers | sim {self.average_sim_ms():.2f} ms | "
+              f"draw {self.average_draw_ms():.2f} ms | {fps:.1f} FPS {budget}")
+
+def draw_stress_info(debug_font, villager_manager, frame_stats, fps):
+    """Draw the stress test overlay (population, sim/draw time, FPS)"""
+    total_ms = frame_stats.average_sim_ms() + frame_stats.average_draw_ms()
+    color = WHITE if total_ms <= FRAME_BUDGET_MS else RED
+    lines = [
+        f"STRESS: {len(villager_manager.villagers)} villagers (S: next level)",
+        f"Sim {frame_stats.average_sim_ms():.2f} ms  Draw {frame_stats.average_draw_ms():.2f} ms  FPS {fps:.1f}",
+    ]
+    debug_y = WINDOW_HEIGHT - 50
+    for line in lines:
+        text = debug_font.render(line, TEXT_ANTIALIAS, color)
+        base_surface.blit(text, (10, debug_y))
+        debug_y += 20
+
+def next_stress_level(current_count):
+    """Return the next stress population after current_count (None = back to normal)"""
+    for level in STRESS_LEVELS:
+        if current_count is None or level > current_count:
+            return level
+    return None
+
+def draw_playing_frame(town_buildings, villager_manager, time_remaining, debug_mode=False, debug_font=None,
+                       town_background=None):
+    """Draw one full frame of the PLAYING state onto the base surface"""
+    # Draw background first (before any other game objects)
+    draw_background(town_background)
+    
+    # Draw buildings and villagers depth-sorted, so villagers can walk behind houses
+    draw_world(town_buildings, villager_manager)
+    
+    # Draw timer on top of everything
+    draw_timer(time_remaining)
+    
+    # Draw debug info if debug mode is active
+    if debug_mode:
+        draw_debug_info(debug_font, villager_manager, time_remaining)
+
+def present_frame():
+    """Scale the base surface up to the window and flip the display"""
+    if SCALE == 1:
+        window.blit(base_surface, (0, 0))
+    elif PALETTE_MODE:
+        # 8-bit pixels are expanded to the window format by the blit, after scaling
+        window.blit(pygame.transform.scale(base_surface, window.get_size()), (0, 0))
+    else:
+        pygame.transform.scale(base_surface, window.get_size(), window)  # Straight into the window, no copy
+    pygame.display.flip()
+
+def set_window_scale(scale):
+    """Resize the window to another of WINDOW_SCALES (the base surface and sprites stay as they are)"""
+    global SCALE, window
+    SCALE = scale
+    window = pygame.display.set_mode((WINDOW_WIDTH * scale, WINDOW_HEIGHT * scale))
+    print(f"🔍 Window scale {scale}x ({WINDOW_WIDTH * scale}x{WINDOW_HEIGHT * scale})")
+
+def create_town_with_custom_buildings(building_placements, town_spots=FIXED_TOWN_LAYOUT):
     """Create town with only explicitly placed buildings"""
     buildings = []
     
     # Only create buildings where they've been explicitly placed
     for spot_index, building_type in building_placements.items():
-        building_data = FIXED_TOWN_LAYOUT[spot_index]
+        building_data = town_spots[spot_index]
         building = Building(
             building_type, 
             building_data["x"], 
@@ -524,6 +823,58 @@ def create_town_with_custom_buildings(building_placements):
     print(f"🏘️ Created custom town with {len(buildings)} buildings")
     return buildings
 
+fallback_villager_images = {}  # Cache of fallback circle surfaces by radius
+
+def get_fallback_villager_image(radius):
+    """Return a cached white circle surface used when a villager sprite is missing"""
+    if radius not in fallback_villager_images:
+        fallback = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+        pygame.draw.circle(fallback, WHITE, (radius, radius), radius)
+        fallback_villager_images[radius] = match_format(optimize_sprite(fallback), base_surface)
+    return fallback_villager_images[radius]
+
+# Dialog buttons relative to the speech bubble: zoomed -> (x past the bubble's right edge, help y, ignore y)
+DIALOG_BUTTON_OFFSETS = {True: (-14, 10, 44), False: (-22, -5, -30)}
+
+class DialogLayout:
+    """An open help dialog's sprites, where they go and the buttons' hit rects, worked out once when it opens"""
+    def __init__(self, villager):
+        self.blits = []  # (surface, position) in draw order
+        self.help_rect = None  # Button hit rects in base coordinates (None without a bubble or buttons)
+        self.ignore_rect = None
+        
+        # Choose appropriate speech image based on villager type
+        if villager.sprite_name == "Blacksmith.png":
+            bubble, zoomed_bubble = blacksmith_help_img, blacksmith_help_zoomed_img
+        elif villager.sprite_name in ("Farmer_Female.png", "Farmer_Male.png"):
+            bubble, zoomed_bubble = farmer_help_img, farmer_help_zoomed_img
+        else:
+            bubble = zoomed_bubble = None
+        if not bubble:
+            print(f"❌ Speech image requested but no appropriate image found for {villager.sprite_name}")
+            return
+        
+        # Bubble above and right of the villager, at DIALOG_ZOOM while it is scaled up
+        zoomed = villager.is_scaled_up
+        if zoomed:
+            bubble = zoomed_bubble
+        bubble_x = int(villager.x - bubble.get_width() // 2 + 61)
+        bubble_y = int(villager.y - bubble.get_height() + 20)
+        self.blits.append((bubble, (bubble_x, bubble_y)))
+        
+        # Help and ignore buttons to the right of the bubble
+        if help_button_img and ignore_button_img:
+            help_button = help_button_zoomed_img if zoomed else help_button_img
+            ignore_button = ignore_button_zoomed_img if zoomed else ignore_button_img
+            right_offset, help_y, ignore_y = DIALOG_BUTTON_OFFSETS[zoomed]
+            button_x = bubble_x + bubble.get_width() + right_offset
+            self.help_rect = help_button.get_rect(topleft=(button_x, bubble_y + help_y))
+            self.ignore_rect = ignore_button.get_rect(topleft=(button_x, bubble_y + ignore_y))
+            self.blits.append((help_button, self.help_rect.topleft))
+            self.blits.append((ignore_button, self.ignore_rect.topleft))
+        print(f"🗨️ Dialog for {villager.sprite_name}: bubble at ({bubble_x}, {bubble_y}), "
+              f"buttons at {self.help_rect and self.help_rect.topleft} and {self.ignore_rect and self.ignore_rect.topleft}")
+
 class Villager:
     """Represents a villager that wanders around the island"""
     def __init__(self, sprite_name, x, y):
@@ -532,21 +883,27 @@ class Villager:
         self.y = y
         self.target_x = x
         self.target_y = y
+        self.goal_cell = NO_PATH  # Grid cell the villager is walking to (NO_PATH = standing still)
+        self.flow_field = None  # Cached next-step table towards goal_cell
+        self.waypoint_cell = NO_PATH  # Cell currently being walked to on the way to goal_cell
+        self.aim_x = x  # Waypoint position (sprite top-left)
+        self.aim_y = y
+        self.grid_key = None  # Crowd grid bucket, kept up to date by SpatialGrid
         self.speed = 0.5  # Slow walking speed
         self.image = villager_images.get(sprite_name)
+        self.animations = villager_animations.get(sprite_name)  # Shared with every villager of this sprite
+        self.zoomed_animations = villager_zoomed_animations.get(sprite_name)  # Drawn instead while scaled up
+        self.animation_name = "idle"
+        self.animation = self.animations["idle"] if self.animations else None  # Animation playing now
+        self.animation_phase = random.randrange(PHASES)  # Frame offset so villagers don't step in sync
+        self.walking = False
         self.show_exclamation = False
         self.show_speech_image = False  # For showing speech bubbles like help requests
         self.is_scaled_up = False  # For scaling villager and help request when clicked
+        self.dialog = None  # DialogLayout while the help request is showing
         self.exclamation_timer = 0
         self.movement_timer = 0
         self.movement_interval = random.uniform(2.0, 4.0)  # Random movement every 2-4 seconds
-        
-        # Define boundaries for villager movement (stay within green area)
-        # Very restrictive boundaries based on building layout area
-        self.min_x = 170  # Just left of leftmost buildings (186)
-        self.max_x = 420  # Just right of rightmost buildings (406 + 48)
-        self.min_y = 70   # Just above top buildings (86)
-        self.max_y = 280  # Just below bottom buildings (216 + 48)
     
     def update(self, dt):
         """Update villager position and behavior"""
@@ -559,26 +916,50 @@ class Villager:
             self.movement_interval = random.uniform(2.0, 4.0)
             self.pick_new_target()
         
-        # Move towards target
-        dx = self.target_x - self.x
-        dy = self.target_y - self.y
+        # Move towards the current waypoint
+        dx = self.aim_x - self.x
+        dy = self.aim_y - self.y
         distance = math.sqrt(dx*dx + dy*dy)
         
-        if distance > 1:  # Not at target yet
+        walking = distance > 1
+        if walking != self.walking:
+            self.walking = walking
+            self.pick_animation()
+        if walking:  # Not at target yet
             # Normalize direction and apply speed
             self.x += (dx / distance) * self.speed * dt * 60  # 60 for frame rate independence
             self.y += (dy / distance) * self.speed * dt * 60
         
-        # Enforce boundaries - keep villager within green area
-        self.x = max(self.min_x, min(self.max_x, self.x))
-        self.y = max(self.min_y, min(self.max_y, self.y))
+        # Close to a cell waypoint - look up the next one (the flow field is only read here)
+        if distance < WAYPOINT_RADIUS and self.waypoint_cell != self.goal_cell:
+            self.set_waypoint(self.flow_field[self.waypoint_cell])
         
         # Note: Exclamations no longer expire automatically - they persist until clicked
     
     def pick_new_target(self):
-        """Pick a new random target within boundaries"""
-        self.target_x = random.uniform(self.min_x, self.max_x)
-        self.target_y = random.uniform(self.min_y, self.max_y)
+        """Pick a random walkable cell and a spot inside it, and route there around buildings"""
+        navigator = self.manager.navigator
+        self.goal_cell = navigator.random_cell()
+        self.flow_field = navigator.flow_field(self.goal_cell)
+        foot_x, foot_y = point_in_cell(self.goal_cell)
+        self.target_x = foot_x - VILLAGER_FOOT_X
+        self.target_y = foot_y - VILLAGER_FOOT_Y
+        
+        # First waypoint is the next cell from where the villager stands
+        cell = navigator.cell_at(self.x + VILLAGER_FOOT_X, self.y + VILLAGER_FOOT_Y)
+        self.set_waypoint(self.flow_field[cell] if cell != NO_PATH else NO_PATH)
+    
+    def set_waypoint(self, cell):
+        """Aim for the center of cell, or straight for the target once in reach of the goal"""
+        if cell == NO_PATH or cell == self.goal_cell:
+            # Goal reached (or no route from here): walk straight to the target
+            self.waypoint_cell = self.goal_cell
+            self.aim_x, self.aim_y = self.target_x, self.target_y
+        else:
+            self.waypoint_cell = cell
+            center_x, center_y = self.manager.navigator.centers[cell]
+            self.aim_x = center_x - VILLAGER_FOOT_X
+            self.aim_y = center_y - VILLAGER_FOOT_Y
     
     def trigger_exclamation(self):
         """Show exclamation (persists until clicked)"""
@@ -599,6 +980,8 @@ class Villager:
         self.show_speech_image = True
         self.show_exclamation = False  # Hide exclamation when showing speech
         self.is_scaled_up = True  # Scale up villager and help request
+        self.pick_animation()
+        self.layout_dialog()
         print(f"📊 Speech state: {self.show_speech_image}, Exclamation state: {self.show_exclamation}, Scaled: {self.is_scaled_up}")
         print("🧊 FREEZING GAME - Only timer will continue")
     
@@ -606,98 +989,74 @@ class Villager:
         """Hide the speech image and reset scaling"""
         self.show_speech_image = False
         self.is_scaled_up = False
+        self.dialog = None
+        self.pick_animation()
         print("🔓 UNFREEZING GAME - Resuming normal gameplay")
     
+    def layout_dialog(self):
+        """Lay out the help dialog for the villager's position and scale (call again if is_scaled_up changes)"""
+        self.dialog = DialogLayout(self)
+        # Button positions for click detection (accessed through villager_manager)
+        if hasattr(self, 'manager') and self.manager:
+            self.manager.help_button_rect = self.dialog.help_rect
+            self.manager.ignore_button_rect = self.dialog.ignore_rect
+    
+    def baseline(self):
+        """Y coordinate of the villager's feet, used for depth sorting"""
+        if self.is_scaled_up:
+            # The villager in an open dialog is drawn in front of everything
+            return math.inf
+        return self.y + 15
+    
     def draw(self, surface):
-        """Draw the villager and optional exclamation or speech image"""
-        # Draw villager sprite (scaled up if is_scaled_up is True)
+        """Draw the villager and optional exclamation or speech image (surface or RenderQueue)"""
+        self.draw_body(surface)
+        self.draw_overlay(surface)
+    
+    def pick_animation(self):
+        """Switch to the talk, walk or idle animation to match the villager's state"""
+        if not self.animations:
+            return
+        if self.show_speech_image:
+            self.animation_name = "talk"
+        elif self.walking:
+            self.animation_name = "walk"
+        else:
+            self.animation_name = "idle"
+        self.animation = self.animations[self.animation_name]
+    
+    def draw_body(self, surface):
+        """Draw just the villager sprite (scaled up if is_scaled_up is True)"""
         if self.image:
-            if self.is_scaled_up:
-                # Scale up villager to 32x32 (from 15x15)
-                scaled_villager = pygame.transform.scale(self.image, (32, 32))
+            # Current frame comes from the shared clock; no per-villager timing or surfaces
+            image = self.animation.current[self.animation_phase] if self.animation else self.image
+            if self.is_scaled_up and self.zoomed_animations:
+                # Same frame from the 30x30 (DIALOG_ZOOM) animations, built at load time
+                zoomed = self.zoomed_animations[self.animation_name]
+                scaled_villager = zoomed.frame_at(animation_clock.now, self.animation_phase)
                 # Adjust position to keep centered (offset by half the size difference)
-                villager_x = int(self.x - 8.5)  # Move left by (32-15)/2 = 8.5
-                villager_y = int(self.y - 8.5)  # Move up by (32-15)/2 = 8.5
+                villager_x = int(self.x - 7.5)  # Move left by (30-15)/2 = 7.5
+                villager_y = int(self.y - 7.5)  # Move up by (30-15)/2 = 7.5
                 surface.blit(scaled_villager, (villager_x, villager_y))
             else:
-                surface.blit(self.image, (int(self.x), int(self.y)))
+                surface.blit(image, (int(self.x), int(self.y)))
         else:
-            # Fallback: draw a small colored circle (scaled if needed)
-            if self.is_scaled_up:
-                pygame.draw.circle(surface, WHITE, (int(self.x + 7.5), int(self.y + 7.5)), 8)  # Double radius for 32x32
-            else:
-                pygame.draw.circle(surface, WHITE, (int(self.x + 7.5), int(self.y + 7.5)), 4)
-        
-        # Draw speech image if active (takes priority over exclamation)
+            # Fallback: draw a small white circle (scaled if needed)
+            radius = 4 * DIALOG_ZOOM if self.is_scaled_up else 4  # Zoomed with the 30x30 (15 * DIALOG_ZOOM) frame
+            surface.blit(get_fallback_villager_image(radius), (int(self.x + 7.5) - radius, int(self.y + 7.5) - radius))
+    
+    def draw_overlay(self, surface):
+        """Draw the exclamation or speech image above the villager"""
+        # Draw speech image if active (takes priority over exclamation), laid out when it opened
         if self.show_speech_image:
-            # Choose appropriate speech image based on villager type
-            speech_img = None
-            if self.sprite_name == "Blacksmith.png" and blacksmith_help_img:
-                speech_img = blacksmith_help_img
-            elif (self.sprite_name == "Farmer_Female.png" or self.sprite_name == "Farmer_Male.png") and farmer_help_img:
-                speech_img = farmer_help_img
-            
-            if speech_img:
-                if self.is_scaled_up:
-                    # Scale up help request to 128x128 (from 64x64)
-                    scaled_help_img = pygame.transform.scale(speech_img, (128, 128))
-                    # Position scaled speech bubble above scaled villager
-                    speech_x = int(self.x - scaled_help_img.get_width() // 2 + 7 - 20 + 32 + 12 + 30)  # Added +30 to move right
-                    speech_y = int(self.y - scaled_help_img.get_height() - 5 + 10 + 15)  # Added +15 to move down
-                    print(f"🗨️ Drawing SCALED speech image for {self.sprite_name} at ({speech_x}, {speech_y})")
-                    surface.blit(scaled_help_img, (speech_x, speech_y))
-                    
-                    # Draw buttons to the right of the speech bubble (scaled)
-                    if help_button_img and ignore_button_img:
-                        scaled_help_btn = pygame.transform.scale(help_button_img, (64, 64))  # Half size: was 128x128, now 64x64
-                        scaled_ignore_btn = pygame.transform.scale(ignore_button_img, (64, 64))
-                        
-                        # Position buttons to the right of speech bubble
-                        button_x = speech_x + scaled_help_img.get_width() + 16 - 30  # Speech bubble width + 16px gap - 30px left
-                        help_button_y = speech_y + 10  # Top button
-                        ignore_button_y = speech_y + 144 - 125 + 25  # Move up by 125 pixels + 25px down
-                        
-                        surface.blit(scaled_help_btn, (button_x, help_button_y))
-                        surface.blit(scaled_ignore_btn, (button_x, ignore_button_y))
-                        print(f"🔘 Drawing SCALED buttons (64x64) to RIGHT at ({button_x}, {help_button_y}) and ({button_x}, {ignore_button_y})")
-                        
-                        # Store button positions for click detection (accessed through villager_manager)
-                        if hasattr(self, 'manager') and self.manager:
-                            self.manager.help_button_rect = pygame.Rect(button_x, help_button_y, 64, 64)
-                            self.manager.ignore_button_rect = pygame.Rect(button_x, ignore_button_y, 64, 64)
-                else:
-                    # Normal size speech bubble
-                    speech_x = int(self.x - speech_img.get_width() // 2 + 7 - 20 + 32 + 12 + 30)  # Added +30 to move right
-                    speech_y = int(self.y - speech_img.get_height() - 5 + 10 + 15)  # Added +15 to move down
-                    print(f"🗨️ Drawing speech image for {self.sprite_name} at ({speech_x}, {speech_y})")
-                    surface.blit(speech_img, (speech_x, speech_y))
-                    
-                    # Draw buttons to the right of the speech bubble (normal size)
-                    if help_button_img and ignore_button_img:
-                        # Scale buttons to half size
-                        small_help_btn = pygame.transform.scale(help_button_img, (32, 32))  # Half size: was 64x64, now 32x32
-                        small_ignore_btn = pygame.transform.scale(ignore_button_img, (32, 32))
-                        
-                        # Position buttons to the right of speech bubble
-                        button_x = speech_x + speech_img.get_width() + 8 - 30  # Speech bubble width + 8px gap - 30px left
-                        help_button_y = speech_y - 5   # Top button (aligned with top of speech bubble)
-                        ignore_button_y = speech_y + 70 - 125 + 25  # Move up by 125 pixels + 25px down
-                        
-                        surface.blit(small_help_btn, (button_x, help_button_y))
-                        surface.blit(small_ignore_btn, (button_x, ignore_button_y))
-                        print(f"🔘 Drawing buttons (32x32) to RIGHT at ({button_x}, {help_button_y}) and ({button_x}, {ignore_button_y})")
-                        
-                        # Store button positions for click detection (accessed through villager_manager)
-                        if hasattr(self, 'manager') and self.manager:
-                            self.manager.help_button_rect = pygame.Rect(button_x, help_button_y, 32, 32)
-                            self.manager.ignore_button_rect = pygame.Rect(button_x, ignore_button_y, 32, 32)
-            elif self.show_speech_image:
-                print(f"❌ Speech image requested but no appropriate image found for {self.sprite_name}")
+            if self.dialog:
+                for image, position in self.dialog.blits:
+                    surface.blit(image, position)
         # Draw exclamation if active and no speech image is showing
         elif self.show_exclamation and exclamation_img:
             # Position exclamation above villager (scaled or normal)
             if self.is_scaled_up:
-                scaled_exclamation = pygame.transform.scale(exclamation_img, (32, 32))  # Double size for scaled villager
+                scaled_exclamation = exclamation_zoomed_img  # Double size for scaled villager
                 exclamation_x = int(self.x - 8)  # Center above 32px wide villager
                 exclamation_y = int(self.y - 40)  # Higher above scaled villager
                 surface.blit(scaled_exclamation, (exclamation_x, exclamation_y))
@@ -723,6 +1082,10 @@ class HammerItem:
         self.collected = True
         print("🔨 Hammer collected!")
     
+    def baseline(self):
+        """Y coordinate of the hammer's bottom edge, used for depth sorting"""
+        return self.y + 32
+    
     def draw(self, surface):
         """Draw the hammer if not collected"""
         if not self.collected and blacksmith_hammer_img:
@@ -739,25 +1102,49 @@ class VillagerManager:
         self.hammer = None  # Current hammer on the island
         self.help_button_rect = None  # Track help button position
         self.ignore_button_rect = None  # Track ignore button position
+        self.stress_mode = False  # Crowd stress test (sprites reused, less logging)
+        self.draw_order = []  # Villagers in back-to-front order, kept between frames
+        self.navigator = ISLAND_NAVIGATOR  # Walkable grid (replaced by the town's own)
+        self.crowd_grid = SpatialGrid(SEPARATION_RADIUS)  # Neighbour lookup for separation
+        self.separation_cursor = 0  # Next villager due a separation pass
         
-    def spawn_villagers(self):
-        """Spawn 7 villagers with unique sprites at random positions"""
+    def spawn_villagers(self, count=VILLAGER_COUNT, unique_sprites=True):
+        """Spawn villagers at random positions (unique sprites unless stress testing)"""
+        for _ in self.iter_spawn_villagers(count, unique_sprites):
+            pass
+    
+    def iter_spawn_villagers(self, count=VILLAGER_COUNT, unique_sprites=True, chunk_size=250):
+        """Spawn villagers like spawn_villagers, yielding after every chunk_size villagers"""
         self.villagers.clear()
+        self.draw_order = []
+        # Crowds larger than the sprite set have to reuse sprites
+        unique_sprites = unique_sprites and count <= len(villager_sprites)
+        self.stress_mode = not unique_sprites
         
         # Shuffle sprite list to ensure no repeats
         available_sprites = villager_sprites.copy()
         random.shuffle(available_sprites)
         
-        for i in range(7):
-            sprite_name = available_sprites[i]
-            # Random starting position within very restrictive green area boundaries
-            x = random.uniform(170, 420)
-            y = random.uniform(70, 280)
+        for i in range(count):
+            if unique_sprites:
+                sprite_name = available_sprites[i]
+            else:
+                sprite_name = random.choice(villager_sprites)
+            # Random starting position on a walkable cell
+            foot_x, foot_y = self.navigator.random_point()
+            x = foot_x - VILLAGER_FOOT_X
+            y = foot_y - VILLAGER_FOOT_Y
             
             villager = Villager(sprite_name, x, y)
             villager.manager = self  # Give villager reference to manager for button tracking
             self.villagers.append(villager)
-            print(f"👥 Spawned villager {sprite_name} at ({x:.1f}, {y:.1f})")
+            if not self.stress_mode:
+                print(f"👥 Spawned villager {sprite_name} at ({x:.1f}, {y:.1f})")
+            if (i + 1) % chunk_size == 0:
+                yield
+        
+        if self.stress_mode:
+            print(f"🏃 STRESS: Spawned {count} villagers with reused sprites")
         
         # One random villager gets immediate exclamation (respects 2 villager limit)
         if self.villagers and self.get_active_exclamation_count() < 2:
@@ -780,6 +1167,9 @@ class VillagerManager:
         for villager in self.villagers:
             villager.update(dt)
         
+        # Nudge overlapping villagers apart
+        self.separate_crowd(dt)
+        
         # Handle periodic exclamation chances
         self.exclamation_timer += dt
         if self.exclamation_timer >= self.exclamation_interval:
@@ -798,14 +1188,49 @@ class VillagerManager:
                         # Break after triggering one to avoid triggering multiple at once
                         break
     
+    def separate_crowd(self, dt):
+        """Separation steering for the next batch of villagers, using the bucket grid for neighbours"""
+        if self.crowd_grid.count != len(self.villagers):
+            # New population - bucket everyone from scratch
+            self.crowd_grid.rebuild(self.villagers)
+        else:
+            # Everyone walked this frame, so the whole crowd is re-bucketed (not just the batch) to keep neighbours right
+            self.crowd_grid.move_all(self.villagers)
+        if self.separation_cursor >= len(self.villagers):
+            self.separation_cursor = 0
+        batch = self.villagers[self.separation_cursor:self.separation_cursor + SEPARATION_BATCH]
+        self.separation_cursor += SEPARATION_BATCH
+        # A plain per-frame push: big crowds spread apart more slowly instead of jumping once per pass
+        strength = SEPARATION_STRENGTH * dt * 60
+        separate(batch, self.crowd_grid, SEPARATION_RADIUS, strength, can_move_to=self.can_stand_at)
+    
+    def can_stand_at(self, x, y):
+        """True if a villager drawn at (x, y) would have its feet on a walkable cell"""
+        cell = self.navigator.cell_at(x + VILLAGER_FOOT_X, y + VILLAGER_FOOT_Y)
+        return cell != NO_PATH and self.navigator.walkable[cell] == 1
+    
+    def get_draw_order(self):
+        """Return the persistent depth-sort list, resynced if the population changed"""
+        if len(self.draw_order) != len(self.villagers):
+            self.draw_order = list(self.villagers)
+        return self.draw_order
+    
+    def draw_overlays(self, surface):
+        """Draw exclamations and speech bubbles above the world"""
+        for villager in self.villagers:
+            if villager.show_exclamation or villager.show_speech_image:
+                villager.draw_overlay(surface)
+    
     def draw(self, surface):
-        """Draw all villagers and hammer"""
+        """Draw all villagers and hammer with a single batched blit"""
         for villager in self.villagers:
-            villager.draw(surface)
+            villager.draw(villager_render_queue)
         
         # Draw hammer if it exists
         if self.hammer and not self.hammer.collected:
-            self.hammer.draw(surface)
+            self.hammer.draw(villager_render_queue)
+        
+        villager_render_queue.flush(surface)
     
     def handle_click(self, mouse_x, mouse_y):
         """Handle click on villagers - show speech for blacksmith or remove exclamation for others"""
@@ -816,9 +1241,11 @@ class VillagerManager:
             # Check if help button was clicked
             if self.help_button_rect and self.help_button_rect.collidepoint(mouse_x, mouse_y):
                 print("✅ Help button clicked!")
-                # Spawn hammer at random location
-                hammer_x = random.uniform(170, 420)
-                hammer_y = random.uniform(70, 280)
+                sound_bank.play("help")
+                # Spawn hammer at a random walkable spot (32x32 sprite centered on it)
+                spot_x, spot_y = self.navigator.random_point()
+                hammer_x = spot_x - 16
+                hammer_y = spot_y - 16
                 self.hammer = HammerItem(hammer_x, hammer_y)
                 print(f"🔨 Hammer spawned at ({hammer_x:.1f}, {hammer_y:.1f})")
                 
@@ -835,6 +1262,7 @@ class VillagerManager:
             # Check if ignore button was clicked
             if self.ignore_button_rect and self.ignore_button_rect.collidepoint(mouse_x, mouse_y):
                 print("❌ Ignore button clicked!")
+                sound_bank.play("click")
                 # Just dismiss dialogue
                 for villager in self.villagers:
                     if villager.show_speech_image:
@@ -859,13 +1287,16 @@ class VillagerManager:
         # Check if hammer was clicked
         if self.hammer and not self.hammer.collected and self.hammer.is_clicked(mouse_x, mouse_y):
             self.hammer.collect()
+            sound_bank.play("hammer")
             return True
         
         for villager in self.villagers:
-            print(f"🔍 Checking villager {villager.sprite_name} at ({villager.x:.1f}, {villager.y:.1f}) - exclamation: {villager.show_exclamation}")
+            if not self.stress_mode:
+                print(f"🔍 Checking villager {villager.sprite_name} at ({villager.x:.1f}, {villager.y:.1f}) - exclamation: {villager.show_exclamation}")
             if villager.show_exclamation and villager.is_clicked(mouse_x, mouse_y):
                 # Special handling for blacksmith and farmers: show help request image
                 print(f"✅ Hit villager: {villager.sprite_name}")
+                sound_bank.play("exclamation")
                 if villager.sprite_name == "Blacksmith.png":
                     villager.show_help_request()
                     self.is_frozen = True  # Freeze the game
@@ -929,303 +1360,741 @@ class VillagerManager:
             print(f"  [{i}] {villager.sprite_name} {status}{scale} at ({villager.x:.1f}, {villager.y:.1f})")
         return len(self.villagers)
 
-async def main():
+# Keyboard bindings (rebindable through keymap.json)
+KEYMAP_FILE = "keymap.json"
+DEFAULT_KEYMAP = {
+    "back_to_menu": ["escape"],
+    "toggle_debug": ["f12"],
+    "continue_to_menu": ["space"],
+    "restart": ["r"],
+    "force_end": ["e"],
+    "force_exclamation": ["x"],
+    "stress_level": ["s"],
+    "list_villagers": ["l"],
+    "force_villager": ["0", "1", "2", "3", "4", "5", "6"],  # Key position = villager index
+    "save_clip": ["f9"],
+    "cycle_scale": ["f10"],
+}
+
+class Game:
+    """Game state shared by the event handlers and the main loop"""
+    def __init__(self, stress_count=None, keymap_path=KEYMAP_FILE, town_pool_depth=TOWN_POOL_DEPTH):
+        self.running = True
+        
+        # Game state management
+        self.state = GameState.MENU
+        
+        # Timer variables (for game state)
+        self.start_time = get_ticks()
+        self.time_remaining = GAME_DURATION
+        self.town_buildings = []
+        
+        # Town layout (regenerated every time the player leaves the menu)
+        self.town_layout = None
+        self.town_spots = FIXED_TOWN_LAYOUT
+        self.spot_rects = TOWN_SPOT_RECTS
+        self.town_background = None
+        self.prepared_town = None  # Generated town being played (None = the fixed layout)
+        self.town_pool = TownPool(town_pool_depth)
+        
+        # Rolling buffer of the last seconds of gameplay, saved as a clip with F9
+        self.clip_buffer = ClipBuffer((WINDOW_WIDTH, WINDOW_HEIGHT))
+        
+        # Villager system
+        self.villager_manager = VillagerManager()
+        self.previous_time = get_ticks()
+        
+        # Debug system
+        self.debug_mode = False
+        self.debug_font = pygame.font.Font(None, 24)
+        
+        # Crowd stress test (None = normal run with unique villagers)
+        self.stress_count = stress_count
+        self.frame_stats = FrameStats()
+        if stress_count:
+            print(f"🏃 STRESS: Stress mode enabled with {stress_count} villagers")
+        
+        # Building placement variables
+        self.selected_building_type = "House"  # Default selection
+        self.building_placements = {}  # Dictionary mapping spot index to building type
+        self.hovered_spot_index = -1
+        
+        # Create play button
+        self.play_button = Button(
+            WINDOW_WIDTH // 2 - 75, 220, 150, 50, 
+            "PLAY", button_font
+        )
+        
+        # Building selection buttons, made once the building sprites have loaded (create_building_buttons)
+        self.building_buttons = {}
+        
+        # Create start game button (centered at top, 10px wider on each side)
+        self.start_game_button = Button(
+            WINDOW_WIDTH // 2 - 50, 10, 100, 40, 
+            "Start", button_font
+        )
+        
+        # Event dispatch: (state, event type, key or mouse button) -> handler
+        self.dispatch_table = build_dispatch_table(load_keymap(keymap_path, DEFAULT_KEYMAP))
+        
+        # One scene object per state, entered/exited on state changes
+        self.clock = None  # Set by main() so scenes can read the FPS
+        self.input_state = None  # Set by main() so a window scale change reaches the input layer
+        self.scenes = {
+            GameState.MENU: MenuScene(),
+            GameState.BUILDING_PLACEMENT: PlacementScene(),
+            GameState.PLAYING: PlayingScene(),
+            GameState.END: EndScene(),
+        }
+        self.scene = self.scenes[self.state]
+        self.scene.enter(self)
+    
+    def create_building_buttons(self):
+        """Create the building selection buttons (32x32 sprite buttons horizontally aligned at bottom)"""
+        self.building_buttons = {
+            "House": ImageButton(
+                10, WINDOW_HEIGHT - 40, 32, 32, 
+                building_images["House"], YELLOW, PURPLE
+            ),
+            "Farm": ImageButton(
+                50, WINDOW_HEIGHT - 40, 32, 32, 
+                building_images["Farm"], YELLOW, GREEN
+            ),
+            "Factory": ImageButton(
+                90, WINDOW_HEIGHT - 40, 32, 32, 
+                building_images["Factory"], YELLOW, ORANGE
+            ),
+        }
+        self.select_building_type(self.selected_building_type)
+    
+    def change_state(self, new_state):
+        """Leave the current scene and enter the one for new_state"""
+        self.scene.exit(self)
+        self.state = new_state
+        self.scene = self.scenes[new_state]
+        self.scene.enter(self)
+    
+    def dispatch(self, event):
+        """Run the handler bound to this event in the current state (one dict lookup)"""
+        handler = self.dispatch_table.get((self.state, event.type, event_detail(event)))
+        if handler:
+            handler(self, event)
+    
+    def new_town(self, seed=None):
+        """Switch to a fresh town (from the pool unless a seed is given) and clear placements"""
+        if seed is None:
+            prepared_town = self.town_pool.take()
+        else:
+            prepared_town = RunPreparer(TownPool.town_steps(seed)).finish()
+        self.prepared_town = prepared_town
+        self.town_layout = prepared_town.layout
+        self.town_spots = self.town_layout.buildings
+        self.spot_rects = get_spot_rects(self.town_spots)
+        self.town_background = prepared_town.background
+        self.building_placements = {}
+        self.hovered_spot_index = -1
+        print(f"🗺️ Generated town {self.town_layout.seed} with {len(self.town_spots)} building spots")
+    
+    def start_run(self, prepared_run=None):
+        """Start a 60 second run, swapping in a prepared town and population if given"""
+        asset_loader.finish()  # Villagers and their dialog, if the player got here before they loaded
+        if prepared_run is None:
+            # Build everything now (first run after building placement)
+            prepared_run = RunPreparer(self.prepare_run_steps()).finish()
+        self.town_buildings = prepared_run.town_buildings
+        self.villager_manager = prepared_run.villager_manager
+        self.frame_stats.reset()
+        animation_clock.reset()
+        sound_bank.play_music()
+        self.start_time = get_ticks()
+        self.time_remaining = GAME_DURATION
+        self.previous_time = get_ticks()
+        self.change_state(GameState.PLAYING)
+    
+    def prepare_run_steps(self):
+        """Generator that builds the next run's town and villagers a piece at a time"""
+        town_buildings = create_town_with_custom_buildings(self.building_placements, self.town_spots)
+        yield
+        villager_manager = VillagerManager()
+        if self.prepared_town:
+            # Only lots the player built on are walls; empty lots stay walkable grass
+            villager_manager.navigator = self.prepared_town.navigator_for(self.building_placements)
+            yield
+        yield from villager_manager.iter_spawn_villagers(self.stress_count or VILLAGER_COUNT,
+                                                         unique_sprites=not self.stress_count)
+        return PreparedRun(town_buildings, villager_manager)
+    
+    def spawn_villagers(self):
+        """Spawn the normal village, or the stress-test crowd if enabled"""
+        self.villager_manager.spawn_villagers(self.stress_count or VILLAGER_COUNT, unique_sprites=not self.stress_count)
+        self.frame_stats.reset()
+    
+    def select_building_type(self, building_type):
+        """Select the building type to place and update the button selection states"""
+        self.selected_building_type = building_type
+        for button_type, button in self.building_buttons.items():
+            button.set_selected(button_type == building_type)
+
+def event_detail(event):
+    """The key or mouse button that identifies an event in the dispatch table"""
+    if event.type == pygame.KEYDOWN:
+        return event.key
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return event.button
+    return None
+
+def action_quit(game, event):
+    """Close the game"""
+    game.running = False
+
+def action_menu_click(game, event):
+    """Left click on the main menu"""
+    if game.play_button.handle_event(event):
+        # Go to building placement phase on a freshly generated town
+        sound_bank.play("click")
+        if not game.building_buttons:
+            game.create_building_buttons()
+        game.new_town()
+        game.change_state(GameState.BUILDING_PLACEMENT)
+        print("🏗️ Entering building placement phase...")
+
+BUILDING_SELECT_MESSAGES = {
+    "House": "🏠 Selected House for placement",
+    "Farm": "🌾 Selected Farm for placement",
+    "Factory": "🏭 Selected Factory for placement",
+}
+
+def action_placement_click(game, event):
+    """Left click during building placement: select a type, start, or place on a spot"""
+    for building_type, button in game.building_buttons.items():
+        if button.handle_event(event):
+            sound_bank.play("click")
+            game.select_building_type(building_type)
+            print(BUILDING_SELECT_MESSAGES[building_type])
+            return
+    
+    if game.start_game_button.handle_event(event):
+        # Start the actual game with custom buildings
+        print("🎮 Starting game with custom buildings...")
+        sound_bank.play("click")
+        game.start_run()
+        return
+    
+    # Handle spot clicking for building placement
+    clicked_spot_index = get_hovered_spot_index(*event.base_pos, game.spot_rects)
+    if clicked_spot_index != -1:
+        game.building_placements[clicked_spot_index] = game.selected_building_type
+        print(f"🏗️ Placed {game.selected_building_type} at spot position {clicked_spot_index}")
+
+def action_playing_click(game, event):
+    """Left click while playing: interact with villagers"""
+    # Mouse position for villager interactions, already in base surface coordinates
+    base_x, base_y = event.base_pos
+    
+    # Check if we clicked on a villager with an exclamation
+    if not game.villager_manager.handle_click(base_x, base_y):
+        # If no villager was clicked, draw a small white square at click position (debug)
+        pygame.draw.rect(base_surface, WHITE, (base_x-5, base_y-5, 10, 10))
+
+def action_back_to_menu(game, event, index=0):
+    """Return to the main menu"""
+    game.change_state(GameState.MENU)
+    print("🔙 Returning to main menu...")
+
+def action_toggle_debug(game, event, index=0):
+    """Toggle debug mode"""
+    game.debug_mode = not game.debug_mode
+    print(f"🐛 DEBUG: Debug mode {'ON' if game.debug_mode else 'OFF'}")
+
+def action_restart(game, event, index=0):
+    """Restart the game with same building layout, using the run prepared on the end screen"""
+    print("🔄 Restarting game...")
+    game.start_run(game.scene.take_prepared_run())
+
+def action_force_end(game, event, index=0):
+    """Force end timer (debug) - adjust start_time so calculation results in 0"""
+    current_time = get_ticks()
+    game.start_time = current_time - (GAME_DURATION * 1000)  # Make elapsed_time = GAME_DURATION
+    print("🐛 DEBUG: Forced timer end")
+
+def action_force_exclamation(game, event, index=0):
+    """Force exclamation on a random villager (debug)"""
+    forced_villager = game.villager_manager.force_random_exclamation()
+    if forced_villager:
+        print(f"🐛 DEBUG: Forced exclamation on {forced_villager}")
+
+def action_stress_level(game, event, index=0):
+    """Step to the next crowd stress level (debug)"""
+    game.stress_count = next_stress_level(game.stress_count)
+    game.spawn_villagers()
+    print(f"🐛 DEBUG: Stress level {game.stress_count or 'OFF'}")
+
+def action_list_villagers(game, event, index=0):
+    """List all villagers (debug)"""
+    game.villager_manager.list_all_villagers()
+
+def action_force_villager(game, event, index=0):
+    """Force exclamation on the villager matching the key's position in the binding (debug)"""
+    game.villager_manager.force_specific_villager_exclamation(index)
+
+def action_save_clip(game, event, index=0):
+    """Save the last seconds of gameplay as a clip (written in the background)"""
+    game.clip_buffer.save()
+
+def action_cycle_scale(game, event, index=0):
+    """Switch the window to the next scale (1x, 2x, 3x, back to 1x)"""
+    scale = WINDOW_SCALES[(WINDOW_SCALES.index(SCALE) + 1) % len(WINDOW_SCALES)]
+    set_window_scale(scale)
+    if game.input_state:
+        game.input_state.scale = scale
+
+def debug_only(handler):
+    """Wrap a handler so it only runs while debug mode is on"""
+    def wrapper(game, event, index=0):
+        if game.debug_mode:
+            handler(game, event, index)
+    return wrapper
+
+# Rebindable key actions: name -> (states the action is active in, handler)
+KEY_ACTIONS = {
+    "back_to_menu": ((GameState.BUILDING_PLACEMENT, GameState.PLAYING), action_back_to_menu),
+    "toggle_debug": ((GameState.BUILDING_PLACEMENT, GameState.PLAYING, GameState.END), action_toggle_debug),
+    "continue_to_menu": ((GameState.END,), action_back_to_menu),
+    "restart": ((GameState.END,), action_restart),
+    "force_end": ((GameState.PLAYING,), debug_only(action_force_end)),
+    "force_exclamation": ((GameState.PLAYING,), debug_only(action_force_exclamation)),
+    "stress_level": ((GameState.PLAYING,), debug_only(action_stress_level)),
+    "list_villagers": ((GameState.PLAYING,), debug_only(action_list_villagers)),
+    "force_villager": ((GameState.PLAYING,), debug_only(action_force_villager)),
+    "save_clip": ((GameState.PLAYING, GameState.END), action_save_clip),
+    "cycle_scale": (tuple(GameState), action_cycle_scale),
+}
+
+# Mouse actions: state -> handler for a left click
+CLICK_ACTIONS = {
+    GameState.MENU: action_menu_click,
+    GameState.BUILDING_PLACEMENT: action_placement_click,
+    GameState.PLAYING: action_playing_click,
+}
+
+def build_dispatch_table(bindings):
+    """Build the (state, event type, key or button) -> handler table from key bindings"""
+    table = {}
+    for state in GameState:
+        table[(state, pygame.QUIT, None)] = action_quit
+    for state, handler in CLICK_ACTIONS.items():
+        table[(state, pygame.MOUSEBUTTONDOWN, 1)] = handler
+    
+    for action, (states, handler) in KEY_ACTIONS.items():
+        for index, key_code in enumerate(bindings.get(action, [])):
+            if key_code is None:
+                continue
+            for state in states:
+                entry = (state, pygame.KEYDOWN, key_code)
+                if entry in table:
+                    print(f"❌ Key '{pygame.key.name(key_code)}' is bound twice in {state.name} - '{action}' wins")
+                table[entry] = functools.partial(handler, index=index)
+    return table
+
+class PreparedRun:
+    """A ready-to-play town and villager population for the next run"""
+    def __init__(self, town_buildings, villager_manager):
+        self.town_buildings = town_buildings
+        self.villager_manager = villager_manager
+
+class PreparedTown:
+    """A generated town layout, its composed static background and its navigators"""
+    def __init__(self, layout, background):
+        self.layout = layout
+        self.background = background
+        self.navigators = {}  # Frozenset of built spot indices -> Navigator (flow fields cached inside)
+    
+    def navigator_for(self, building_placements):
+        """Navigator that only blocks the lots holding a building, reused by restarts with the same placements"""
+        key = frozenset(building_placements)
+        navigator = self.navigators.get(key)
+        if navigator is None:
+            spots = self.layout.buildings
+            navigator = Navigator(self.layout.walkable_with((spots[i]["col"], spots[i]["row"]) for i in key))
+            self.navigators[key] = navigator
+        return navigator
+
+class RunPreparer:
+    """Steps a run-building generator across idle frames within a time budget"""
+    def __init__(self, steps):
+        self.steps = steps
+        self.result = None
+    
+    @property
+    def ready(self):
+        """True once the PreparedRun has been built"""
+        return self.result is not None
+    
+    def step(self, budget_ms=4.0):
+        """Advance preparation until the frame budget is used up or it finishes"""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while not self.ready and time.perf_counter() < deadline:
+            try:
+                next(self.steps)
+            except StopIteration as done:
+                self.result = done.value
+        return self.ready
+    
+    def finish(self):
+        """Complete whatever is left right now and return the PreparedRun"""
+        while not self.ready:
+            self.step(budget_ms=1000)
+        return self.result
+
+class TownPool:
+    """Towns generated ahead of time, a step at a time on idle frames"""
+    def __init__(self, depth=TOWN_POOL_DEPTH):
+        self.depth = depth
+        self.towns = deque()
+        self.preparer = None  # Town currently being built
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def town_steps(seed):
+        """Generator that builds one PreparedTown (layout, then background)"""
+        layout = generate_town(seed)
+        yield
+        return PreparedTown(layout, compose_town_background(layout))
+    
+    @property
+    def full(self):
+        """True once depth towns are waiting"""
+        return len(self.towns) >= self.depth
+    
+    def step(self, budget_ms=2.0):
+        """Top up the pool until the frame budget is used up or it is full"""
+        deadline = time.perf_counter() + budget_ms / 1000
+        while not self.full and time.perf_counter() < deadline:
+            if self.preparer is None:
+                self.preparer = RunPreparer(self.town_steps(random.getrandbits(32)))
+            if self.preparer.step(budget_ms=(deadline - time.perf_counter()) * 1000):
+                self.towns.append(self.preparer.result)
+                self.preparer = None
+    
+    def take(self):
+        """Hand over the next town, building one right now if the pool is empty"""
+        if self.towns:
+            self.hits += 1
+            return self.towns.popleft()
+        self.misses += 1
+        print(f"🗺️ Town pool empty - generating on demand (hits {self.hits}, misses {self.misses})")
+        preparer = self.preparer or RunPreparer(self.town_steps(random.getrandbits(32)))
+        self.preparer = None
+        return preparer.finish()
+
+class Scene:
+    """One game state: owns its per-frame update/draw and enter/exit hooks"""
+    idle = False  # True if spare frame time can go to the town pool
+    recorded = False  # True if frames go into the clip buffer
+    
+    def view_state(self, game):
+        """What the scene's picture depends on apart from input, or None while it changes every frame.
+        
+        While it stays the same and no input arrives the frame isn't redrawn,
+        and the loop rests for rest_ms instead of running at FPS.
+        """
+        return None
+    
+    def rest_ms(self, game):
+        """Longest the loop may sleep before the view state can change on its own"""
+        return REST_MS
+    
+    def enter(self, game):
+        """Called when the game switches to this scene"""
+    
+    def exit(self, game):
+        """Called when the game leaves this scene"""
+    
+    def update_hover(self, game, pointer_pos):
+        """Resolve hover state for this scene's widgets"""
+    
+    def update(self, game):
+        """Advance the scene by one frame"""
+    
+    def draw(self, game):
+        """Draw the scene onto the base surface"""
+
+class MenuScene(Scene):
+    """Main menu with the PLAY button"""
+    idle = True
+    
+    def update_hover(self, game, pointer_pos):
+        game.play_button.update_hover(pointer_pos)
+    
+    def update(self, game):
+        # PLAY opens the placement screen, which needs the town sprites
+        game.play_button.enabled = asset_loader.ready("town")
+    
+    def view_state(self, game):
+        # Static once the progress bar is gone (hover only changes with input)
+        return "menu" if asset_loader.done else None
+    
+    def draw(self, game):
+        # Draw menu
+        draw_menu(None if asset_loader.done else asset_loader.progress)
+        game.play_button.draw(base_surface)
+
+class PlacementScene(Scene):
+    """Building placement phase before a run"""
+    idle = True
+    
+    def update_hover(self, game, pointer_pos):
+        for button in game.building_buttons.values():
+            button.update_hover(pointer_pos)
+        game.start_game_button.update_hover(pointer_pos)
+        game.hovered_spot_index = get_hovered_spot_index(*pointer_pos, game.spot_rects)
+    
+    def view_state(self, game):
+        # Only input changes this screen, apart from the town pool line in debug mode
+        pool = game.town_pool
+        return (game.debug_mode, len(pool.towns), pool.hits, pool.misses)
+    
+    def draw(self, game):
+        # Draw building placement interface
+        draw_building_placement_ui(game.selected_building_type, game.hovered_spot_index, game.building_placements,
+                                   game.town_spots, game.spot_rects, game.town_background)
+        
+        # Draw building selection buttons
+        for button in game.building_buttons.values():
+            button.draw(base_surface)
+        game.start_game_button.draw(base_surface)
+        
+        # Draw debug info if debug mode is active
+        if game.debug_mode:
+            pool = game.town_pool
+            debug_text = game.debug_font.render(
+                f"DEBUG MODE - F12: Toggle | Town pool {len(pool.towns)}/{pool.depth}, "
+                f"{pool.hits} hits, {pool.misses} misses", TEXT_ANTIALIAS, YELLOW)
+            base_surface.blit(debug_text, (10, WINDOW_HEIGHT - 60))
+
+class PlayingScene(Scene):
+    """The 60 second run"""
+    recorded = True
+    
+    def __init__(self):
+        self.sim_ms = 0.0
+    
+    def view_state(self, game):
+        # A help dialog freezes the village: only the timer and the animation frames still change
+        if not game.villager_manager.is_frozen or game.debug_mode or game.stress_count:
+            return None
+        return int(game.time_remaining), int(animation_clock.now * VILLAGER_ANIMATION_FPS)
+    
+    def rest_ms(self, game):
+        # Until the next animation frame or timer second, whichever comes first
+        frame_time = 1 / VILLAGER_ANIMATION_FPS
+        return min(frame_time - animation_clock.now % frame_time, game.time_remaining % 1 or 1) * 1000
+    
+    def update(self, game):
+        # Update timer
+        current_time = get_ticks()
+        elapsed_time = (current_time - game.start_time) / 1000.0  # Convert to seconds
+        game.time_remaining = max(0, GAME_DURATION - elapsed_time)
+        
+        # Update villagers (will be skipped if frozen)
+        dt = (current_time - game.previous_time) / 1000.0  # Delta time in seconds
+        animation_clock.advance(dt)  # Keeps running while frozen so the talk animation plays
+        sim_start = time.perf_counter()
+        game.villager_manager.update(dt)
+        self.sim_ms = (time.perf_counter() - sim_start) * 1000
+        game.previous_time = current_time
+        
+        # Check if timer reached 0 (disaster time!)
+        if game.time_remaining <= 0:
+            print("💥 DISASTER! Going to end screen...")
+            game.change_state(GameState.END)
+    
+    def draw(self, game):
+        # Draw the town, villagers and HUD
+        draw_start = time.perf_counter()
+        draw_playing_frame(game.town_buildings, game.villager_manager, game.time_remaining, game.debug_mode, game.debug_font,
+                           game.town_background)
+        game.frame_stats.record(self.sim_ms, (time.perf_counter() - draw_start) * 1000)
+        
+        # Report crowd stress timings
+        if game.stress_count:
+            fps = game.clock.get_fps() if game.clock else 0.0
+            draw_stress_info(game.debug_font, game.villager_manager, game.frame_stats, fps)
+            game.frame_stats.report_if_due(len(game.villager_manager.villagers), fps)
+
+class EndScene(Scene):
+    """Disaster sequence, then the end screen - builds the next run in the background so R restarts instantly"""
+    idle = True
+    
+    def __init__(self):
+        self.preparer = None
+        # In palette mode frames and particles are converted to the 8-bit base surface's format
+        surface_format = base_surface if PALETTE_MODE else None
+        self.disasters = DisasterEngine(surface_format=surface_format)
+        self.particles = ParticleSystem(PARTICLE_CAPACITY, surface_format=surface_format) if ParticleSystem else None
+        self.backdrop = None  # Last frame of the run, shaken under the disaster
+        self.disaster_label = None
+    
+    @property
+    def recorded(self):
+        """Clips end with the disaster, not with minutes of a still end screen"""
+        return self.disasters.sequence is not None
+    
+    def enter(self, game):
+        # Start preparing the next run's town and villagers while the end screen shows
+        self.preparer = RunPreparer(game.prepare_run_steps())
+        
+        # The base surface still holds the run's last frame - the disaster plays over it
+        self.backdrop = base_surface.copy()
+        sequence = self.disasters.start()
+        self.disaster_label = sequence.spec.label
+        sound_bank.stop_music()
+        sound_bank.play(sequence.spec.name)
+        if self.particles:
+            sequence.emit_bursts(self.particles, 0)
+        print(f"💥 {self.disaster_label} strikes the town!")
+    
+    def exit(self, game):
+        # Drop an unused prepared run (e.g. going back to the menu) and any disaster still playing
+        self.preparer = None
+        self.finish_disaster()
+    
+    def finish_disaster(self):
+        """Free the disaster's frames and the backdrop, and clear its particles"""
+        self.disasters.release()
+        self.backdrop = None
+        if self.particles:
+            self.particles.clear()
+    
+    def update(self, game):
+        sequence = self.disasters.sequence
+        if sequence:
+            # Timed by the game clock's frame time
+            dt = game.clock.get_time() / 1000.0 if game.clock else 1 / 60
+            new_frame = sequence.update(dt)
+            if self.particles:
+                if new_frame is not None:
+                    sequence.emit_bursts(self.particles, new_frame)
+                self.particles.update(dt)
+            if sequence.finished:
+                self.finish_disaster()
+        if self.preparer and not self.preparer.ready:
+            self.preparer.step()
+    
+    def view_state(self, game):
+        # Static once the disaster has played and the next run is ready
+        if self.disasters.sequence or (self.preparer and not self.preparer.ready):
+            return None
+        return (self.disaster_label, game.debug_mode)
+    
+    def take_prepared_run(self):
+        """Hand over the prepared run, finishing it first if the player was very quick"""
+        prepared_run = self.preparer.finish() if self.preparer else None
+        self.preparer = None
+        return prepared_run
+    
+    def draw(self, game):
+        if self.disasters.sequence:
+            self.disasters.sequence.draw(base_surface, self.backdrop)
+            if self.particles:
+                self.particles.draw(base_surface)
+            return
+        
+        # Draw end screen
+        draw_end_screen(self.disaster_label)
+        
+        # Draw debug info if debug mode is active
+        if game.debug_mode:
+            debug_text = game.debug_font.render("DEBUG MODE - F12: Toggle", TEXT_ANTIALIAS, YELLOW)
+            base_surface.blit(debug_text, (10, WINDOW_HEIGHT - 30))
+
+async def main(stress_count=None, town_pool_depth=TOWN_POOL_DEPTH):
     clock = pygame.time.Clock()
-    running = True
-    
-    # Game state management
-    current_state = GameState.MENU
-    
-    # Timer variables (for game state)
-    start_time = pygame.time.get_ticks()
-    time_remaining = GAME_DURATION
-    town_buildings = []
-    
-    # Villager system
-    villager_manager = VillagerManager()
-    previous_time = pygame.time.get_ticks()
-    
-    # Debug system
-    debug_mode = False
-    debug_font = pygame.font.Font(None, 24)
-    
-    # Building placement variables
-    selected_building_type = "House"  # Default selection
-    building_placements = {}  # Dictionary mapping spot index to building type
-    hovered_spot_index = -1
-    
-    # Create play button
-    play_button = Button(
-        WINDOW_WIDTH // 2 - 75, 220, 150, 50, 
-        "PLAY", button_font
-    )
-    
-    # Create building selection buttons (32x32 sprite buttons horizontally aligned at bottom)
-    house_button = ImageButton(
-        10, WINDOW_HEIGHT - 40, 32, 32, 
-        building_images["House"], YELLOW, PURPLE
-    )
-    farm_button = ImageButton(
-        50, WINDOW_HEIGHT - 40, 32, 32, 
-        building_images["Farm"], YELLOW, GREEN
-    )
-    factory_button = ImageButton(
-        90, WINDOW_HEIGHT - 40, 32, 32, 
-        building_images["Factory"], YELLOW, ORANGE
-    )
-    
-    # Create start game button (centered at top, 10px wider on each side)
-    start_game_button = Button(
-        WINDOW_WIDTH // 2 - 50, 10, 100, 40, 
-        "Start", button_font
-    )
-
-    while running:
+    game = Game(stress_count, town_pool_depth=town_pool_depth)
+    game.clock = clock
+    
+    # Input layer: one queue drain and one hover resolution per frame
+    input_state = InputState(SCALE)
+    game.input_state = input_state
+    hover_scene = None  # Scene the hover was last resolved for
+    drawn_scene = drawn_view_state = None  # What the frame on screen shows, to skip redrawing it
+    
+    # Load sprites in the background: the menu shows right away and PLAY enables once the town sprites are in
+    loader_task = asyncio.create_task(asset_loader.run())
+
+    while game.running:
         # Event handling
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            # Update hovered spot for building placement
-            if current_state == GameState.BUILDING_PLACEMENT and event.type == pygame.MOUSEMOTION:
-                mouse_x, mouse_y = pygame.mouse.get_pos()
-                base_x = mouse_x // SCALE
-                base_y = mouse_y // SCALE
-                hovered_spot_index = get_hovered_spot_index(base_x, base_y)
-            
-            if current_state == GameState.MENU:
-                # Handle menu events
-                play_button.handle_event(event)
-                if play_button.handle_event(event):
-                    # Go to building placement phase
-                    current_state = GameState.BUILDING_PLACEMENT
-                    print("🏗️ Entering building placement phase...")
-                    
-            elif current_state == GameState.BUILDING_PLACEMENT:
-                # Handle building placement events
-                house_button.handle_event(event)
-                farm_button.handle_event(event)
-                factory_button.handle_event(event)
-                start_game_button.handle_event(event)
-                
-                if house_button.handle_event(event):
-                    selected_building_type = "House"
-                    print("🏠 Selected House for placement")
-                    # Update button selection states
-                    house_button.set_selected(True)
-                    farm_button.set_selected(False)
-                    factory_button.set_selected(False)
-                elif farm_button.handle_event(event):
-                    selected_building_type = "Farm"
-                    print("🌾 Selected Farm for placement")
-                    # Update button selection states
-                    house_button.set_selected(False)
-                    farm_button.set_selected(True)
-                    factory_button.set_selected(False)
-                elif factory_button.handle_event(event):
-                    selected_building_type = "Factory"
-                    print("🏭 Selected Factory for placement")
-                    # Update button selection states
-                    house_button.set_selected(False)
-                    farm_button.set_selected(False)
-                    factory_button.set_selected(True)
-                elif start_game_button.handle_event(event):
-                    # Start the actual game with custom buildings
-                    current_state = GameState.PLAYING
-                    print("🎮 Starting game with custom buildings...")
-                    town_buildings = create_town_with_custom_buildings(building_placements)
-                    start_time = pygame.time.get_ticks()
-                    time_remaining = GAME_DURATION
-                    # Spawn villagers when game starts
-                    villager_manager.spawn_villagers()
-                    previous_time = pygame.time.get_ticks()
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    # Handle spot clicking for building placement
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    base_x = mouse_x // SCALE
-                    base_y = mouse_y // SCALE
-                    clicked_spot_index = get_hovered_spot_index(base_x, base_y)
-                    
-                    if clicked_spot_index != -1:
-                        building_placements[clicked_spot_index] = selected_building_type
-                        print(f"🏗️ Placed {selected_building_type} at spot position {clicked_spot_index}")
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        # Return to main menu
-                        current_state = GameState.MENU
-                        print("🔙 Returning to main menu...")
-                    elif event.key == pygame.K_F12:
-                        # Toggle debug mode
-                        debug_mode = not debug_mode
-                        print(f"🐛 DEBUG: Debug mode {'ON' if debug_mode else 'OFF'}")
-                    
-            elif current_state == GameState.PLAYING:
-                # Handle game events
-                if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:  # Left click
-                    # Get mouse position for villager interactions
-                    mouse_x, mouse_y = pygame.mouse.get_pos()
-                    # Convert from window coordinates to base surface coordinates
-                    base_x = mouse_x // SCALE
-                    base_y = mouse_y // SCALE
-                    
-                    # Check if we clicked on a villager with an exclamation
-                    if not villager_manager.handle_click(base_x, base_y):
-                        # If no villager was clicked, draw a small white square at click position (debug)
-                        pygame.draw.rect(base_surface, WHITE, (base_x-5, base_y-5, 10, 10))
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_ESCAPE:
-                        # Return to menu
-                        current_state = GameState.MENU
-                    elif event.key == pygame.K_F12:
-                        # Toggle debug mode
-                        debug_mode = not debug_mode
-                        print(f"🐛 DEBUG: Debug mode {'ON' if debug_mode else 'OFF'}")
-                    elif event.key == pygame.K_e and debug_mode:
-                        # Force end timer (debug) - adjust start_time so calculation results in 0
-                        current_time = pygame.time.get_ticks()
-                        start_time = current_time - (GAME_DURATION * 1000)  # Make elapsed_time = GAME_DURATION
-                        print("🐛 DEBUG: Forced timer end")
-                    elif event.key == pygame.K_x and debug_mode:
-                        # Force exclamation (debug)
-                        forced_villager = villager_manager.force_random_exclamation()
-                        if forced_villager:
-                            print(f"🐛 DEBUG: Forced exclamation on {forced_villager}")
-                    elif event.key == pygame.K_l and debug_mode:
-                        # List all villagers (debug)
-                        villager_manager.list_all_villagers()
-                    elif event.key == pygame.K_0 and debug_mode:
-                        # Force exclamation on villager 0 (debug)
-                        villager_manager.force_specific_villager_exclamation(0)
-                    elif event.key == pygame.K_1 and debug_mode:
-                        # Force exclamation on villager 1 (debug)
-                        villager_manager.force_specific_villager_exclamation(1)
-                    elif event.key == pygame.K_2 and debug_mode:
-                        # Force exclamation on villager 2 (debug)
-                        villager_manager.force_specific_villager_exclamation(2)
-                    elif event.key == pygame.K_3 and debug_mode:
-                        # Force exclamation on villager 3 (debug)
-                        villager_manager.force_specific_villager_exclamation(3)
-                    elif event.key == pygame.K_4 and debug_mode:
-                        # Force exclamation on villager 4 (debug)
-                        villager_manager.force_specific_villager_exclamation(4)
-                    elif event.key == pygame.K_5 and debug_mode:
-                        # Force exclamation on villager 5 (debug)
-                        villager_manager.force_specific_villager_exclamation(5)
-                    elif event.key == pygame.K_6 and debug_mode:
-                        # Force exclamation on villager 6 (debug)
-                        villager_manager.force_specific_villager_exclamation(6)
-                            
-            elif current_state == GameState.END:
-                # Handle end screen events
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        # Return to main menu
-                        current_state = GameState.MENU
-                        print("🔙 Returning to main menu...")
-                    elif event.key == pygame.K_r:
-                        # Restart the game with same building layout
-                        current_state = GameState.PLAYING
-                        print("🔄 Restarting game...")
-                        start_time = pygame.time.get_ticks()
-                        time_remaining = GAME_DURATION
-                        town_buildings = create_town_with_custom_buildings(building_placements)
-                        villager_manager.spawn_villagers()
-                        previous_time = pygame.time.get_ticks()
-                    elif event.key == pygame.K_F12:
-                        # Toggle debug mode
-                        debug_mode = not debug_mode
-                        print(f"🐛 DEBUG: Debug mode {'ON' if debug_mode else 'OFF'}")
-
-        # Update and draw based on current state
-        if current_state == GameState.MENU:
-            # Draw menu
-            draw_menu()
-            play_button.draw(base_surface)
-            
-        elif current_state == GameState.BUILDING_PLACEMENT:
-            # Draw building placement interface
-            draw_building_placement_ui(selected_building_type, hovered_spot_index, building_placements)
-            
-            # Set initial selection state for buttons (House is default)
-            if selected_building_type == "House":
-                house_button.set_selected(True)
-                farm_button.set_selected(False)
-                factory_button.set_selected(False)
-            elif selected_building_type == "Farm":
-                house_button.set_selected(False)
-                farm_button.set_selected(True)
-                factory_button.set_selected(False)
-            elif selected_building_type == "Factory":
-                house_button.set_selected(False)
-                farm_button.set_selected(False)
-                factory_button.set_selected(True)
-            
-            # Draw building selection buttons
-            house_button.draw(base_surface)
-            farm_button.draw(base_surface)
-            factory_button.draw(base_surface)
-            start_game_button.draw(base_surface)
-            
-            # Draw debug info if debug mode is active
-            if debug_mode:
-                debug_text = debug_font.render("DEBUG MODE - F12: Toggle", True, YELLOW)
-                base_surface.blit(debug_text, (10, WINDOW_HEIGHT - 60))
-                    
-        elif current_state == GameState.PLAYING:
-            # Update timer
-            current_time = pygame.time.get_ticks()
-            elapsed_time = (current_time - start_time) / 1000.0  # Convert to seconds
-            time_remaining = max(0, GAME_DURATION - elapsed_time)
-            
-            # Update villagers (will be skipped if frozen)
-            dt = (current_time - previous_time) / 1000.0  # Delta time in seconds
-            villager_manager.update(dt)
-            previous_time = current_time
-            
-            # Check if timer reached 0 (disaster time!)
-            if time_remaining <= 0:
-                print("💥 DISASTER! Going to end screen...")
-                current_state = GameState.END
+        frame_input = input_state.poll()
+        
+        # Resolve hover once per frame from the latest pointer position
+        if frame_input.mouse_moved or hover_scene is not game.scene:
+            hover_scene = game.scene
+            game.scene.update_hover(game, frame_input.pointer_pos)
+        
+        # Table-driven dispatch: one lookup per event
+        for event in frame_input.events:
+            game.dispatch(event)
 
-            # Draw background first (before any other game objects)
-            draw_background()
-            
-            # Draw buildings on top of background
-            draw_buildings(town_buildings)
-            
-            # Draw villagers on top of buildings
-            villager_manager.draw(base_surface)
-            
-            # Draw timer on top of everything
-            draw_timer(time_remaining)
-            
-            # Draw debug info if debug mode is active
-            if debug_mode:
-                draw_debug_info(debug_font, villager_manager, time_remaining)
-                
-        elif current_state == GameState.END:
-            # Draw end screen
-            draw_end_screen()
+        # Update the current scene
+        game.scene.update(game)
+        
+        # Redraw on input, a scene change or a new view state; a static screen is left as it is
+        view_state = game.scene.view_state(game)
+        if (view_state is None or view_state != drawn_view_state or game.scene is not drawn_scene
+                or frame_input.events or frame_input.mouse_moved):
+            game.scene.draw(game)
             
-            # Draw debug info if debug mode is active
-            if debug_mode:
-                debug_text = debug_font.render("DEBUG MODE - F12: Toggle", True, YELLOW)
-                base_surface.blit(debug_text, (10, WINDOW_HEIGHT - 30))
-
-        # Scale up the base surface to the window size
-        scaled_surface = pygame.transform.scale(base_surface, (WINDOW_WIDTH * SCALE, WINDOW_HEIGHT * SCALE))
-        window.blit(scaled_surface, (0, 0))
+            # Scale up the base surface to the window size and update the display
+            present_frame()
+            drawn_scene, drawn_view_state = game.scene, view_state
+        
+        # Keep the last seconds of the run for F9 clips (the base surface holds the last frame drawn)
+        if game.scene.recorded:
+            game.clip_buffer.update(base_surface, clock.get_time() / 1000.0)
         
-        # Update the display
-        pygame.display.flip()
+        # Pre-generate upcoming towns while nothing time-critical is running (towns are drawn on the background)
+        busy = False  # True while background work still wants frames
+        if game.scene.idle and not game.town_pool.full and asset_loader.ready("town"):
+            game.town_pool.step()
+            busy = True
         
-        # Cap the framerate
-        clock.tick(60)
+        # Decode the rest of the sound effects one per idle frame once the mixer is open
+        if game.scene.idle and sound_bank.available and not sound_bank.ready:
+            sound_bank.preload(limit=1)
+            busy = True
+        
+        # Cap the framerate, or rest until input arrives or the picture can next change
+        if RESTING and view_state is not None and not busy and asset_loader.done:
+            input_state.wait(game.scene.rest_ms(game))
+            clock.tick()
+        else:
+            clock.tick(FPS)
         
         # Required for pygbag
         await asyncio.sleep(0)
 
+    loader_task.cancel()
     pygame.quit()
 
+def parse_args(argv=None):
+    """Parse command line options (pygbag runs without any)"""
+    parser = argparse.ArgumentParser(description="Catastrophe Civ")
+    parser.add_argument("--stress", type=int, metavar="COUNT",
+                        help="crowd stress test: spawn COUNT villagers with reused sprites")
+    parser.add_argument("--town-pool", type=int, default=TOWN_POOL_DEPTH, metavar="DEPTH",
+                        help=f"number of towns to pre-generate on idle frames (default {TOWN_POOL_DEPTH})")
+    parser.add_argument("--palette", action="store_true",
+                        help="8-bit palette rendering (on automatically when baked assets are present)")
+    parser.add_argument("--scale", type=int, choices=WINDOW_SCALES, default=DEFAULT_SCALE,
+                        help=f"window scale, F10 cycles it in game (default {DEFAULT_SCALE})")
+    args, _ = parser.parse_known_args(argv)
+    return args
+
+def run():
+    """Parse the command line and run the game (build.py pygbag's launcher calls this)"""
+    args = parse_args()
+    asyncio.run(main(stress_count=args.stress, town_pool_depth=args.town_pool))
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    run()
@@ -0,0 +1,99 @@
+"""
+Grid navigation for Catastrophe Civ villagers
+
+Villagers walk over a town's walkability mask (see town_generator.py). For
+each destination cell a flow field is built once with a breadth-first
+search outwards from that cell and cached: every walkable cell stores the
+neighbour one step closer to the destination. Steering a villager is then
+a single list lookup per frame, however many villagers share the
+destination, so navigation cost stays flat as the population grows.
+
+Pure Python with no pygame dependency.
+"""
+import random
+from collections import deque
+
+from town_generator import GRID_SIZE, GRID_COLS, GRID_ROWS, ISLAND, GRASS
+
+# 4 straight moves, then the diagonals (only taken when both sides are open)
+STRAIGHT_MOVES = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+DIAGONAL_MOVES = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
+
+NO_PATH = -1  # Flow field value for cells that cannot reach the destination
+
+class Navigator:
+    """Flow-field navigation over one walkability mask (one byte per grid cell)"""
+    def __init__(self, walkable):
+        self.walkable = walkable
+        self.walkable_cells = [index for index, value in enumerate(walkable) if value]
+        self.flow_fields = {}  # Destination cell index -> list of next cell indices
+        self.neighbours = [self._neighbours(index) for index in range(GRID_COLS * GRID_ROWS)]
+        self.centers = [cell_center(index) for index in range(GRID_COLS * GRID_ROWS)]
+
+    def _neighbours(self, index):
+        """Walkable cells reachable in one step from index, without cutting corners"""
+        if not self.walkable[index]:
+            return []
+        col, row = index % GRID_COLS, index // GRID_COLS
+
+        def open_cell(x, y):
+            return 0 <= x < GRID_COLS and 0 <= y < GRID_ROWS and self.walkable[y * GRID_COLS + x]
+
+        result = [(row + dy) * GRID_COLS + col + dx for dx, dy in STRAIGHT_MOVES if open_cell(col + dx, row + dy)]
+        result += [
+            (row + dy) * GRID_COLS + col + dx for dx, dy in DIAGONAL_MOVES
+            if open_cell(col + dx, row + dy) and open_cell(col + dx, row) and open_cell(col, row + dy)
+        ]
+        return result
+
+    def flow_field(self, goal):
+        """Next-step table towards the goal cell, built on first use and then cached"""
+        field = self.flow_fields.get(goal)
+        if field is None:
+            field = [NO_PATH] * (GRID_COLS * GRID_ROWS)
+            field[goal] = goal
+            queue = deque([goal])
+            while queue:
+                index = queue.popleft()
+                for neighbour in self.neighbours[index]:
+                    if field[neighbour] == NO_PATH:
+                        # Walking from neighbour, the next step is back towards index
+                        field[neighbour] = index
+                        queue.append(neighbour)
+            self.flow_fields[goal] = field
+        return field
+
+    def cell_at(self, x, y):
+        """Grid cell index containing the pixel (x, y), or NO_PATH if off the grid"""
+        col, row = int(x // GRID_SIZE), int(y // GRID_SIZE)
+        if 0 <= col < GRID_COLS and 0 <= row < GRID_ROWS:
+            return row * GRID_COLS + col
+        return NO_PATH
+
+    def next_cell(self, goal, x, y):
+        """Cell to walk into next from pixel (x, y) towards goal (NO_PATH if unreachable)"""
+        cell = self.cell_at(x, y)
+        if cell == NO_PATH:
+            return NO_PATH
+        return self.flow_field(goal)[cell]
+
+    def random_cell(self, rng=random):
+        """A random walkable cell index"""
+        return rng.choice(self.walkable_cells)
+
+    def random_point(self, margin=8, rng=random):
+        """A random pixel inside a random walkable cell, at least margin from its edges"""
+        cell = self.random_cell(rng)
+        return point_in_cell(cell, margin, rng)
+
+def cell_center(cell):
+    """Pixel center of a cell index"""
+    return (cell % GRID_COLS) * GRID_SIZE + GRID_SIZE / 2, (cell // GRID_COLS) * GRID_SIZE + GRID_SIZE / 2
+
+def point_in_cell(cell, margin=8, rng=random):
+    """A random pixel inside a cell, at least margin from its edges"""
+    left, top = (cell % GRID_COLS) * GRID_SIZE, (cell // GRID_COLS) * GRID_SIZE
+    return rng.uniform(left + margin, left + GRID_SIZE - margin), rng.uniform(top + margin, top + GRID_SIZE - margin)
+
+# Bare island with no buildings, for villagers that are not in a generated town
+ISLAND_NAVIGATOR = Navigator(bytes(1 if cell == GRASS else 0 for cell in ISLAND))
@@ -0,0 +1,171 @@
+"""
+Shared 8-bit palette for Catastrophe Civ
+
+The art style uses a few dozen colors, so every sprite can share one
+256-entry palette. An 8-bit sprite takes a quarter of the memory of a
+32-bit one, and blitting it onto an 8-bit base surface with the same
+palette is a straight byte copy with a colorkey. Only the final upscale
+to the window expands pixels to the display format.
+
+Index 0 is the colorkey (transparent). Next come the UI colors drawn with
+pygame.draw and fonts, so buttons and text keep their exact colors. The
+rest is picked from the art by median cut. Quantizing runs in plain
+Python, which is fine at bake time (build.py bake) but slow at startup.
+"""
+import json
+from collections import Counter
+
+import pygame
+
+PALETTE_SIZE = 256
+COLORKEY_INDEX = 0
+COLORKEY = (255, 0, 255)
+ALPHA_THRESHOLD = 128  # Pixels at least this opaque are kept, the rest become the colorkey
+MAX_MEAN_ERROR = 12.0  # Visual diff limit: mean per-channel error of a quantized sprite (0-255)
+
+# Colors main.py draws directly (fills, outlines, text) - keep in sync with its color constants
+UI_COLORS = [
+    (0, 0, 0), (255, 255, 255), (255, 50, 50), (100, 150, 255), (50, 100, 200), (128, 128, 128),
+    (50, 255, 50), (0, 200, 0), (255, 165, 0), (255, 140, 0), (128, 0, 128), (100, 0, 100),
+    (255, 255, 0), (200, 200, 200), (160, 120, 80), (125, 90, 58),
+]
+
+def rgba_bytes(surface):
+    """RGBA pixel bytes with real alpha (opaque surfaces report junk in the unused byte)"""
+    if not surface.get_flags() & pygame.SRCALPHA:
+        surface = surface.convert_alpha()
+    return pygame.image.tobytes(surface, "RGBA")
+
+def opaque_colors(surfaces):
+    """Pixel count of every color that stays opaque after quantizing, across all surfaces"""
+    counts = Counter()
+    for surface in surfaces:
+        data = rgba_bytes(surface)
+        for offset in range(0, len(data), 4):
+            if data[offset + 3] >= ALPHA_THRESHOLD:
+                counts[data[offset:offset + 3]] += 1
+    return {tuple(color): count for color, count in counts.items()}
+
+def median_cut(color_counts, count):
+    """Reduce weighted colors to at most count colors by repeatedly splitting the widest box"""
+    def widest_channel(box):
+        ranges = [max(color[c] for color, _ in box) - min(color[c] for color, _ in box) for c in range(3)]
+        return max(ranges), ranges.index(max(ranges))
+
+    boxes = [list(color_counts.items())] if color_counts else []
+    spans = [widest_channel(box) for box in boxes]
+    while len(boxes) < count:
+        index = max(range(len(boxes)), key=lambda i: spans[i][0], default=None)
+        if index is None or spans[index][0] == 0:
+            break  # Every box is a single color already
+        box = boxes.pop(index)
+        channel = spans.pop(index)[1]
+        box.sort(key=lambda item: item[0][channel])
+        # Split at the pixel-weighted median so busy colors get their own boxes
+        half = sum(weight for _, weight in box) / 2
+        running = 0
+        for split, (_, weight) in enumerate(box):
+            running += weight
+            if running >= half:
+                break
+        split = min(max(split, 1), len(box) - 1)
+        for part in (box[:split], box[split:]):
+            boxes.append(part)
+            spans.append(widest_channel(part))
+
+    colors = []
+    for box in boxes:
+        total = sum(weight for _, weight in box)
+        colors.append(tuple(round(sum(color[c] * weight for color, weight in box) / total) for c in range(3)))
+    return colors
+
+def build_palette(surfaces, fixed_colors=UI_COLORS):
+    """A full 256-color palette: colorkey, the fixed colors, then median-cut art colors"""
+    palette = [COLORKEY] + [color for color in fixed_colors if color != COLORKEY]
+    for color in median_cut(opaque_colors(surfaces), PALETTE_SIZE - len(palette)):
+        if color not in palette:
+            palette.append(color)
+    return palette + [(0, 0, 0)] * (PALETTE_SIZE - len(palette))
+
+def save_palette(palette, path):
+    """Write a palette as a JSON list of [r, g, b]"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([list(color) for color in palette], f)
+
+def parse_palette(data):
+    """A palette from the JSON save_palette writes (str or bytes)"""
+    return [tuple(color) for color in json.loads(data)]
+
+def load_palette(path):
+    """Read a palette written by save_palette"""
+    with open(path, encoding="utf-8") as f:
+        return parse_palette(f.read())
+
+class PaletteMapper:
+    """Maps colors to their nearest palette index (cached) and quantizes surfaces"""
+    def __init__(self, palette):
+        self.palette = palette
+        self.cache = {}  # RGB bytes -> palette index
+
+    def nearest(self, color):
+        """Index of the closest non-colorkey palette entry"""
+        r, g, b = color
+        best_index, best_distance = 1, None
+        for index in range(1, len(self.palette)):
+            pr, pg, pb = self.palette[index]
+            distance = (r - pr) ** 2 + (g - pg) ** 2 + (b - pb) ** 2
+            if best_distance is None or distance < best_distance:
+                best_index, best_distance = index, distance
+                if distance == 0:
+                    break
+        return best_index
+
+    def quantize(self, surface):
+        """An 8-bit copy of surface on the shared palette, transparent pixels as the colorkey"""
+        data = rgba_bytes(surface)
+        cache = self.cache
+        indices = bytearray(len(data) // 4)
+        for pixel, offset in enumerate(range(0, len(data), 4)):
+            if data[offset + 3] < ALPHA_THRESHOLD:
+                continue  # Left at COLORKEY_INDEX
+            color = data[offset:offset + 3]
+            index = cache.get(color)
+            if index is None:
+                index = cache[color] = self.nearest(color)
+            indices[pixel] = index
+        return make_indexed_surface(bytes(indices), surface.get_size(), self.palette)
+
+def make_indexed_surface(indices, size, palette):
+    """An 8-bit surface from palette indices, keyed on COLORKEY_INDEX"""
+    surface = pygame.image.frombytes(indices, size, "P")
+    surface.set_palette(palette)
+    surface.set_colorkey(COLORKEY_INDEX)
+    return surface
+
+def match_format(surface, target):
+    """surface ready to blit onto target: if target is 8-bit, an RLE indexed copy keyed on COLORKEY_INDEX.
+
+    SDL ignores per-pixel alpha when blitting onto an 8-bit surface, so sprites
+    made at runtime (placeholders, particles) go through this. It is all C,
+    mapping colors more coarsely than PaletteMapper.quantize.
+    """
+    if target.get_bitsize() != 8:
+        return surface
+    opaque = pygame.mask.from_surface(surface, ALPHA_THRESHOLD - 1)
+    indexed = surface.convert(target)
+    opaque.to_surface(indexed, setcolor=None, unsetcolor=COLORKEY)
+    indexed.set_colorkey(COLORKEY_INDEX, pygame.RLEACCEL)
+    return indexed
+
+def visual_diff(reference, candidate, background=(128, 128, 128)):
+    """Mean and max per-channel error between two same-sized surfaces drawn over a flat background"""
+    flattened = []
+    for surface in (reference, candidate):
+        canvas = pygame.Surface(surface.get_size())
+        canvas.fill(background)
+        canvas.blit(surface, (0, 0))
+        flattened.append(pygame.image.tobytes(canvas, "RGB"))
+    errors = [abs(a - b) for a, b in zip(*flattened)]
+    if not errors:
+        return 0.0, 0
+    return sum(errors) / len(errors), max(errors)
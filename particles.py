@@ -0,0 +1,130 @@
+"""
+Pooled particle system for Catastrophe Civ
+
+Particles (rubble, tomato splat, sparks, splashes, smoke) live in
+preallocated NumPy arrays sized for the pool's capacity. Free slots are kept
+on an index stack, so emitting and culling never allocate per particle.
+Integration, ageing and culling run as whole-array operations, and drawing
+is one Surface.blits call over a few small pre-rendered sprites (one per
+kind and fade step).
+
+Requires NumPy; main.py runs without particles if it is missing.
+"""
+import numpy as np
+import pygame
+
+from palette import match_format
+
+FADE_STEPS = 4  # Pre-rendered fade levels per particle kind
+
+# Kind -> (color, size in pixels, gravity in px/s^2)
+PARTICLE_KINDS = {
+    "rubble": ((120, 85, 50), 3, 240.0),
+    "splat": ((210, 35, 30), 4, 300.0),
+    "spark": ((255, 220, 90), 2, -30.0),
+    "splash": ((170, 215, 255), 3, 260.0),
+    "smoke": ((110, 110, 110), 5, -60.0),
+}
+
+def render_particle_sprites(kinds=PARTICLE_KINDS, surface_format=None):
+    """One small surface per kind and fade step, indexed kind_index * FADE_STEPS + step.
+
+    With a surface_format (the 8-bit base surface in palette mode) the sprites match it; they can't be
+    translucent there, so particles stay solid and vanish for the faintest step.
+    """
+    sprites = []
+    for color, size, _ in kinds.values():
+        for step in range(FADE_STEPS):
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            alpha = 255 - step * (255 // FADE_STEPS)
+            sprite.fill((*color, alpha))
+            sprites.append(match_format(sprite, surface_format) if surface_format is not None else sprite)
+    return sprites
+
+class ParticleSystem:
+    """Fixed-capacity particle pool with vectorized update and batched drawing"""
+    def __init__(self, capacity=10000, bounds=(640, 360), kinds=PARTICLE_KINDS, seed=None, surface_format=None):
+        self.capacity = capacity
+        self.bounds = bounds
+        self.kind_names = list(kinds)
+        self.kind_gravity = np.array([gravity for _, _, gravity in kinds.values()], dtype=np.float32)
+        self.sprites = render_particle_sprites(kinds, surface_format)
+        self.rng = np.random.default_rng(seed)
+
+        # Particle state, one row/entry per slot
+        self.position = np.zeros((capacity, 2), dtype=np.float32)
+        self.velocity = np.zeros((capacity, 2), dtype=np.float32)
+        self.gravity = np.zeros(capacity, dtype=np.float32)
+        self.life = np.zeros(capacity, dtype=np.float32)  # Seconds left
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.kind = np.zeros(capacity, dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        # Free-list: a stack of unused slot indices
+        self.free = np.arange(capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = capacity
+
+    @property
+    def live_count(self):
+        return self.capacity - self.free_count
+
+    def emit(self, kind, count, x, y, speed=120.0, life=1.0, spread=np.pi, direction=-np.pi / 2):
+        """Burst up to count particles from (x, y); returns how many fit in the pool"""
+        count = min(count, self.free_count)
+        if count <= 0:
+            return 0
+        slots = self.free[self.free_count - count:self.free_count]
+        self.free_count -= count
+
+        kind_index = self.kind_names.index(kind)
+        angles = direction + self.rng.uniform(-spread, spread, count)
+        speeds = speed * self.rng.uniform(0.3, 1.0, count)
+        lives = life * self.rng.uniform(0.6, 1.0, count)
+        self.position[slots] = (x, y)
+        self.velocity[slots, 0] = np.cos(angles) * speeds
+        self.velocity[slots, 1] = np.sin(angles) * speeds
+        self.gravity[slots] = self.kind_gravity[kind_index]
+        self.life[slots] = lives
+        self.max_life[slots] = lives
+        self.kind[slots] = kind_index
+        self.alive[slots] = True
+        return count
+
+    def update(self, dt):
+        """Integrate every live particle and return dead or off-screen ones to the free-list"""
+        if self.free_count == self.capacity:
+            return
+        # Whole-array integration: dead slots are updated too, which is cheaper than masking them out
+        alive = self.alive
+        self.velocity[:, 1] += self.gravity * dt
+        self.position += self.velocity * dt
+        self.life -= dt
+
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        width, height = self.bounds
+        dead = alive & ((self.life <= 0) | (x < -8) | (x > width + 8) | (y < -8) | (y > height + 8))
+        dead_slots = np.flatnonzero(dead).astype(np.int32)
+        if dead_slots.size:
+            alive[dead_slots] = False
+            self.free[self.free_count:self.free_count + dead_slots.size] = dead_slots
+            self.free_count += dead_slots.size
+
+    def draw(self, surface):
+        """Draw every live particle with a single blits call"""
+        if self.free_count == self.capacity:
+            return
+        slots = np.flatnonzero(self.alive)
+        # Fade step from the fraction of life used up
+        used = 1.0 - self.life[slots] / self.max_life[slots]
+        sprite_index = self.kind[slots] * FADE_STEPS + np.minimum((used * FADE_STEPS).astype(np.int32), FADE_STEPS - 1)
+        positions = self.position[slots].astype(np.int32).tolist()
+        sprites = self.sprites
+        surface.blits([(sprites[index], position) for index, position in zip(sprite_index.tolist(), positions)],
+                      doreturn=False)
+
+    def clear(self):
+        """Kill every particle"""
+        self.alive[:] = False
+        self.free[:] = np.arange(self.capacity - 1, -1, -1, dtype=np.int32)
+        self.free_count = self.capacity
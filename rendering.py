@@ -0,0 +1,103 @@
+"""
+Rendering helpers for Catastrophe Civ
+"""
+from bisect import bisect_left
+
+class RenderQueue:
+    """Collects (surface, position) pairs for one layer and submits them with a single blits() call"""
+    def __init__(self):
+        self.items = []
+    
+    def blit(self, source, dest):
+        """Queue a blit - same call shape as Surface.blit so draw() methods accept either"""
+        self.items.append((source, dest))
+    
+    def extend(self, items):
+        """Queue several (surface, position) pairs at once"""
+        self.items.extend(items)
+    
+    def flush(self, target):
+        """Submit every queued blit to the target surface in one call and empty the queue"""
+        if self.items:
+            target.blits(self.items, doreturn=False)
+            self.items.clear()
+    
+    def clear(self):
+        """Drop queued blits without drawing them"""
+        self.items.clear()
+    
+    def __len__(self):
+        return len(self.items)
+
+def _baseline(drawable):
+    """Sort key: the y coordinate of the drawable's feet"""
+    return drawable.baseline()
+
+class LayeredRenderer:
+    """Draws static and moving sprites depth-sorted by their baseline y.
+
+    Static drawables (buildings) are sorted once and their blits cached.
+    Moving drawables are kept in last frame's order and re-sorted every
+    frame; since entities only move a pixel or so per frame that order is
+    nearly sorted, and list.sort (Timsort: run detection plus binary
+    insertion) handles it in close to linear time.
+    """
+    def __init__(self):
+        self.static_source = None  # The list the static cache was built from
+        self.static_count = 0
+        self.static_baselines = []  # Sorted baselines of the static drawables
+        self.static_items = []  # Cached blit items for each static drawable, same order
+        self.queue = RenderQueue()
+    
+    def set_static(self, drawables):
+        """Cache the static layer sorted by baseline (no-op while the list is unchanged)"""
+        if drawables is self.static_source and len(drawables) == self.static_count:
+            return
+        self.static_source = drawables
+        self.static_count = len(drawables)
+        self.static_baselines = []
+        self.static_items = []
+        for drawable in sorted(drawables, key=_baseline):
+            drawable.draw(self.queue)
+            self.static_baselines.append(drawable.baseline())
+            self.static_items.append(list(self.queue.items))
+            self.queue.clear()
+    
+    def invalidate_static(self):
+        """Force the static layer to be rebuilt on the next draw"""
+        self.static_source = None
+    
+    def draw(self, target, dynamic, extras=()):
+        """Draw the cached static layer merged with the moving drawables.
+
+        `dynamic` is re-sorted in place, so pass a list whose order can be kept
+        between frames. `extras` are a few loose drawables (e.g. items on the
+        ground) sorted in with the static layer for this frame only.
+        """
+        dynamic.sort(key=_baseline)
+        keys = [drawable.baseline() for drawable in dynamic]
+        
+        baselines = self.static_baselines
+        static_items = self.static_items
+        if extras:
+            merged = list(zip(baselines, static_items))
+            for extra in extras:
+                extra.draw(self.queue)
+                merged.append((extra.baseline(), list(self.queue.items)))
+                self.queue.clear()
+            merged.sort(key=lambda entry: entry[0])
+            baselines = [entry[0] for entry in merged]
+            static_items = [entry[1] for entry in merged]
+        
+        queue = self.queue
+        start = 0
+        for baseline, items in zip(baselines, static_items):
+            # Everything whose feet are above this building's front goes behind it
+            end = bisect_left(keys, baseline, start)
+            for drawable in dynamic[start:end]:
+                drawable.draw_body(queue)
+            queue.extend(items)
+            start = end
+        for drawable in dynamic[start:]:
+            drawable.draw_body(queue)
+        queue.flush(target)
@@ -0,0 +1,163 @@
+"""
+Sound effects and music for Catastrophe Civ
+
+SoundBank decodes each short effect once into a pygame.mixer.Sound and
+plays it on a fixed pool of mixer channels. When every channel is busy, a
+new sound takes over the channel with the lowest priority (oldest first),
+as long as that priority is not higher than its own. The looping music
+track is streamed with pygame.mixer.music and is never decoded up front.
+
+The mixer is opened lazily on first use, so it adds nothing to startup.
+Browsers only allow audio after the player's first click anyway. If the
+mixer can't be opened, the bank stays silent. Effects without a file in
+Assets/Sounds get a short generated placeholder beep. Everything works
+under SDL's dummy audio driver.
+"""
+import os
+import struct
+
+import pygame
+
+SOUND_DIR = "Assets/Sounds"
+SOUND_EXTENSIONS = (".ogg", ".wav")
+
+# Effect name -> (priority, placeholder tone in Hz, placeholder length in seconds)
+SOUND_EFFECTS = {
+    "click": (1, 880, 0.05),
+    "exclamation": (1, 660, 0.08),
+    "help": (2, 520, 0.15),
+    "hammer": (2, 330, 0.12),
+    "cat": (3, 180, 0.6),
+    "tomato": (3, 140, 0.5),
+    "shark": (3, 110, 0.6),
+    "explosion": (3, 70, 0.8),
+}
+MUSIC_TRACK = "theme"
+
+def find_sound_file(name):
+    """Path of Assets/Sounds/<name>.ogg or .wav, or None if there is neither"""
+    for extension in SOUND_EXTENSIONS:
+        path = os.path.join(SOUND_DIR, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def make_beep(frequency, seconds, fade_steps=16):
+    """A fading square-wave beep in the mixer's current format, as a Sound (None if not 16-bit)"""
+    rate, size, channels = pygame.mixer.get_init()
+    if abs(size) != 16:
+        return None
+    period = max(2, rate // frequency)
+    samples_per_step = int(rate * seconds) // fade_steps
+    chunks = []
+    for step in range(fade_steps):
+        # Built a whole period at a time, getting quieter each step so it doesn't click at the end
+        value = int(6000 * (1 - step / fade_steps))
+        high = struct.pack("<h", value) * channels
+        low = struct.pack("<h", -value) * channels
+        wave = high * (period // 2) + low * (period - period // 2)
+        chunks.append((wave * (samples_per_step // period + 1))[:samples_per_step * 2 * channels])
+    return pygame.mixer.Sound(buffer=b"".join(chunks))
+
+class SoundBank:
+    """Preloaded effects on a fixed channel pool with priority stealing, plus streamed music"""
+    def __init__(self, channel_count=8, effects=SOUND_EFFECTS):
+        self.channel_count = channel_count
+        self.effects = effects
+        self.sounds = {}  # Effect name -> Sound (or None if it could not be made)
+        self.channels = []
+        self.channel_priority = []  # Priority of what each channel is playing
+        self.channel_started = []  # Play counter when each channel started, oldest is stolen first
+        self.play_count = 0
+        self.available = None  # None = mixer not tried yet, then True or False
+        self.music_playing = False
+
+    @property
+    def ready(self):
+        """True once every effect is loaded (or audio turned out to be unavailable)"""
+        return self.available is False or len(self.sounds) == len(self.effects)
+
+    def open_mixer(self):
+        """Open the mixer and the channel pool on first use; returns whether audio is available"""
+        if self.available is None:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                pygame.mixer.set_num_channels(self.channel_count)
+                self.channels = [pygame.mixer.Channel(i) for i in range(self.channel_count)]
+                self.channel_priority = [0] * self.channel_count
+                self.channel_started = [0] * self.channel_count
+                self.available = True
+            except pygame.error as e:
+                print(f"❌ Audio unavailable, playing without sound: {e}")
+                self.available = False
+        return self.available
+
+    def load(self, name):
+        """Decode one effect (its file, or a placeholder beep) unless it is already loaded"""
+        if name in self.sounds or not self.open_mixer():
+            return self.sounds.get(name)
+        _, frequency, seconds = self.effects[name]
+        path = find_sound_file(name)
+        try:
+            self.sounds[name] = pygame.mixer.Sound(path) if path else make_beep(frequency, seconds)
+        except pygame.error as e:
+            print(f"❌ Error loading sound {name}: {e}")
+            self.sounds[name] = None
+        if self.ready:
+            print(f"🔊 Sound bank ready with {len(self.sounds)} effects on {self.channel_count} channels")
+        return self.sounds[name]
+
+    def preload(self, limit=None):
+        """Open the mixer and decode up to limit effects not loaded yet (all by default)"""
+        pending = [name for name in self.effects if name not in self.sounds]
+        for name in pending[:limit]:
+            self.load(name)
+
+    def play(self, name, volume=1.0):
+        """Play an effect, stealing a lower-priority channel if all are busy; returns the Channel or None"""
+        sound = self.load(name)  # Already decoded unless it's played before the preload got to it
+        if sound is None:
+            return None
+        priority = self.effects[name][0]
+
+        index = self.pick_channel(priority)
+        if index is None:
+            return None  # Every channel is playing something more important
+        channel = self.channels[index]
+        channel.set_volume(volume)
+        channel.play(sound)
+        self.play_count += 1
+        self.channel_priority[index] = priority
+        self.channel_started[index] = self.play_count
+        return channel
+
+    def pick_channel(self, priority):
+        """A free channel, else the lowest-priority (then oldest) one no more important than priority"""
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        victim = min(range(self.channel_count),
+                     key=lambda index: (self.channel_priority[index], self.channel_started[index]))
+        if self.channel_priority[victim] <= priority:
+            return victim
+        return None
+
+    def play_music(self, name=MUSIC_TRACK, volume=0.5):
+        """Stream the looping music track, if there is one"""
+        path = find_sound_file(name)
+        if not path or not self.open_mixer() or self.music_playing:
+            return
+        try:
+            pygame.mixer.music.load(path)
+            pygame.mixer.music.set_volume(volume)
+            pygame.mixer.music.play(loops=-1)
+            self.music_playing = True
+        except pygame.error as e:
+            print(f"❌ Error playing music {name}: {e}")
+
+    def stop_music(self, fade_ms=500):
+        """Fade the music out"""
+        if self.music_playing:
+            pygame.mixer.music.fadeout(fade_ms)
+            self.music_playing = False
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Procedural town generator for Catastrophe Civ
+
+Towns are laid out on the 32 px grid over the island in background.png.
+Each building sits on a one-cell lot with its 48x48 sprite centered on the
+lot and bottom-aligned to it, and needs a free "front" cell below the lot
+for its door. Dirt paths join every front into one road network. The
+generator also returns an occupancy grid (one byte per cell) and a
+walkability mask that villager navigation can use directly.
+
+Pure Python with no pygame dependency, so it can run on a worker thread.
+
+    python town_generator.py --check 100000    # validate 100k seeds
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+GRID_SIZE = 32  # Pixels per grid cell
+GRID_COLS = 20  # 640 / 32
+GRID_ROWS = 11  # 360 // 32 (the 8 px strip at the bottom is open water)
+BUILDING_SIZE = 48  # Building sprite size in pixels
+
+# Occupancy values, one byte per cell
+WATER = 0
+GRASS = 1
+PATH = 2
+BUILDING = 3
+
+# Solid grass cells of the island in background.png (# = grass)
+ISLAND_ROWS = [
+    "....................",
+    "....................",
+    "....................",
+    ".......######.......",
+    "......########......",
+    ".....##########.....",
+    ".....##########.....",
+    "....####....####....",
+    "....###......###....",
+    "....................",
+    "....................",
+]
+ISLAND = bytes(
+    GRASS if cell == "#" else WATER
+    for row in ISLAND_ROWS
+    for cell in row
+)
+
+MIN_BUILDINGS = 10
+MAX_BUILDINGS = 15  # The island fits 12 at most with the spacing rule; higher targets get as many as fit
+BUILDING_TYPES = ["House", "Farm", "Factory"]
+BUILDING_WEIGHTS = [6, 2, 1]  # Mostly houses, a few farms, the odd factory
+
+# Offsets of the 8 neighbours, clockwise from north
+RING = [(0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1)]
+
+# Every grass cell with grass below it could be a lot
+LOT_CANDIDATES = [
+    (col, row)
+    for row in range(GRID_ROWS - 1)
+    for col in range(GRID_COLS)
+    if ISLAND[row * GRID_COLS + col] == GRASS and ISLAND[(row + 1) * GRID_COLS + col] == GRASS
+]
+TARGET_ATTEMPTS = 4  # Placement passes spent chasing a target above min_buildings
+MAX_ATTEMPTS = 100  # Placement passes before a town settles for fewer than min_buildings
+
+class TownLayout:
+    """A generated town: building spots, dirt paths and the walkability mask"""
+    def __init__(self, seed, buildings, occupancy):
+        self.seed = seed
+        # Same dict shape as main.FIXED_TOWN_LAYOUT, plus the lot's grid cell
+        self.buildings = buildings
+        self.occupancy = occupancy  # bytearray, GRID_COLS * GRID_ROWS, row-major
+        # 1 = villagers may walk here (grass or path), 0 = water or building
+        self.walkable = bytes(1 if cell in (GRASS, PATH) else 0 for cell in occupancy)
+
+    @property
+    def path_cells(self):
+        """(col, row) of every dirt path cell"""
+        return [
+            (index % GRID_COLS, index // GRID_COLS)
+            for index, cell in enumerate(self.occupancy)
+            if cell == PATH
+        ]
+
+    def is_walkable(self, col, row):
+        """True if (col, row) is inside the grid and walkable"""
+        return 0 <= col < GRID_COLS and 0 <= row < GRID_ROWS and self.walkable[row * GRID_COLS + col] == 1
+
+    def walkable_with(self, built_lots):
+        """Walkability mask with only the given (col, row) lots blocked; empty lots are grass"""
+        walkable = bytearray(1 if cell in (GRASS, PATH, BUILDING) else 0 for cell in self.occupancy)
+        for col, row in built_lots:
+            walkable[row * GRID_COLS + col] = 0
+        return bytes(walkable)
+
+    def walkable_bits(self):
+        """The walkability mask packed into one int per row (bit n = column n)"""
+        return [
+            sum(self.walkable[row * GRID_COLS + col] << col for col in range(GRID_COLS))
+            for row in range(GRID_ROWS)
+        ]
+
+def lot_to_pixels(col, row):
+    """Top-left pixel position of a building sprite standing on lot (col, row)"""
+    x = col * GRID_SIZE + (GRID_SIZE - BUILDING_SIZE) // 2  # Centered on the lot
+    y = (row + 1) * GRID_SIZE - BUILDING_SIZE  # Bottom edge on the lot's bottom edge
+    return x, y
+
+def _keeps_connected(grid, col, row):
+    """True if blocking (col, row) cannot split the walkable area.
+
+    Local "simple point" test: the walkable 4-neighbours must still be joined
+    to each other through the surrounding 8 cells. That keeps every path that
+    went through this cell intact, so global connectivity is preserved.
+    """
+    ring = []
+    for dx, dy in RING:
+        x, y = col + dx, row + dy
+        ring.append(0 <= x < GRID_COLS and 0 <= y < GRID_ROWS and grid[y * GRID_COLS + x] in (GRASS, PATH))
+
+    # Walk N, E, S, W; consecutive edge cells are joined if the corner between them is walkable
+    edges = ring[0::2]
+    corners = ring[1::2]
+    walkable_edges = sum(edges)
+    if walkable_edges <= 1:
+        return True
+    links = sum(
+        1 for i in range(4)
+        if edges[i] and edges[(i + 1) % 4] and corners[i]
+    )
+    # A ring of 4 linked edges has 4 links but is a single component
+    components = walkable_edges - min(links, walkable_edges - 1)
+    return components == 1
+
+def _connect_fronts(grid, fronts, rng):
+    """Lay dirt paths along a BFS tree from one front to every other front"""
+    if not fronts:
+        return
+    root = rng.choice(fronts)
+    parents = {root: None}
+    queue = deque([root])
+    while queue:
+        col, row = queue.popleft()
+        for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+            x, y = col + dx, row + dy
+            if (x, y) in parents or not (0 <= x < GRID_COLS and 0 <= y < GRID_ROWS):
+                continue
+            if grid[y * GRID_COLS + x] in (GRASS, PATH):
+                parents[(x, y)] = (col, row)
+                queue.append((x, y))
+
+    for front in fronts:
+        cell = front
+        # Walk back towards the root until we meet road that is already laid
+        while cell is not None:
+            index = cell[1] * GRID_COLS + cell[0]
+            if grid[index] == PATH and cell != front:
+                break
+            grid[index] = PATH
+            cell = parents.get(cell)
+
+def _touches_building(grid, col, row):
+    """True if any of the 8 cells around (col, row) is a building"""
+    for dx, dy in RING:
+        x, y = col + dx, row + dy
+        if 0 <= x < GRID_COLS and 0 <= y < GRID_ROWS and grid[y * GRID_COLS + x] == BUILDING:
+            return True
+    return False
+
+def _place_lots(rng, target):
+    """One random pass over the candidate lots; returns the grid, the lots placed and their door cells"""
+    grid = bytearray(ISLAND)
+    candidates = list(LOT_CANDIDATES)
+    rng.shuffle(candidates)
+
+    lots = []
+    fronts = []
+    for col, row in candidates:
+        if len(lots) >= target:
+            break
+        index = row * GRID_COLS + col
+        front = index + GRID_COLS
+
+        # The lot must be free grass and its door cell must not be built on
+        if grid[index] != GRASS or grid[front] == BUILDING:
+            continue
+        # Keep a cell between neighbours so 48 px sprites never overlap
+        # (side by side or diagonally - the door cell already keeps them apart vertically)
+        if _touches_building(grid, col, row):
+            continue
+        # Never wall off part of the island
+        if not _keeps_connected(grid, col, row):
+            continue
+
+        grid[index] = BUILDING
+        grid[front] = PATH  # Reserve the door cell
+        lots.append((col, row))
+        fronts.append((col, row + 1))
+    return grid, lots, fronts
+
+def generate_town(seed=None, min_buildings=MIN_BUILDINGS, max_buildings=MAX_BUILDINGS):
+    """Generate a town layout; the same seed always gives the same town.
+
+    Aims for a random target between min_buildings and max_buildings. A
+    random pass can run out of lots that pass the constraint checks first,
+    so the fullest of several passes is kept (a pass takes about 0.3 ms):
+    up to TARGET_ATTEMPTS while chasing the target, and as many as
+    MAX_ATTEMPTS until min_buildings is reached. The island only fits 12
+    buildings with sprites kept apart, so a target of 13-15 gets as many as
+    fit. A town short of min_buildings fails --check.
+    """
+    rng = random.Random(seed)
+    target = rng.randint(min_buildings, max_buildings)
+    best = None
+    for attempt in range(MAX_ATTEMPTS):
+        placed = _place_lots(rng, target)
+        if best is None or len(placed[1]) > len(best[1]):
+            best = placed
+        count = len(best[1])
+        if count >= target or (count >= min_buildings and attempt + 1 >= TARGET_ATTEMPTS):
+            break
+    grid, lots, fronts = best
+
+    _connect_fronts(grid, fronts, rng)
+
+    buildings = []
+    for col, row in sorted(lots, key=lambda lot: (lot[1], lot[0])):
+        x, y = lot_to_pixels(col, row)
+        building_type = rng.choices(BUILDING_TYPES, BUILDING_WEIGHTS)[0]
+        buildings.append({"type": building_type, "x": x, "y": y, "col": col, "row": row})
+    return TownLayout(seed, buildings, grid)
+
+def validate_layout(layout):
+    """Return a list of constraint violations (empty if the layout is valid)"""
+    problems = []
+    grid = layout.occupancy
+    for building in layout.buildings:
+        col, row = building["col"], building["row"]
+        if ISLAND[row * GRID_COLS + col] != GRASS:
+            problems.append(f"building on water at {col},{row}")
+        if grid[(row + 1) * GRID_COLS + col] != PATH:
+            problems.append(f"building at {col},{row} has no path at its door")
+        if _touches_building(grid, col, row):
+            problems.append(f"buildings touching at {col},{row}")
+
+    # Every walkable cell must be reachable from every other one
+    walkable = [index for index, value in enumerate(layout.walkable) if value]
+    if walkable:
+        seen = {walkable[0]}
+        queue = deque([walkable[0]])
+        while queue:
+            index = queue.popleft()
+            col, row = index % GRID_COLS, index // GRID_COLS
+            for dx, dy in ((0, -1), (1, 0), (0, 1), (-1, 0)):
+                x, y = col + dx, row + dy
+                neighbour = y * GRID_COLS + x
+                if 0 <= x < GRID_COLS and 0 <= y < GRID_ROWS and layout.walkable[neighbour] and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        if len(seen) != len(walkable):
+            problems.append(f"walkable area split ({len(seen)} of {len(walkable)} cells reachable)")
+    return problems
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and validate Catastrophe Civ towns")
+    parser.add_argument("--seed", type=int, default=0, help="print the town for this seed")
+    parser.add_argument("--check", type=int, metavar="COUNT", help="validate COUNT seeds and report timings")
+    args = parser.parse_args()
+
+    if args.check:
+        counts = {}
+        failures = 0
+        start = time.perf_counter()
+        for seed in range(args.check):
+            layout = generate_town(seed)
+            counts[len(layout.buildings)] = counts.get(len(layout.buildings), 0) + 1
+            if validate_layout(layout) or len(layout.buildings) < MIN_BUILDINGS:
+                failures += 1
+        elapsed = time.perf_counter() - start
+        print(f"🏘️ Checked {args.check} seeds in {elapsed:.2f}s ({elapsed / args.check * 1e6:.1f} µs per town incl. validation)")
+        print(f"📊 Buildings per town: {dict(sorted(counts.items()))}")
+        print("✅ All layouts valid" if not failures
+              else f"❌ {failures} invalid layouts (constraint violations or fewer than {MIN_BUILDINGS} buildings)")
+        return 1 if failures else 0
+
+    layout = generate_town(args.seed)
+    symbols = {WATER: ".", GRASS: ",", PATH: "=", BUILDING: "H"}
+    for row in range(GRID_ROWS):
+        print("".join(symbols[layout.occupancy[row * GRID_COLS + col]] for col in range(GRID_COLS)))
+    print(f"🏘️ Seed {args.seed}: {len(layout.buildings)} buildings")
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())